@@ -1,64 +1,161 @@
 """Agent module for Eva - agentic loop implementation."""
+import asyncio
 import os
-import json
-import anthropic
-from openai import OpenAI
+import queue
+import threading
+import time
+from collections.abc import AsyncIterator, Iterator
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from pathlib import Path
 
-from .memory import load_all_memory
-from .tools import TOOLS, execute_tool
+from . import metrics
+from .budget import AgentBudget, OutputBudget
+from .cache import RESPONSE_CACHE_TTL, get_response_cache, response_key
+from .clients import background_loop, run_sync
+from .history import SESSION_TOKEN_BUDGET, HistoryManager, trim_exchanges
+from .prefetch import PREFETCH, Prefetcher, find_targets
+from .memory import ALWAYS, MEMORY_REGISTRY, RETRIEVED, MemoryFile, MemorySnapshot, memory_snapshot, registered_memory, truncate_tokens
+from .retrieval import RETRIEVAL, recent_context, relevant_memory
+from .providers import (
+    AnthropicAdapter,
+    OpenAICompatibleAdapter,
+    ProviderAdapter,
+    Turn,
+    new_usage,
+)
+from .routing import HedgedAdapter
+from .tools import OPENAI_TOOLS, SERIAL_TOOLS, TOOLS, WRITE_TOOLS, execute_tool, run_in_thread, tool_keeps_tail, tool_timeout
 
 # Provider configuration
 PROVIDER = os.environ.get("EVA_PROVIDER", "anthropic")  # "anthropic", "nvidia", or "grok"
-NVIDIA_BASE_URL = "https://integrate.api.nvidia.com/v1"
+# Base URLs can point at a stand-in server (see src/standin.py)
+NVIDIA_BASE_URL = os.environ.get("NVIDIA_BASE_URL", "https://integrate.api.nvidia.com/v1")
 NVIDIA_MODEL = "moonshotai/kimi-k2.5"
 ANTHROPIC_MODEL = "claude-sonnet-4-20250514"
-GROK_BASE_URL = "https://api.x.ai/v1"
+GROK_BASE_URL = os.environ.get("GROK_BASE_URL", "https://api.x.ai/v1")
 GROK_MODEL = "grok-3-fast"
 
+# Optional hedged routing across providers, primary first (e.g. "nvidia,grok")
+ROUTE = [p.strip() for p in os.environ.get("EVA_ROUTE", "").split(",") if p.strip()]
 
-def _convert_tools_to_openai_format(tools: list) -> list:
-    """Convert Anthropic tool format to OpenAI function format."""
-    return [
-        {
-            "type": "function",
-            "function": {
-                "name": tool["name"],
-                "description": tool["description"],
-                "parameters": tool["input_schema"],
-            },
-        }
-        for tool in tools
-    ]
+# Message format each provider speaks; only providers sharing one can hedge
+WIRE_FORMATS = {"anthropic": "anthropic", "nvidia": "openai", "grok": "openai"}
 
 
-def build_system_prompt(memory: dict[str, str]) -> str:
-    """Combine memory files into system prompt.
+def validate_route(route: list[str]) -> None:
+    """Check that an EVA_ROUTE value can be hedged.
 
     Args:
-        memory: Dict mapping memory name to content
+        route: Provider names, primary first
 
-    Returns:
-        Combined system prompt string
+    Raises:
+        ValueError: If a provider is unknown or the providers mix message formats
     """
-    return f"""You are Eva, Louis's private optimization engine.
+    if len(route) < 2:
+        return
+    unknown = [p for p in route if p not in WIRE_FORMATS]
+    if unknown:
+        raise ValueError(f"EVA_ROUTE names unknown providers: {', '.join(unknown)}")
+    if len({WIRE_FORMATS[p] for p in route}) > 1:
+        raise ValueError(
+            f"EVA_ROUTE={','.join(route)} mixes message formats; "
+            "hedged providers must all be OpenAI-compatible (e.g. nvidia,grok)"
+        )
+
 
-## Your Identity
-{memory['soul']}
+# Fail at startup rather than on every request
+validate_route(ROUTE)
 
-## Your User
-{memory['user']}
+# Opt-in Anthropic prompt caching for the tools and stable system prompt
+PROMPT_CACHE = os.environ.get("EVA_PROMPT_CACHE", "").lower() in ("1", "true", "yes")
 
-## Your Purpose
-{memory['telos']}
+# Max tool calls from a single model turn executed at once
+TOOL_CONCURRENCY = int(os.environ.get("EVA_TOOL_CONCURRENCY", "4"))
 
-## Recent Context
-{memory['context']}
 
-## Your Architecture (Self-Awareness)
-{memory['harness']}
+def execute_tool_calls(
+    calls: list[tuple[str, dict]],
+    memory_dir: Path,
+    deadline: float | None = None,
+) -> list[str]:
+    """Execute the tool calls from one model turn.
+
+    Independent calls run on up to TOOL_CONCURRENCY daemon threads, and
+    each is abandoned after its tool's timeout. Tools in SERIAL_TOOLS act
+    as barriers: everything requested before them finishes first, then
+    they run alone, inline, and are never abandoned, so the model is not
+    told a write failed when it may have gone through.
+
+    Args:
+        calls: (name, args) pairs in the order the model requested them
+        memory_dir: Path to memory directory
+        deadline: Optional time.monotonic() deadline; calls not started by
+            the deadline are skipped, and calls still running at it are
+            abandoned and report a timeout instead
 
-## RESPONSE RULES - CRITICAL
+    Returns:
+        Tool results, in the same order as calls
+    """
+    results: list[str | None] = [None] * len(calls)
+    batch: list[int] = []
+    slots = threading.BoundedSemaphore(max(1, TOOL_CONCURRENCY))
+
+    def remaining() -> float | None:
+        return None if deadline is None else max(0.0, deadline - time.monotonic())
+
+    def skipped(i: int) -> str:
+        return f"Error: {calls[i][0]} skipped, time budget exhausted"
+
+    def run_inline(i: int) -> None:
+        name, args = calls[i]
+        if remaining() == 0.0:
+            results[i] = skipped(i)
+        else:
+            results[i] = execute_tool(name, args, memory_dir)
+
+    def submit(i: int) -> Future:
+        name, args = calls[i]
+        return run_in_thread(execute_tool, name, args, memory_dir, name=f"eva-tool-{name}", slots=slots)
+
+    def wait_for(i: int, started: float) -> float | None:
+        # Until the deadline or the tool's timeout, whichever comes first
+        wait = remaining()
+        timeout = tool_timeout(calls[i][0])
+        if timeout is not None:
+            left = max(0.0, started + timeout - time.monotonic())
+            wait = left if wait is None else min(wait, left)
+        return wait
+
+    def flush() -> None:
+        futures = []
+        for i in batch:
+            if remaining() == 0.0:
+                results[i] = skipped(i)
+            else:
+                futures.append((i, submit(i), time.monotonic()))
+        for i, future, started in futures:
+            try:
+                results[i] = future.result(timeout=wait_for(i, started))
+            except FutureTimeoutError:
+                future.cancel()
+                results[i] = f"Error: {calls[i][0]} timed out"
+        batch.clear()
+
+    # Every other call goes to a thread, even a single one, so it can be abandoned
+    for i, (name, args) in enumerate(calls):
+        if name in SERIAL_TOOLS:
+            flush()
+            run_inline(i)
+        else:
+            batch.append(i)
+    flush()
+
+    return results
+
+
+# Behavioural rules appended to every system prompt
+RESPONSE_RULES = """## RESPONSE RULES - CRITICAL
 - Keep responses under 2 sentences unless explicitly asked for detail.
 - No fluff. No pleasantries. No "Let me know if..." or "Is there anything else..."
 - Be direct. Be punchy. One-liners preferred.
@@ -82,8 +179,361 @@ def build_system_prompt(memory: dict[str, str]) -> str:
 """
 
 
-def run_agent(prompt: str, memory_dir: Path) -> str:
-    """Run one agent loop cycle.
+# First line of every system prompt
+IDENTITY = "You are Eva, Louis's private optimization engine."
+
+
+def _memory_section(spec: MemoryFile, memory: dict[str, str]) -> str:
+    """One memory file's section of the system prompt, cut to its token cap."""
+    text = memory[spec.name]
+    if spec.token_cap is not None:
+        cut = truncate_tokens(text, spec.token_cap, from_end=spec.newest_last)
+        if cut != text:
+            part = "newest" if spec.newest_last else "first"
+            text = f"{cut}\n(Only the {part} part of {spec.name}.md fits here; read_memory has all of it.)"
+    return f"## {spec.title}\n{text}"
+
+
+def _prompt_sections(memory: dict[str, str], stable: bool) -> str:
+    """Sections of the ALWAYS memory files that are (or are not) stable, in position order."""
+    return "\n\n".join(
+        _memory_section(spec, memory)
+        for spec in registered_memory(ALWAYS)
+        if spec.stable == stable and spec.name in memory
+    )
+
+
+def _identity_section(memory: dict[str, str]) -> str:
+    """Who Eva is: the part of the prompt every request gets in full."""
+    return f"{IDENTITY}\n\n{_memory_section(MEMORY_REGISTRY['soul'], memory)}"
+
+
+def _stable_sections(memory: dict[str, str]) -> str:
+    """The identity and the stable ALWAYS files: the rarely changing part of the prompt."""
+    return f"{IDENTITY}\n\n{_prompt_sections(memory, stable=True)}"
+
+
+def _context_section(memory: dict[str, str]) -> str:
+    """The other ALWAYS files (Recent Context): the part that changes after most conversations."""
+    return _prompt_sections(memory, stable=False)
+
+
+def build_system_prompt(memory: dict[str, str]) -> str:
+    """Combine memory files into system prompt.
+
+    Args:
+        memory: Dict mapping memory name to content
+
+    Returns:
+        Combined system prompt string
+    """
+    return f"{_stable_sections(memory)}\n\n{RESPONSE_RULES}\n{_context_section(memory)}\n"
+
+
+def build_system_blocks(memory: dict[str, str]) -> list[dict]:
+    """Build an Anthropic system prompt with a prompt-caching breakpoint.
+
+    Same text as build_system_prompt, split in two: the stable sections
+    and rules carry a cache_control marker, and the frequently appended
+    Recent Context section comes last so it does not invalidate the
+    cached prefix.
+
+    Args:
+        memory: Dict mapping memory name to content
+
+    Returns:
+        List of Anthropic text content blocks
+    """
+    return [
+        {
+            "type": "text",
+            "text": f"{_stable_sections(memory)}\n\n{RESPONSE_RULES}\n",
+            "cache_control": {"type": "ephemeral"},
+        },
+        {"type": "text", "text": f"{_context_section(memory)}\n"},
+    ]
+
+
+def build_retrieval_prompt(memory: MemorySnapshot, prompt: str) -> tuple[str, str]:
+    """Build a system prompt from the identity plus the memory relevant to a prompt.
+
+    Used instead of the whole-file prompt when EVA_MEMORY_RETRIEVAL is
+    set: soul.md and the newest context entries are always included, the
+    rest of memory only as the sections that best match the prompt.
+
+    Args:
+        memory: Loaded memory snapshot
+        prompt: User prompt the sections are chosen for
+
+    Returns:
+        (stable, dynamic) text; the stable part does not depend on the
+        prompt, so it can carry a prompt-caching breakpoint
+    """
+    stable = memory.derived("retrieval_core", lambda: f"{_identity_section(memory.files)}\n\n{RESPONSE_RULES}\n")
+    sections = "\n\n".join(chunk.render() for chunk in relevant_memory(memory, prompt))
+    dynamic = (
+        "## Relevant Memory\n"
+        "Sections of memory chosen for this request. Use read_memory with a query to search the rest.\n\n"
+        f"{sections or '(none matched)'}\n\n"
+        f"## Recent Context\n{recent_context(memory)}\n"
+    )
+    return stable, dynamic
+
+
+def get_adapter(provider: str) -> ProviderAdapter:
+    """Get the adapter for a configured provider.
+
+    Args:
+        provider: "anthropic", "nvidia" or "grok"
+
+    Returns:
+        Provider adapter (unknown names fall back to Anthropic)
+    """
+    if provider == "nvidia":
+        # Kimi is a reasoning model, needs more tokens
+        return OpenAICompatibleAdapter(
+            "nvidia", NVIDIA_BASE_URL, "NVIDIA_API_KEY", NVIDIA_MODEL, 8192, OPENAI_TOOLS
+        )
+    if provider == "grok":
+        return OpenAICompatibleAdapter(
+            "grok", GROK_BASE_URL, "GROK_API_KEY", GROK_MODEL, 4096, OPENAI_TOOLS
+        )
+    return AnthropicAdapter(ANTHROPIC_MODEL, 4096, TOOLS, prompt_cache=PROMPT_CACHE)
+
+
+def get_route_adapter() -> ProviderAdapter:
+    """Get the adapter for a conversation: hedged across EVA_ROUTE if it names
+    two or more providers, otherwise the single EVA_PROVIDER adapter."""
+    if len(ROUTE) > 1:
+        return HedgedAdapter([get_adapter(provider) for provider in ROUTE])
+    return get_adapter(PROVIDER)
+
+
+def _system_for(adapter: ProviderAdapter, memory: MemorySnapshot, prompt: str | None = None):
+    """System prompt in the form the adapter wants (cache blocks or plain text).
+
+    The whole-file prompt is built once per memory snapshot, so requests
+    share the same prompt object until a memory file changes; sections of
+    RETRIEVED files that match the prompt are added after it. With
+    EVA_MEMORY_RETRIEVAL set and a prompt given, the prompt is instead
+    built from the memory sections relevant to it.
+    """
+    if RETRIEVAL and prompt is not None:
+        stable, dynamic = build_retrieval_prompt(memory, prompt)
+        if getattr(adapter, "prompt_cache", False):
+            return [
+                {"type": "text", "text": stable, "cache_control": {"type": "ephemeral"}},
+                {"type": "text", "text": dynamic},
+            ]
+        return stable + dynamic
+    extra = _retrieved_section(memory, prompt) if prompt is not None else ""
+    if getattr(adapter, "prompt_cache", False):
+        blocks = memory.derived("system_blocks", lambda: build_system_blocks(memory.files))
+        return blocks + [{"type": "text", "text": extra}] if extra else blocks
+    system = memory.derived("system_prompt", lambda: build_system_prompt(memory.files))
+    return system + extra
+
+
+def _retrieved_section(memory: MemorySnapshot, prompt: str) -> str:
+    """Sections of the RETRIEVED memory files relevant to a prompt, or "" if none are."""
+    names = {spec.name for spec in registered_memory(RETRIEVED) if spec.name in memory.files}
+    chunks = relevant_memory(memory, prompt, names=names) if names else []
+    if not chunks:
+        return ""
+    sections = "\n\n".join(chunk.render() for chunk in chunks)
+    return f"\n## Relevant Memory\n{sections}\n"
+
+
+def _provider_label(adapter: ProviderAdapter) -> str:
+    """Provider that answered the last call (the race winner for hedged routes)."""
+    winners = getattr(adapter, "winners", None)
+    return winners[-1] if winners else adapter.name
+
+
+def _record_conversation(outcome: str, turns: int, started: float) -> None:
+    metrics.inc("eva_agent_conversations_total", outcome=outcome)
+    metrics.observe("eva_agent_turns", turns, metrics.TURN_BUCKETS)
+    metrics.observe("eva_agent_conversation_seconds", time.perf_counter() - started)
+
+
+async def _run_tools(
+    calls: list[tuple[str, dict]],
+    memory_dir: Path,
+    budget: AgentBudget,
+    prefetcher: Prefetcher,
+) -> list[str]:
+    """Run one turn's tool calls, taking results the prefetcher already started."""
+    claimed = {}
+    # A write tool in the turn could change what a prefetched read would return
+    if not any(name in WRITE_TOOLS for name, _ in calls):
+        for i, (name, args) in enumerate(calls):
+            prefetched = prefetcher.claim(name, args)
+            if prefetched is not None:
+                claimed[i] = prefetched
+
+    results: list[str | None] = [None] * len(calls)
+    rest = [i for i in range(len(calls)) if i not in claimed]
+    if rest:
+        ran = await asyncio.to_thread(execute_tool_calls, [calls[i] for i in rest], memory_dir, budget.deadline)
+        for i, result in zip(rest, ran):
+            results[i] = result
+    for i, (future, started) in claimed.items():
+        # Until the deadline or the tool's timeout from when the prefetch began
+        wait = budget.remaining()
+        timeout = tool_timeout(calls[i][0])
+        if timeout is not None:
+            left = max(0.0, started + timeout - time.monotonic())
+            wait = left if wait is None else min(wait, left)
+        try:
+            results[i] = await asyncio.wait_for(asyncio.wrap_future(future), wait)
+        except TimeoutError:
+            results[i] = f"Error: {calls[i][0]} timed out"
+    return results
+
+
+def _budget_message(stopped: str) -> str:
+    """Fallback answer when the budget ran out before the model said anything."""
+    return f"Stopped before finishing: {stopped.replace('_', ' ')} budget reached. — Eva"
+
+
+async def _agent_events(
+    prompt: str,
+    memory_dir: Path,
+    memory: MemorySnapshot,
+    stream: bool,
+    usage: dict[str, int],
+    budget: AgentBudget | None = None,
+    session: "Session | None" = None,
+) -> AsyncIterator[dict]:
+    """The agent loop shared by every provider and entry point.
+
+    Calls the model, runs any requested tools off the event loop, and
+    repeats until the model answers without tools. Each round of tool
+    results is cut to the conversation's OutputBudget, and old results
+    are compacted once the history passes its token budget. If the AgentBudget
+    runs out first, the loop ends with the best partial answer so far.
+
+    URLs and GitHub repos named in the prompt are fetched speculatively
+    while the first model call runs (see src/prefetch.py).
+
+    With EVA_RESPONSE_CACHE set, a finished answer is reused for the same
+    prompt, memory contents, provider and model until it expires. Answers
+    from runs that called a write tool, or that ran out of budget, are
+    never cached. Turns of a Session continue its conversation and are
+    never cached either, since the answer depends on what came before.
+    """
+    if budget is None:
+        budget = AgentBudget.from_env()
+    adapter = session.adapter if session is not None else get_route_adapter()
+    started = time.perf_counter()
+
+    cache = get_response_cache() if session is None else None
+    if cache is not None:
+        cache_key = response_key(prompt, memory.digest, adapter.name, getattr(adapter, "model", ""))
+        # DiskCache does blocking SQLite I/O; keep it off the shared event loop
+        cached = await asyncio.to_thread(cache.get, cache_key)
+        if cached is not None:
+            if stream:
+                yield {"type": "text", "text": cached}
+            _record_conversation("cached", 0, started)
+            yield {"type": "done", "text": cached, "usage": usage, "stopped": None, "cached": True}
+            return
+    wrote = False
+
+    if session is not None:
+        messages = session._begin(prompt)
+        system = session.system
+        history = session.history
+    else:
+        system = _system_for(adapter, memory, prompt)
+        messages = adapter.start(system, prompt)
+        history = HistoryManager()
+
+    outputs = OutputBudget()
+    prefetcher = Prefetcher(memory_dir)
+    if PREFETCH:
+        # Runs while the first model call is in flight
+        prefetcher.start(find_targets(prompt))
+
+    try:
+        turns = 0
+        best = ""
+        while True:
+            stopped = budget.exceeded(turns, usage)
+            if stopped:
+                break
+            turns += 1
+            streamed = []
+            call_started = time.perf_counter()
+            try:
+                async with asyncio.timeout(budget.remaining()):
+                    if stream:
+                        async for item in adapter.stream(system, messages):
+                            if isinstance(item, Turn):
+                                turn = item
+                            else:
+                                streamed.append(item.get("text", ""))
+                                yield item
+                    else:
+                        turn = await adapter.complete(system, messages)
+            except TimeoutError:
+                stopped = "deadline"
+                best = "".join(streamed) or best
+                break
+            except Exception:
+                metrics.inc("eva_llm_errors_total", provider=adapter.name)
+                raise
+
+            provider = _provider_label(adapter)
+            metrics.observe("eva_llm_request_seconds", time.perf_counter() - call_started, provider=provider)
+            for key, value in turn.usage.items():
+                usage[key] += value
+                if value:
+                    metrics.inc("eva_llm_tokens_total", value, provider=provider, type=key.removesuffix("_tokens"))
+
+            if not turn.tool_calls:
+                if cache is not None and turn.text and not wrote:
+                    await asyncio.to_thread(cache.set, cache_key, turn.text, RESPONSE_CACHE_TTL)
+                _record_conversation("answered", turns, started)
+                # Callers may stop reading at "done", so settle prefetches first
+                prefetcher.close()
+                yield {"type": "done", "text": turn.text, "usage": usage, "stopped": None, "cached": False}
+                return
+            best = turn.text or best
+
+            for call in turn.tool_calls:
+                wrote = wrote or call.name in WRITE_TOOLS
+                yield {"type": "tool_call", "name": call.name, "input": call.input}
+            calls = [(call.name, call.input) for call in turn.tool_calls]
+            results = await _run_tools(calls, memory_dir, budget, prefetcher)
+            results = outputs.fit(results, [tool_keeps_tail(name, args) for name, args in calls])
+            adapter.add_results(messages, turn, results)
+
+            saved = history.compact(messages)
+            if saved:
+                yield {"type": "compaction", "tokens_saved": saved}
+
+        _record_conversation(stopped, turns, started)
+        prefetcher.close()
+        yield {
+            "type": "done",
+            "text": best or _budget_message(stopped),
+            "usage": usage,
+            "stopped": stopped,
+            "cached": False,
+        }
+    finally:
+        prefetcher.close()
+
+
+async def run_agent_async(
+    prompt: str,
+    memory_dir: Path,
+    usage: dict[str, int] | None = None,
+    budget: AgentBudget | None = None,
+    memory: MemorySnapshot | None = None,
+) -> str:
+    """Run one agent loop cycle on the current event loop.
 
     1. Load memory into system prompt
     2. Call LLM with tools
@@ -93,128 +543,228 @@ def run_agent(prompt: str, memory_dir: Path) -> str:
     Args:
         prompt: User prompt
         memory_dir: Path to memory directory
+        usage: Optional accumulator from new_usage(); token counts
+            (including prompt cache reads and writes) are added to it
+        budget: Optional AgentBudget (defaults to AgentBudget.from_env())
+        memory: Already loaded MemorySnapshot (memory_snapshot(memory_dir) if None)
 
     Returns:
-        Final text response from LLM
+        Final text response from LLM (a partial answer if the budget ran out)
     """
-    memory = load_all_memory(memory_dir)
-    system = build_system_prompt(memory)
+    if memory is None:
+        memory = memory_snapshot(memory_dir)
+    if usage is None:
+        usage = new_usage()
 
-    if PROVIDER == "nvidia":
-        return _run_agent_nvidia(prompt, system, memory_dir)
-    elif PROVIDER == "grok":
-        return _run_agent_grok(prompt, system, memory_dir)
-    else:
-        return _run_agent_anthropic(prompt, system, memory_dir)
+    async for event in _agent_events(prompt, memory_dir, memory, stream=False, usage=usage, budget=budget):
+        if event["type"] == "done":
+            return event["text"]
+    return ""
 
 
-def _run_agent_anthropic(prompt: str, system: str, memory_dir: Path) -> str:
-    """Run agent using Anthropic Claude."""
-    client = anthropic.Anthropic()
-    messages = [{"role": "user", "content": prompt}]
+async def run_agent_stream_async(
+    prompt: str,
+    memory_dir: Path,
+    budget: AgentBudget | None = None,
+) -> AsyncIterator[dict]:
+    """Run one agent loop cycle on the current event loop, yielding events.
 
-    while True:
-        response = client.messages.create(
-            model=ANTHROPIC_MODEL,
-            max_tokens=4096,
-            system=system,
-            tools=TOOLS,
-            messages=messages,
-        )
+    See run_agent_stream for the event format.
 
-        tool_uses = [b for b in response.content if b.type == "tool_use"]
-        if not tool_uses:
-            return "".join(b.text for b in response.content if hasattr(b, "text"))
-
-        messages.append({"role": "assistant", "content": response.content})
-        tool_results = []
-        for tool in tool_uses:
-            result = execute_tool(tool.name, tool.input, memory_dir)
-            tool_results.append(
-                {"type": "tool_result", "tool_use_id": tool.id, "content": result}
-            )
-        messages.append({"role": "user", "content": tool_results})
-
-
-def _run_agent_nvidia(prompt: str, system: str, memory_dir: Path) -> str:
-    """Run agent using NVIDIA API (Kimi K2.5)."""
-    client = OpenAI(
-        base_url=NVIDIA_BASE_URL,
-        api_key=os.environ.get("NVIDIA_API_KEY"),
-    )
+    Args:
+        prompt: User prompt
+        memory_dir: Path to memory directory
+        budget: Optional AgentBudget (defaults to AgentBudget.from_env())
 
-    messages = [
-        {"role": "system", "content": system},
-        {"role": "user", "content": prompt},
-    ]
-    tools = _convert_tools_to_openai_format(TOOLS)
-
-    while True:
-        response = client.chat.completions.create(
-            model=NVIDIA_MODEL,
-            max_tokens=8192,  # Kimi is a reasoning model, needs more tokens
-            messages=messages,
-            tools=tools,
-            tool_choice="auto",
-        )
+    Yields:
+        Event dicts, in the order they occur
+    """
+    memory = memory_snapshot(memory_dir)
+    async for event in _agent_events(prompt, memory_dir, memory, stream=True, usage=new_usage(), budget=budget):
+        yield event
+
+
+def run_agent(
+    prompt: str,
+    memory_dir: Path,
+    usage: dict[str, int] | None = None,
+    budget: AgentBudget | None = None,
+) -> str:
+    """Run one agent loop cycle, blocking until the final response.
 
-        message = response.choices[0].message
-
-        # Check for tool calls
-        if not message.tool_calls:
-            # Kimi K2.5 is a reasoning model - content may be in reasoning_content
-            content = message.content
-            if not content and hasattr(message, "reasoning_content"):
-                content = message.reasoning_content
-            return content or ""
-
-        # Execute tools and continue loop
-        messages.append(message)
-        for tool_call in message.tool_calls:
-            args = json.loads(tool_call.function.arguments)
-            result = execute_tool(tool_call.function.name, args, memory_dir)
-            messages.append({
-                "role": "tool",
-                "tool_call_id": tool_call.id,
-                "content": result,
-            })
-
-
-def _run_agent_grok(prompt: str, system: str, memory_dir: Path) -> str:
-    """Run agent using xAI Grok API."""
-    client = OpenAI(
-        base_url=GROK_BASE_URL,
-        api_key=os.environ.get("GROK_API_KEY"),
+    Thin wrapper over run_agent_async. The work runs on the shared background
+    event loop, so concurrent callers (e.g. gateway threads) share one loop
+    and one set of pooled clients.
+
+    Args:
+        prompt: User prompt
+        memory_dir: Path to memory directory
+        usage: Optional accumulator from new_usage(); token counts
+            (including prompt cache reads and writes) are added to it
+        budget: Optional AgentBudget (defaults to AgentBudget.from_env())
+
+    Returns:
+        Final text response from LLM (a partial answer if the budget ran out)
+    """
+    return run_sync(run_agent_async(prompt, memory_dir, usage, budget))
+
+
+_STREAM_END = object()
+
+
+def _iterate(events: AsyncIterator[dict]) -> Iterator[dict]:
+    """Drive an async event stream on the background loop from sync code."""
+    items: queue.Queue = queue.Queue()
+
+    async def pump():
+        try:
+            async for event in events:
+                items.put(event)
+        except Exception as e:
+            items.put(e)
+        finally:
+            items.put(_STREAM_END)
+
+    future = asyncio.run_coroutine_threadsafe(pump(), background_loop())
+    try:
+        while (item := items.get()) is not _STREAM_END:
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        # Consumer went away early (e.g. client disconnected)
+        future.cancel()
+
+
+def run_agent_stream(prompt: str, memory_dir: Path, budget: AgentBudget | None = None) -> Iterator[dict]:
+    """Run one agent loop cycle, yielding events as they arrive.
+
+    Events are dicts with a "type" key:
+        - {"type": "text", "text": str}: a text delta from the model
+        - {"type": "tool_call", "name": str, "input": dict}: a tool is about to run
+        - {"type": "compaction", "tokens_saved": int}: old tool results were
+          stubbed to keep the history within its token budget
+        - {"type": "done", "text": str, "usage": dict, "stopped": str | None,
+          "cached": bool}: the loop finished; text is the final (or best
+          partial) answer, usage the token counts from new_usage(), stopped
+          names the exhausted budget limit, if any, and cached is True when
+          the answer came from the response cache
+
+    Args:
+        prompt: User prompt
+        memory_dir: Path to memory directory
+        budget: Optional AgentBudget (defaults to AgentBudget.from_env())
+
+    Returns:
+        Iterator of event dicts, in the order they occur
+
+    Raises:
+        FileNotFoundError: If any required memory file is missing
+    """
+    memory = memory_snapshot(memory_dir)
+    return _iterate(
+        _agent_events(prompt, memory_dir, memory, stream=True, usage=new_usage(), budget=budget)
     )
 
-    messages = [
-        {"role": "system", "content": system},
-        {"role": "user", "content": prompt},
-    ]
-    tools = _convert_tools_to_openai_format(TOOLS)
-
-    while True:
-        response = client.chat.completions.create(
-            model=GROK_MODEL,
-            max_tokens=4096,
-            messages=messages,
-            tools=tools,
-            tool_choice="auto",
-        )
 
-        message = response.choices[0].message
-
-        # Check for tool calls
-        if not message.tool_calls:
-            return message.content or ""
-
-        # Execute tools and continue loop
-        messages.append(message)
-        for tool_call in message.tool_calls:
-            args = json.loads(tool_call.function.arguments)
-            result = execute_tool(tool_call.function.name, args, memory_dir)
-            messages.append({
-                "role": "tool",
-                "tool_call_id": tool_call.id,
-                "content": result,
-            })
+class Session:
+    """A multi-turn conversation, as used by the interactive REPL.
+
+    Keeps the loaded memory, the provider adapter (and with it the pooled
+    clients) and the message history between prompts, so follow-up
+    questions see earlier answers. Memory comes from the shared
+    memory_snapshot() cache, so files are re-read only when they change. Old
+    tool results are compacted as in single runs, and the oldest whole
+    exchanges are dropped once the conversation passes its token budget.
+    Sessions always use the whole-file system prompt, even with
+    EVA_MEMORY_RETRIEVAL set, since one prompt serves every question.
+    """
+
+    def __init__(self, memory_dir: Path, token_budget: int = SESSION_TOKEN_BUDGET):
+        self.memory_dir = memory_dir
+        self.token_budget = token_budget
+        self.adapter = get_route_adapter()
+        self.history = HistoryManager()
+        self.messages: list = []
+        self.usage = new_usage()
+        self.memory: MemorySnapshot | None = None
+        self.system = None
+        self._prompt_index = 0
+        self.reload_memory()
+
+    def reload_memory(self) -> bool:
+        """Pick up memory files that changed since the last prompt.
+
+        Returns:
+            True if memory was (re)loaded
+
+        Raises:
+            FileNotFoundError: If any required memory file is missing
+        """
+        snapshot = memory_snapshot(self.memory_dir)
+        if snapshot is self.memory:
+            return False
+        self.memory = snapshot
+        self.system = _system_for(self.adapter, snapshot)
+        return True
+
+    def reset(self) -> None:
+        """Forget the conversation, keeping memory and clients."""
+        self.messages = []
+        self.history = HistoryManager()
+
+    def _begin(self, prompt: str) -> list:
+        """Add a prompt to the conversation and return the message list to send."""
+        if self.reload_memory() and self.messages and self.messages[0].get("role") == "system":
+            self.messages[0]["content"] = self.system
+        if self.messages:
+            trim_exchanges(self.messages, self.token_budget)
+            self.messages.append({"role": "user", "content": prompt})
+        else:
+            self.messages = self.adapter.start(self.system, prompt)
+        self._prompt_index = len(self.messages) - 1
+        return self.messages
+
+    async def events(self, prompt: str, budget: AgentBudget | None = None) -> AsyncIterator[dict]:
+        """Run one prompt in the conversation on the current event loop, yielding events.
+
+        See run_agent_stream for the event format. If the run fails, the
+        prompt is dropped from the conversation again.
+        """
+        done = None
+        usage = new_usage()
+        try:
+            async for event in _agent_events(
+                prompt, self.memory_dir, self.memory, stream=True, usage=usage, budget=budget, session=self
+            ):
+                if event["type"] == "done":
+                    done = event
+                yield event
+        finally:
+            if done is None:
+                del self.messages[self._prompt_index:]
+            else:
+                # Record the answer so the next prompt follows on from it
+                self.messages.append({"role": "assistant", "content": done["text"] or "(no answer)"})
+                for key, value in usage.items():
+                    self.usage[key] += value
+
+    def stream(self, prompt: str, budget: AgentBudget | None = None) -> Iterator[dict]:
+        """Run one prompt in the conversation, yielding events as they arrive.
+
+        Args:
+            prompt: User prompt
+            budget: Optional AgentBudget (defaults to AgentBudget.from_env())
+
+        Returns:
+            Iterator of event dicts (see run_agent_stream)
+        """
+        return _iterate(self.events(prompt, budget))
+
+    def ask(self, prompt: str, budget: AgentBudget | None = None) -> str:
+        """Run one prompt in the conversation and return the final answer."""
+        text = ""
+        for event in self.stream(prompt, budget):
+            if event["type"] == "done":
+                text = event["text"]
+        return text
@@ -0,0 +1,212 @@
+"""Batch module for Eva - run a JSONL file of prompts in one process."""
+import asyncio
+import json
+import time
+from pathlib import Path
+
+from .agent import run_agent_async
+from .budget import AgentBudget
+from .clients import run_sync
+from .memory import memory_snapshot
+from .providers import new_usage
+
+# Prompts run at once when --concurrency is not given
+DEFAULT_CONCURRENCY = 4
+
+
+def read_prompts(path: Path) -> list[dict]:
+    """Read prompts from a JSONL file.
+
+    Each line is an object with a "prompt" and an optional "id"; lines
+    without an id are numbered by their position in the file. Blank lines
+    are ignored.
+
+    Args:
+        path: JSONL input file
+
+    Returns:
+        List of {"id": str, "prompt": str} dicts, in file order
+
+    Raises:
+        ValueError: If a line is not valid JSON or has no prompt
+    """
+    prompts = []
+    for number, line in enumerate(path.read_text().splitlines(), 1):
+        if not line.strip():
+            continue
+        try:
+            item = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"{path}:{number}: invalid JSON ({e})") from e
+        if not isinstance(item, dict) or not str(item.get("prompt") or "").strip():
+            raise ValueError(f"{path}:{number}: missing prompt")
+        prompts.append({"id": str(item.get("id", number)), "prompt": item["prompt"]})
+    return prompts
+
+
+def finished_ids(path: Path) -> set[str]:
+    """IDs already answered without error in an earlier (possibly crashed) run.
+
+    A partly written last line from a crash is ignored, so that prompt runs again.
+
+    Args:
+        path: JSONL output file
+
+    Returns:
+        Set of finished prompt IDs
+    """
+    if not path.exists():
+        return set()
+    done = set()
+    for line in path.read_text().splitlines():
+        try:
+            result = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        if isinstance(result, dict) and not result.get("error"):
+            done.add(str(result.get("id")))
+    return done
+
+
+def _drop_torn_line(path: Path) -> None:
+    """Cut a half-written last line (left by a crash) off the end of a JSONL file."""
+    if not path.exists():
+        return
+    with path.open("rb+") as f:
+        data = f.read()
+        if data and not data.endswith(b"\n"):
+            f.truncate(data.rfind(b"\n") + 1)
+
+
+def _percentile(values: list[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[int(fraction * (len(ordered) - 1))] if ordered else 0.0
+
+
+async def run_batch_async(
+    prompts: list[dict],
+    memory_dir: Path,
+    out_path: Path,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    max_turns: int | None = None,
+    timeout: float | None = None,
+) -> dict:
+    """Run prompts concurrently on the current event loop.
+
+    Memory is loaded once and pooled clients are shared by every prompt.
+    Each result is appended to out_path as soon as its prompt finishes, so
+    a crashed run loses at most the prompts that were in flight. A partly
+    written last line from such a crash is removed before appending.
+
+    Args:
+        prompts: {"id", "prompt"} dicts from read_prompts
+        memory_dir: Path to memory directory
+        out_path: JSONL file results are appended to
+        concurrency: Maximum prompts running at once
+        max_turns: Per-prompt turn limit (default: EVA_MAX_TURNS or 15)
+        timeout: Per-prompt wall-clock limit in seconds (default: EVA_TIMEOUT)
+
+    Returns:
+        Summary dict (see format_summary)
+    """
+    memory = memory_snapshot(memory_dir)
+    slots = asyncio.Semaphore(max(1, concurrency))
+    latencies: list[float] = []
+    totals = new_usage()
+    failed = 0
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    # Appending after a torn line would glue the next result onto it
+    _drop_torn_line(out_path)
+    started = time.perf_counter()
+
+    with out_path.open("a") as out:
+
+        async def run_one(item: dict) -> None:
+            nonlocal failed
+            async with slots:
+                # Budget starts when the prompt does, not while it waits for a slot
+                budget = AgentBudget.from_env(max_turns=max_turns, timeout=timeout)
+                usage = new_usage()
+                begin = time.perf_counter()
+                result = {"id": item["id"]}
+                try:
+                    result["response"] = await run_agent_async(
+                        item["prompt"], memory_dir, usage, budget, memory=memory
+                    )
+                except Exception as e:
+                    result["error"] = str(e)
+                    failed += 1
+                elapsed = time.perf_counter() - begin
+                latencies.append(elapsed)
+                for key, value in usage.items():
+                    totals[key] += value
+                result["latency"] = round(elapsed, 3)
+                result["usage"] = usage
+                out.write(json.dumps(result) + "\n")
+                out.flush()
+
+        await asyncio.gather(*(run_one(item) for item in prompts))
+
+    wall = time.perf_counter() - started
+    return {
+        "completed": len(prompts) - failed,
+        "failed": failed,
+        "wall_seconds": wall,
+        "throughput": len(prompts) / wall if wall > 0 else 0.0,
+        "latency_p50": _percentile(latencies, 0.50),
+        "latency_p95": _percentile(latencies, 0.95),
+        "latency_max": max(latencies, default=0.0),
+        "usage": totals,
+    }
+
+
+def run_batch(
+    in_path: Path,
+    memory_dir: Path,
+    out_path: Path,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    max_turns: int | None = None,
+    timeout: float | None = None,
+) -> dict:
+    """Run every unfinished prompt in a JSONL file, blocking until done.
+
+    Prompts whose IDs already have an error-free result in out_path are
+    skipped, so re-running after a crash resumes where it stopped.
+
+    Args:
+        in_path: JSONL file of prompts (see read_prompts)
+        memory_dir: Path to memory directory
+        out_path: JSONL file results are appended to
+        concurrency: Maximum prompts running at once
+        max_turns: Per-prompt turn limit
+        timeout: Per-prompt wall-clock limit in seconds
+
+    Returns:
+        Summary dict, including "skipped" for prompts finished earlier
+
+    Raises:
+        ValueError: If the input file is malformed
+        FileNotFoundError: If any required memory file is missing
+    """
+    prompts = read_prompts(in_path)
+    done = finished_ids(out_path)
+    pending = [item for item in prompts if item["id"] not in done]
+    summary = run_sync(
+        run_batch_async(pending, memory_dir, out_path, concurrency, max_turns, timeout)
+    )
+    summary["skipped"] = len(prompts) - len(pending)
+    return summary
+
+
+def format_summary(summary: dict) -> str:
+    """Render a batch summary for the terminal."""
+    usage = summary["usage"]
+    return (
+        f"{summary['completed']} completed, {summary['failed']} failed, "
+        f"{summary.get('skipped', 0)} skipped in {summary['wall_seconds']:.1f}s "
+        f"({summary['throughput']:.2f} prompts/s)\n"
+        f"latency p50 {summary['latency_p50']:.2f}s | p95 {summary['latency_p95']:.2f}s | "
+        f"max {summary['latency_max']:.2f}s\n"
+        f"tokens in {usage['input_tokens']} | out {usage['output_tokens']} | "
+        f"cache read {usage['cache_read_input_tokens']}"
+    )
@@ -0,0 +1,179 @@
+"""Budget module for Eva - cap turns, tokens and wall-clock time per agent call."""
+import os
+import time
+
+from .memory import count_memory_tokens, count_tokens_batch, truncate_tokens
+
+# Most tokens a single tool result may add to a conversation
+TOOL_RESULT_TOKENS = int(os.environ.get("EVA_TOOL_RESULT_TOKENS", "1500"))
+# Tool-result tokens one conversation may add before results get shorter
+TOOL_OUTPUT_BUDGET = int(os.environ.get("EVA_TOOL_OUTPUT_BUDGET", "8000"))
+# Tokens every tool result gets, even once the conversation budget is spent
+MIN_TOOL_RESULT_TOKENS = 200
+# Share of a head-and-tail cut given to the head
+HEAD_SHARE = 0.6
+
+
+def _env_number(name: str, cast):
+    """Read an optional numeric limit from the environment."""
+    value = os.environ.get(name)
+    return cast(value) if value else None
+
+
+class AgentBudget:
+    """Limits for a single run_agent call.
+
+    Any limit left as None is not enforced. The deadline is fixed when the
+    budget is created, so create one per call.
+    """
+
+    def __init__(
+        self,
+        max_turns: int | None = None,
+        max_input_tokens: int | None = None,
+        max_output_tokens: int | None = None,
+        timeout: float | None = None,
+    ):
+        self.max_turns = max_turns
+        self.max_input_tokens = max_input_tokens
+        self.max_output_tokens = max_output_tokens
+        self.timeout = timeout
+        self.deadline = time.monotonic() + timeout if timeout is not None else None
+
+    @classmethod
+    def from_env(cls, max_turns: int | None = None, timeout: float | None = None) -> "AgentBudget":
+        """Build the default budget from EVA_MAX_TURNS, EVA_MAX_INPUT_TOKENS,
+        EVA_MAX_OUTPUT_TOKENS and EVA_TIMEOUT.
+
+        Turns default to 15 so a model stuck calling tools cannot run forever.
+
+        Args:
+            max_turns: Overrides EVA_MAX_TURNS when given
+            timeout: Overrides EVA_TIMEOUT when given
+
+        Returns:
+            A fresh budget whose deadline starts now
+        """
+        return cls(
+            max_turns=max_turns or _env_number("EVA_MAX_TURNS", int) or 15,
+            max_input_tokens=_env_number("EVA_MAX_INPUT_TOKENS", int),
+            max_output_tokens=_env_number("EVA_MAX_OUTPUT_TOKENS", int),
+            timeout=timeout if timeout is not None else _env_number("EVA_TIMEOUT", float),
+        )
+
+    def remaining(self) -> float | None:
+        """Seconds left before the deadline, or None if there is no deadline."""
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+
+    def exceeded(self, turns: int, usage: dict[str, int]) -> str | None:
+        """Check whether another model call would break the budget.
+
+        Args:
+            turns: Model calls made so far
+            usage: Token usage accumulated so far
+
+        Returns:
+            Name of the exhausted limit, or None if there is room left
+        """
+        if self.max_turns is not None and turns >= self.max_turns:
+            return "max_turns"
+        input_tokens = (
+            usage["input_tokens"]
+            + usage["cache_creation_input_tokens"]
+            + usage["cache_read_input_tokens"]
+        )
+        if self.max_input_tokens is not None and input_tokens >= self.max_input_tokens:
+            return "max_input_tokens"
+        if self.max_output_tokens is not None and usage["output_tokens"] >= self.max_output_tokens:
+            return "max_output_tokens"
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            return "deadline"
+        return None
+
+
+def _cut(text: str, tokens: int, from_end: bool = False) -> str:
+    """truncate_tokens, moved back to a paragraph break if one is near the cut."""
+    cut = truncate_tokens(text, tokens, from_end)
+    if cut == text:
+        return text
+    if from_end:
+        paragraph = cut.find("\n\n")
+        return cut[paragraph + 2:] if 0 <= paragraph < len(cut) // 2 else cut
+    paragraph = cut.rfind("\n\n")
+    return cut[:paragraph] if paragraph >= len(cut) // 2 else cut
+
+
+def fit_tokens(text: str, tokens: int, keep_tail: bool = False) -> str:
+    """Shorten text to about tokens tokens, cutting at paragraph or line boundaries.
+
+    A note saying how much was left out marks the cut. With keep_tail
+    the start and the end are kept and the middle is dropped, which suits
+    code (imports at the top, the entry point at the bottom).
+
+    Args:
+        text: Text to shorten
+        tokens: Tokens the result may use
+        keep_tail: Keep the head and the tail instead of only the head
+
+    Returns:
+        text unchanged if it fits, otherwise the shortened text
+    """
+    total = count_memory_tokens(text)
+    if total <= tokens:
+        return text
+    note = f"[...truncated: about {tokens} of {total} tokens shown]"
+    room = max(1, tokens - count_memory_tokens(note))
+    if not keep_tail:
+        return f"{_cut(text, room)}\n{note}"
+    head = _cut(text, int(room * HEAD_SHARE))
+    tail = _cut(text, room - int(room * HEAD_SHARE), from_end=True)
+    return f"{head}\n{note}\n{tail}"
+
+
+class OutputBudget:
+    """Tokens the tool results of one conversation may add to its messages.
+
+    Each round of results is fitted together: results that fit their share
+    are kept whole, and what they leave over goes to the larger ones, up to
+    per_result each. Once the conversation's total is spent, every result
+    still gets min_result tokens, so the model always sees something.
+    """
+
+    def __init__(
+        self,
+        total: int = TOOL_OUTPUT_BUDGET,
+        per_result: int = TOOL_RESULT_TOKENS,
+        min_result: int = MIN_TOOL_RESULT_TOKENS,
+    ):
+        self.total = total
+        self.per_result = per_result
+        self.min_result = min_result
+        self.used = 0
+
+    def fit(self, results: list[str], keep_tail: list[bool] | None = None) -> list[str]:
+        """Shorten one round of tool results to this conversation's budget.
+
+        Args:
+            results: Tool results, in call order
+            keep_tail: Per result, whether to keep its head and tail (code)
+
+        Returns:
+            The results, each within its share
+        """
+        keep_tail = keep_tail or [False] * len(results)
+        sizes = count_tokens_batch(results)
+        left = max(self.total - self.used, self.min_result * len(results))
+        shares = [0] * len(results)
+        # Smallest first, so what small results leave over goes to the large ones
+        order = sorted(range(len(results)), key=lambda i: sizes[i])
+        for done, i in enumerate(order):
+            fair = max(self.min_result, left // (len(results) - done))
+            shares[i] = min(sizes[i], self.per_result, fair)
+            left -= shares[i]
+        self.used += sum(shares)
+        return [
+            result if sizes[i] <= shares[i] else fit_tokens(result, shares[i], keep_tail[i])
+            for i, result in enumerate(results)
+        ]
@@ -0,0 +1,191 @@
+"""Cache module for Eva - TTL/LRU caches with in-memory and SQLite backends."""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+# Response cache: "" or "off" disables it, "memory" is per-process, "disk" is
+# shared by every process (e.g. gunicorn workers) through SQLite
+RESPONSE_CACHE = os.environ.get("EVA_RESPONSE_CACHE", "").lower()
+RESPONSE_CACHE_TTL = float(os.environ.get("EVA_RESPONSE_CACHE_TTL", "900"))
+RESPONSE_CACHE_SIZE = int(os.environ.get("EVA_RESPONSE_CACHE_SIZE", "256"))
+CACHE_DIR = Path(os.environ.get("EVA_CACHE_DIR", Path.home() / ".cache" / "eva"))
+
+
+class MemoryCache:
+    """Thread-safe in-process cache with per-entry TTL and LRU eviction."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, tuple[float | None, object]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        """Return the cached value, or None if missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (entry[0] is None or entry[0] > time.time()):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def set(self, key: str, value, ttl: float | None) -> None:
+        """Store a value; ttl of None means it never expires."""
+        expires = time.time() + ttl if ttl is not None else None
+        with self._lock:
+            self._entries[key] = (expires, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        """Remove one entry if present."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def delete_prefix(self, prefix: str) -> int:
+        """Remove every entry whose key starts with prefix.
+
+        Returns:
+            Number of entries removed
+        """
+        with self._lock:
+            keys = [k for k in self._entries if k.startswith(prefix)]
+            for key in keys:
+                del self._entries[key]
+        return len(keys)
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class DiskCache:
+    """SQLite-backed cache shared between processes, with TTL and LRU eviction.
+
+    Values are stored as JSON. Each call opens its own short-lived
+    connection, so instances are safe to use from any thread or forked
+    worker.
+    """
+
+    def __init__(self, path: Path, max_entries: int):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires REAL, accessed REAL NOT NULL)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS cache_accessed ON cache (accessed)")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Open a connection for one transaction, and close it afterwards."""
+        db = sqlite3.connect(self.path, timeout=5)
+        try:
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    def get(self, key: str):
+        """Return the cached value, or None if missing or expired."""
+        now = time.time()
+        with self._connect() as db:
+            row = db.execute("SELECT value, expires FROM cache WHERE key = ?", (key,)).fetchone()
+            if row is not None and (row[1] is None or row[1] > now):
+                db.execute("UPDATE cache SET accessed = ? WHERE key = ?", (now, key))
+                self.hits += 1
+                return json.loads(row[0])
+            if row is not None:
+                db.execute("DELETE FROM cache WHERE key = ?", (key,))
+        self.misses += 1
+        return None
+
+    def set(self, key: str, value, ttl: float | None) -> None:
+        """Store a value; ttl of None means it never expires."""
+        now = time.time()
+        expires = now + ttl if ttl is not None else None
+        with self._connect() as db:
+            db.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires, accessed) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), expires, now),
+            )
+            db.execute(
+                "DELETE FROM cache WHERE key IN ("
+                "SELECT key FROM cache ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    def delete(self, key: str) -> None:
+        """Remove one entry if present."""
+        with self._connect() as db:
+            db.execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        with self._connect() as db:
+            db.execute("DELETE FROM cache")
+
+    def __len__(self) -> int:
+        with self._connect() as db:
+            return db.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Normalize a prompt for cache lookups: case and whitespace are ignored."""
+    return " ".join(prompt.lower().split())
+
+
+def response_key(prompt: str, memory_digest: str, provider: str, model: str) -> str:
+    """Cache key for a final agent response.
+
+    Args:
+        prompt: User prompt
+        memory_digest: MemorySnapshot.digest of the memory the answer was built from
+        provider: Provider (or route) name
+        model: Model name
+
+    Returns:
+        Hex digest key
+    """
+    parts = [normalize_prompt(prompt), memory_digest, provider, model]
+    return hashlib.sha256("\0".join(parts).encode()).hexdigest()
+
+
+_response_cache: MemoryCache | DiskCache | None = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> MemoryCache | DiskCache | None:
+    """Get the configured response cache, or None when EVA_RESPONSE_CACHE is off."""
+    global _response_cache
+    if RESPONSE_CACHE in ("", "off"):
+        return None
+    with _response_cache_lock:
+        if _response_cache is None:
+            if RESPONSE_CACHE == "disk":
+                _response_cache = DiskCache(CACHE_DIR / "responses.sqlite", RESPONSE_CACHE_SIZE)
+            else:
+                _response_cache = MemoryCache(RESPONSE_CACHE_SIZE)
+        return _response_cache
@@ -0,0 +1,130 @@
+"""Client registry for Eva - pooled LLM clients shared within a process."""
+import asyncio
+import os
+import threading
+import weakref
+
+import anthropic
+import httpx
+import openai
+
+# HTTP connection pool and timeout settings for LLM clients
+HTTP_POOL_SIZE = int(os.environ.get("EVA_HTTP_POOL_SIZE", "20"))
+HTTP_TIMEOUT = float(os.environ.get("EVA_HTTP_TIMEOUT", "120"))
+HTTP_CONNECT_TIMEOUT = float(os.environ.get("EVA_HTTP_CONNECT_TIMEOUT", "10"))
+
+# Clients keyed by event loop, then (provider, base_url); rebuilt after fork
+_async_clients: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+_lock = threading.RLock()
+_pid = os.getpid()
+
+# Long-lived event loop that sync callers submit agent coroutines to
+_loop: asyncio.AbstractEventLoop | None = None
+
+
+def _http_options() -> dict:
+    """Connection pool limits and timeouts for the underlying httpx client."""
+    return {
+        "limits": httpx.Limits(
+            max_connections=HTTP_POOL_SIZE,
+            max_keepalive_connections=HTTP_POOL_SIZE,
+        ),
+        "timeout": httpx.Timeout(HTTP_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT),
+    }
+
+
+def reset_clients() -> None:
+    """Drop all cached clients so the next lookup builds fresh ones.
+
+    Sockets inherited across fork() are not closed here: they still belong
+    to the parent, so the child simply forgets them.
+    """
+    global _pid, _loop
+    with _lock:
+        if _loop is not None and _pid == os.getpid():
+            _loop.call_soon_threadsafe(_loop.stop)
+        _async_clients.clear()
+        _loop = None
+        _pid = os.getpid()
+
+
+# gunicorn --preload forks after import; give each worker its own pools
+os.register_at_fork(after_in_child=reset_clients)
+
+
+def _get_or_create_async(key: tuple[str, str | None], factory):
+    """Return the cached async client for key on the running event loop."""
+    if os.getpid() != _pid:
+        reset_clients()
+    loop = asyncio.get_running_loop()
+    with _lock:
+        per_loop = _async_clients.setdefault(loop, {})
+        if key not in per_loop:
+            per_loop[key] = factory()
+        return per_loop[key]
+
+
+def background_loop() -> asyncio.AbstractEventLoop:
+    """Get the process-wide event loop used to run async work from sync code.
+
+    The loop runs forever on a daemon thread, so async clients created on it
+    keep their connection pools between calls. It is recreated after fork.
+
+    Returns:
+        A running event loop
+    """
+    global _loop
+    if os.getpid() != _pid:
+        reset_clients()
+    with _lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="eva-loop", daemon=True).start()
+        return _loop
+
+
+def run_sync(coro):
+    """Run a coroutine on the background loop and wait for its result.
+
+    Args:
+        coro: Coroutine to run
+
+    Returns:
+        The coroutine's return value
+    """
+    return asyncio.run_coroutine_threadsafe(coro, background_loop()).result()
+
+
+def get_async_anthropic_client() -> anthropic.AsyncAnthropic:
+    """Get the async Anthropic client for the running event loop.
+
+    Returns:
+        AsyncAnthropic client with a keep-alive connection pool
+    """
+    return _get_or_create_async(
+        ("anthropic", None),
+        lambda: anthropic.AsyncAnthropic(
+            http_client=anthropic.DefaultAsyncHttpxClient(**_http_options()),
+        ),
+    )
+
+
+def get_async_openai_client(provider: str, base_url: str, api_key: str | None) -> openai.AsyncOpenAI:
+    """Get the async client for an OpenAI-compatible provider on the running event loop.
+
+    Args:
+        provider: Provider name (nvidia, grok)
+        base_url: API base URL
+        api_key: API key used when the client is first created
+
+    Returns:
+        AsyncOpenAI client with a keep-alive connection pool
+    """
+    return _get_or_create_async(
+        (provider, base_url),
+        lambda: openai.AsyncOpenAI(
+            base_url=base_url,
+            api_key=api_key,
+            http_client=openai.DefaultAsyncHttpxClient(**_http_options()),
+        ),
+    )
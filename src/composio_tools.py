@@ -8,6 +8,8 @@ from bs4 import BeautifulSoup
 from googlesearch import search as google_search
 from composio import ComposioToolSet, Action
 
+from . import metrics
+
 # GitHub API configuration
 GITHUB_TOKEN = os.environ.get("GITHUB_TOKEN")
 GITHUB_API_BASE = "https://api.github.com"
@@ -18,6 +20,14 @@ def _get_toolset() -> ComposioToolSet:
     return ComposioToolSet(api_key=os.environ.get("COMPOSIO_API_KEY"))
 
 
+def _execute_action(action: Action, params: dict) -> dict:
+    """Run a Composio action, timing it under eva_composio_seconds."""
+    toolset = _get_toolset()
+    label = str(action)
+    with metrics.timed("eva_composio_seconds", errors="eva_composio_errors_total", action=label):
+        return toolset.execute_action(action=action, params=params)
+
+
 def fetch_emails(
     max_results: int = 10,
     query: str = "is:unread",
@@ -31,10 +41,9 @@ def fetch_emails(
     Returns:
         List of email dicts with id, subject, from, snippet
     """
-    toolset = _get_toolset()
-    result = toolset.execute_action(
-        action=Action.GMAIL_FETCH_EMAILS,
-        params={
+    result = _execute_action(
+        Action.GMAIL_FETCH_EMAILS,
+        {
             "max_results": max_results,
             "q": query,
             "user_id": "me",
@@ -55,13 +64,12 @@ def fetch_calendar_events(
     Returns:
         List of event dicts with id, summary, start, end
     """
-    toolset = _get_toolset()
     now = datetime.now(timezone.utc).replace(tzinfo=None)
     time_max = now + timedelta(hours=hours_ahead)
 
-    result = toolset.execute_action(
-        action=Action.GOOGLECALENDAR_FIND_EVENT,
-        params={
+    result = _execute_action(
+        Action.GOOGLECALENDAR_FIND_EVENT,
+        {
             "time_min": now.isoformat() + "Z",
             "time_max": time_max.isoformat() + "Z",
             "max_results": 10,
@@ -86,10 +94,9 @@ def send_email(
     Returns:
         True if sent successfully
     """
-    toolset = _get_toolset()
-    result = toolset.execute_action(
-        action=Action.GMAIL_SEND_EMAIL,
-        params={
+    result = _execute_action(
+        Action.GMAIL_SEND_EMAIL,
+        {
             "recipient_email": to_email,
             "subject": subject,
             "body": body,
@@ -0,0 +1,244 @@
+"""Context index module for Eva - parse context.md entries into a queryable SQLite index.
+
+The index lives next to context.md (memory/.context-index.db) and is
+brought up to date on every query. Appends are handled incrementally:
+only the last indexed entry and the bytes written after it are parsed
+again. A rewrite (e.g. archive_context) is detected and triggers a full
+rebuild.
+"""
+import hashlib
+import re
+import sqlite3
+from contextlib import closing
+from datetime import datetime
+from pathlib import Path
+
+from .retention import ENTRIES_MARKER, ENTRY_HEADING
+
+INDEX_FILE = ".context-index.db"
+# Bytes before the indexed end that must be unchanged for an incremental update
+TAIL_CHECK_BYTES = 256
+
+HEADING = re.compile(r"^### (\d{4}-\d{2}-\d{2} \d{2}:\d{2}) - \[([^\]\n]*)\][^\n]*\n?")
+FIELD = re.compile(r"^\*\*(Summary|Details|Follow-up):\*\*[ \t]*", re.MULTILINE)
+# Follow-ups written like this are not open
+CLOSED_FOLLOWUPS = ("", "none", "n/a", "-", "done")
+
+
+def parse_entry(text: str) -> dict | None:
+    """Parse one context.md entry into a record.
+
+    Args:
+        text: The entry, starting at its "### YYYY-MM-DD HH:MM - [Category]" heading
+
+    Returns:
+        Dict with timestamp, category, summary, details and followup
+        (missing fields are ""), or None if the heading does not parse
+    """
+    heading = HEADING.match(text)
+    if heading is None:
+        return None
+    record = {"timestamp": heading.group(1), "category": heading.group(2), "summary": "", "details": "", "followup": ""}
+    body = text[heading.end():]
+    fields = list(FIELD.finditer(body))
+    for field, next_field in zip(fields, fields[1:] + [None]):
+        end = next_field.start() if next_field else len(body)
+        key = {"Summary": "summary", "Details": "details", "Follow-up": "followup"}[field.group(1)]
+        record[key] = body[field.end():end].strip()
+    return record
+
+
+def is_open_followup(followup: str) -> bool:
+    """Whether a follow-up still needs doing (not empty, "None", "N/A" or "Done")."""
+    return followup.lower().rstrip(".") not in CLOSED_FOLLOWUPS
+
+
+def parse_entries(text: str) -> list[tuple[int, dict]]:
+    """Parse every entry in a piece of context.md.
+
+    Args:
+        text: Text starting at an entry heading (or a whole context.md)
+
+    Returns:
+        (character offset, record) pairs in file order
+    """
+    starts = [m.start() for m in ENTRY_HEADING.finditer(text)]
+    records = []
+    for start, end in zip(starts, starts[1:] + [len(text)]):
+        record = parse_entry(text[start:end])
+        if record is not None:
+            records.append((start, record))
+    return records
+
+
+def _stamp(value: datetime | str | None) -> str | None:
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d %H:%M")
+    return value
+
+
+class ContextIndex:
+    """SQLite index of the entries in one memory directory's context.md.
+
+    Each call opens its own short-lived connection, and updates run in an
+    IMMEDIATE transaction, so any thread or process can query it.
+    """
+
+    def __init__(self, memory_dir: Path, path: Path | None = None):
+        self.context_file = memory_dir / "context.md"
+        self.path = path or memory_dir / INDEX_FILE
+        with closing(self._connect()) as db:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "offset INTEGER PRIMARY KEY, timestamp TEXT NOT NULL, category TEXT NOT NULL, "
+                "summary TEXT NOT NULL, details TEXT NOT NULL, followup TEXT NOT NULL)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS entries_timestamp ON entries (timestamp)")
+            db.execute("CREATE INDEX IF NOT EXISTS entries_category ON entries (category, timestamp)")
+            db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value)")
+
+    def _connect(self) -> sqlite3.Connection:
+        db = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+        db.row_factory = sqlite3.Row
+        return db
+
+    def refresh(self) -> int:
+        """Bring the index up to date with context.md.
+
+        Returns:
+            Number of entries parsed (0 if the file had not changed)
+
+        Raises:
+            FileNotFoundError: If context.md does not exist
+        """
+        st = self.context_file.stat()
+        db = self._connect()
+        try:
+            db.execute("BEGIN IMMEDIATE")
+            meta = dict(db.execute("SELECT key, value FROM meta").fetchall())
+            if meta.get("size") == st.st_size and meta.get("mtime_ns") == st.st_mtime_ns:
+                db.execute("COMMIT")
+                return 0
+
+            with self.context_file.open("rb") as f:
+                start = self._resume_offset(f, meta, st.st_size)
+                f.seek(start)
+                data = f.read()
+            end = start + len(data)
+            if start == 0:
+                db.execute("DELETE FROM entries")
+                marker = data.find(ENTRIES_MARKER.encode())
+                start = marker + len(ENTRIES_MARKER.encode()) if marker != -1 else 0
+                data = data[start:]
+            else:
+                db.execute("DELETE FROM entries WHERE offset >= ?", (start,))
+
+            text = data.decode("utf-8", errors="replace")
+            records = parse_entries(text)
+            rows = []
+            # Byte offsets, advanced one segment at a time rather than by
+            # re-encoding the whole prefix for every entry
+            offset, previous = start, 0
+            for pos, r in records:
+                offset += len(text[previous:pos].encode())
+                previous = pos
+                rows.append((offset, r["timestamp"], r["category"], r["summary"], r["details"], r["followup"]))
+            db.executemany(
+                "INSERT OR REPLACE INTO entries (offset, timestamp, category, summary, details, followup) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            last = db.execute("SELECT MAX(offset) FROM entries").fetchone()[0]
+            with self.context_file.open("rb") as f:
+                f.seek(max(0, end - TAIL_CHECK_BYTES))
+                tail = f.read(end - max(0, end - TAIL_CHECK_BYTES))
+            db.executemany(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                [
+                    ("size", st.st_size),
+                    ("mtime_ns", st.st_mtime_ns),
+                    ("end", end),
+                    ("last_entry", last if last is not None else end),
+                    ("tail", hashlib.sha256(tail).hexdigest()),
+                ],
+            )
+            db.execute("COMMIT")
+            return len(records)
+        except BaseException:
+            if db.in_transaction:
+                db.execute("ROLLBACK")
+            raise
+        finally:
+            db.close()
+
+    def _resume_offset(self, f, meta: dict, size: int) -> int:
+        """Byte offset to parse from: the last indexed entry, or 0 to rebuild."""
+        end = meta.get("end")
+        if end is None or size < end:
+            return 0
+        begin = max(0, end - TAIL_CHECK_BYTES)
+        f.seek(begin)
+        if hashlib.sha256(f.read(end - begin)).hexdigest() != meta.get("tail"):
+            return 0  # Rewritten, not appended to
+        # Re-parse the last entry too: it may have been read mid-append
+        return meta.get("last_entry", end)
+
+    def query(
+        self,
+        category: str | None = None,
+        since: datetime | str | None = None,
+        until: datetime | str | None = None,
+        limit: int | None = None,
+    ) -> list[dict]:
+        """Entries matching a category and date range, newest first.
+
+        Args:
+            category: Only entries with this category (case-insensitive)
+            since: Only entries at or after this time
+            until: Only entries before this time
+            limit: Return at most this many
+
+        Returns:
+            List of entry records (see parse_entry)
+        """
+        self.refresh()
+        where, params = self._where(category, since, until)
+        sql = f"SELECT timestamp, category, summary, details, followup FROM entries{where} ORDER BY timestamp DESC, offset DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with closing(self._connect()) as db:
+            return [dict(row) for row in db.execute(sql, params)]
+
+    def counts(self, since: datetime | str | None = None, until: datetime | str | None = None) -> dict[str, int]:
+        """Number of entries per category in a date range."""
+        self.refresh()
+        where, params = self._where(None, since, until)
+        with closing(self._connect()) as db:
+            rows = db.execute(f"SELECT category, COUNT(*) FROM entries{where} GROUP BY category", params)
+            return {category: count for category, count in rows}
+
+    def open_followups(self, since: datetime | str | None = None, limit: int | None = None) -> list[dict]:
+        """Entries with a follow-up that is not empty, "None", "N/A" or "Done", newest first."""
+        self.refresh()
+        where, params = self._where(None, since, None)
+        where += " AND followup != ''" if where else " WHERE followup != ''"
+        sql = f"SELECT timestamp, category, summary, details, followup FROM entries{where} ORDER BY timestamp DESC, offset DESC"
+        with closing(self._connect()) as db:
+            rows = [dict(row) for row in db.execute(sql, params)]
+        open_items = [e for e in rows if is_open_followup(e["followup"])]
+        return open_items[:limit] if limit is not None else open_items
+
+    @staticmethod
+    def _where(category, since, until) -> tuple[str, list]:
+        clauses, params = [], []
+        if category is not None:
+            clauses.append("category = ? COLLATE NOCASE")
+            params.append(category)
+        if since is not None:
+            clauses.append("timestamp >= ?")
+            params.append(_stamp(since))
+        if until is not None:
+            clauses.append("timestamp < ?")
+            params.append(_stamp(until))
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
@@ -3,7 +3,11 @@ import argparse
 import sys
 from pathlib import Path
 
-from .agent import run_agent
+from . import metrics
+from .agent import Session, run_agent
+from .batch import DEFAULT_CONCURRENCY, format_summary, run_batch
+from .budget import AgentBudget
+from .retention import archive_context, format_report
 
 
 def _is_web_fetch(prompt: str) -> tuple[bool, str]:
@@ -28,11 +32,21 @@ def _is_web_fetch(prompt: str) -> tuple[bool, str]:
     return False, ""
 
 
-def interactive_mode(memory_dir: Path):
-    """Run Eva in interactive REPL mode."""
+def interactive_mode(memory_dir: Path, max_turns: int | None = None, timeout: float | None = None):
+    """Run Eva in interactive REPL mode.
+
+    All prompts share one Session, so follow-up questions see earlier
+    answers; '/reset' starts a new conversation.
+
+    Args:
+        memory_dir: Path to memory directory
+        max_turns: Maximum model calls per prompt (default: EVA_MAX_TURNS or 15)
+        timeout: Seconds allowed per prompt (default: EVA_TIMEOUT, if set)
+    """
     print("Eva - Private optimization engine")
-    print("Type 'exit' or 'quit' to leave, Ctrl+C to interrupt\n")
+    print("Type 'exit' or 'quit' to leave, '/reset' to start over, Ctrl+C to interrupt\n")
 
+    session = None
     while True:
         try:
             prompt = input("You: ").strip()
@@ -41,6 +55,11 @@ def interactive_mode(memory_dir: Path):
             if prompt.lower() in ("exit", "quit", "q"):
                 print("— Eva")
                 break
+            if prompt.lower() == "/reset":
+                if session is not None:
+                    session.reset()
+                print("Starting a new conversation.\n")
+                continue
 
             # Check if this is a web fetch request
             is_web, url = _is_web_fetch(prompt)
@@ -52,9 +71,24 @@ def interactive_mode(memory_dir: Path):
                 sys.stdout.flush()
                 continue
 
-            print("Thinking...", flush=True)
-            response = run_agent(prompt, memory_dir)
-            sys.stdout.write(f"\nEva: {response}\n\n")
+            sys.stdout.write("\nEva: ")
+            sys.stdout.flush()
+            # A fresh budget per prompt, so each one gets the full timeout
+            budget = AgentBudget.from_env(max_turns=max_turns, timeout=timeout)
+            if session is None:
+                session = Session(memory_dir)
+            streamed = False
+            for event in session.stream(prompt, budget=budget):
+                if event["type"] == "text":
+                    sys.stdout.write(event["text"])
+                    streamed = True
+                elif event["type"] == "tool_call":
+                    sys.stdout.write(f"[{event['name']}] ")
+                elif event["type"] == "done" and not streamed:
+                    # e.g. the budget ran out before the model said anything
+                    sys.stdout.write(event["text"])
+                sys.stdout.flush()
+            sys.stdout.write("\n\n")
             sys.stdout.flush()
         except KeyboardInterrupt:
             print("\n— Eva")
@@ -79,14 +113,79 @@ def main():
         default=Path("memory"),
         help="Path to memory directory",
     )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        help="Give up after this many seconds and return the best partial answer",
+    )
+    parser.add_argument(
+        "--max-turns",
+        type=int,
+        help="Maximum model calls per prompt (default: EVA_MAX_TURNS or 15)",
+    )
+    parser.add_argument(
+        "--batch",
+        type=Path,
+        help="Run every prompt in a JSONL file ({\"id\": ..., \"prompt\": ...} per line)",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help=f"Prompts run at once in batch mode (default: {DEFAULT_CONCURRENCY})",
+    )
+    parser.add_argument(
+        "--out",
+        type=Path,
+        help="Batch results file, appended to and resumed from (default: <batch>.results.jsonl)",
+    )
+    parser.add_argument(
+        "--archive-context",
+        action="store_true",
+        help="Move context.md entries older than EVA_CONTEXT_RETENTION_DAYS (30) to context-archive/ and exit",
+    )
+    parser.add_argument(
+        "--metrics",
+        action="store_true",
+        help="Print latency and token metrics to stderr when done (or set EVA_METRICS_SUMMARY=1)",
+    )
     args = parser.parse_args()
+    show_metrics = args.metrics or metrics.METRICS_SUMMARY
+
+    if args.archive_context:
+        try:
+            report = archive_context(args.memory_dir)
+        except OSError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        print(format_report(report))
+        return
+
+    if args.batch:
+        out = args.out or args.batch.with_suffix(".results.jsonl")
+        try:
+            summary = run_batch(
+                args.batch,
+                args.memory_dir,
+                out,
+                concurrency=args.concurrency,
+                max_turns=args.max_turns,
+                timeout=args.timeout,
+            )
+        except (OSError, ValueError) as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        print(format_summary(summary))
+        if show_metrics:
+            print(metrics.summary(), file=sys.stderr)
+        return
 
     # Join all args as prompt (allows: eva what should I do today)
     prompt = " ".join(args.prompt).strip() if args.prompt else ""
 
     if not prompt:
         # No prompt = interactive mode
-        interactive_mode(args.memory_dir)
+        interactive_mode(args.memory_dir, max_turns=args.max_turns, timeout=args.timeout)
         return
 
     # Check if this is a web fetch request
@@ -99,8 +198,14 @@ def main():
         return
 
     try:
-        response = run_agent(prompt, args.memory_dir)
+        if args.timeout or args.max_turns:
+            budget = AgentBudget.from_env(max_turns=args.max_turns, timeout=args.timeout)
+            response = run_agent(prompt, args.memory_dir, budget=budget)
+        else:
+            response = run_agent(prompt, args.memory_dir)
         print(response)
+        if show_metrics:
+            print(metrics.summary(), file=sys.stderr)
     except FileNotFoundError as e:
         print(f"Error: {e}", file=sys.stderr)
         sys.exit(1)
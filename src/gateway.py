@@ -1,12 +1,15 @@
 """Flask gateway for Eva webhooks and health checks."""
 import hashlib
 import hmac
+import json
 import os
 from pathlib import Path
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, stream_with_context
 
-from .agent import run_agent
+from . import metrics
+from .agent import run_agent, run_agent_stream
+from .budget import AgentBudget
 from .composio_tools import send_email
 from .workflows.base import sync_memory, push_memory
 from .memory import update_context
@@ -16,6 +19,8 @@ app = Flask(__name__)
 # Configuration from environment
 REPO_DIR = Path(os.environ.get("EVA_REPO_DIR", "/opt/eva"))
 MEMORY_DIR = REPO_DIR / "memory"
+# Wall-clock SLO for one /chat conversation, in seconds
+CHAT_TIMEOUT = float(os.environ.get("EVA_CHAT_TIMEOUT", "60"))
 
 
 def verify_signature(payload: bytes, signature: str, secret: str) -> bool:
@@ -106,6 +111,63 @@ def trigger_workflow():
         return jsonify({"error": "Unknown workflow", "valid": ["heartbeat", "morning_brief", "weekly_review"]}), 400
 
 
+@app.route("/chat", methods=["POST"])
+def chat():
+    """Run a prompt through Eva and stream the answer as Server-Sent Events.
+
+    POST /chat with JSON body: {"prompt": "...", "timeout": seconds (optional)}
+    Each SSE message carries one run_agent_stream event as JSON, under the
+    event's type (text, tool_call, compaction, done, error). The timeout is
+    capped at EVA_CHAT_TIMEOUT.
+    """
+    # Require a bearer token if one is configured
+    token = os.environ.get("EVA_CHAT_TOKEN", "")
+    if token and not hmac.compare_digest(
+        request.headers.get("Authorization", ""), f"Bearer {token}"
+    ):
+        return "Forbidden", 403
+
+    data = request.json or {}
+    prompt = (data.get("prompt") or "").strip()
+    if not prompt:
+        return jsonify({"error": "Missing prompt"}), 400
+
+    try:
+        timeout = min(float(data.get("timeout") or CHAT_TIMEOUT), CHAT_TIMEOUT)
+    except (TypeError, ValueError):
+        return jsonify({"error": "Invalid timeout"}), 400
+    budget = AgentBudget.from_env(timeout=timeout)
+
+    def generate():
+        try:
+            for event in run_agent_stream(prompt, MEMORY_DIR, budget=budget):
+                yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+        except Exception as e:
+            app.logger.error(f"Chat stream failed: {e}")
+            yield f"event: error\ndata: {json.dumps({'type': 'error', 'error': str(e)})}\n\n"
+        finally:
+            # The stream outlives the request, so flush once it is done
+            metrics.flush()
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.teardown_request
+def flush_metrics(exc):
+    """Publish this worker's metrics for /metrics on any worker to aggregate."""
+    metrics.flush()
+
+
+@app.route("/metrics", methods=["GET"])
+def metrics_endpoint():
+    """Prometheus metrics, summed across gunicorn workers via EVA_METRICS_DIR."""
+    return Response(metrics.render(metrics.collect()), mimetype="text/plain; version=0.0.4")
+
+
 @app.route("/health", methods=["GET"])
 def health():
     """Health check endpoint."""
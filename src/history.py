@@ -0,0 +1,190 @@
+"""History module for Eva - keep the agent loop's message list within a token budget."""
+import os
+
+from .memory import count_memory_tokens, count_tokens_batch
+
+# Tool-result tokens allowed in the message history before compaction kicks in
+HISTORY_TOKEN_BUDGET = int(os.environ.get("EVA_HISTORY_TOKEN_BUDGET", "12000"))
+
+# Most recent tool results that are always kept verbatim
+HISTORY_KEEP_RECENT = int(os.environ.get("EVA_HISTORY_KEEP_RECENT", "3"))
+
+# Tokens a multi-turn session keeps before its oldest exchanges are dropped
+SESSION_TOKEN_BUDGET = int(os.environ.get("EVA_SESSION_TOKEN_BUDGET", "60000"))
+
+# Characters of the original result kept in a stub as a reminder of what it was
+STUB_PREVIEW_CHARS = 160
+
+
+def _tool_rounds(messages: list) -> list[list[dict]]:
+    """Find tool result payloads in Anthropic or OpenAI message lists, oldest first.
+
+    Returns one list per tool round (the results answering one assistant
+    turn) of the dicts whose "content" holds the result: Anthropic
+    tool_result blocks inside a user message, or a run of OpenAI role=tool
+    messages.
+    """
+    rounds: list[list[dict]] = []
+    in_tool_run = False
+    for message in messages:
+        if not isinstance(message, dict):
+            in_tool_run = False
+            continue
+        if message.get("role") == "tool":
+            if not in_tool_run:
+                rounds.append([])
+            rounds[-1].append(message)
+            in_tool_run = True
+            continue
+        in_tool_run = False
+        if message.get("role") == "user" and isinstance(message.get("content"), list):
+            blocks = [
+                block for block in message["content"]
+                if isinstance(block, dict) and block.get("type") == "tool_result"
+            ]
+            if blocks:
+                rounds.append(blocks)
+    return rounds
+
+
+def _tool_results(messages: list) -> list[dict]:
+    """All tool result payloads across the history, oldest first."""
+    return [result for round_ in _tool_rounds(messages) for result in round_]
+
+
+def make_stub(content: str, tokens: int) -> str:
+    """Replace a tool result with a short reminder of what it contained.
+
+    Args:
+        content: Original tool result
+        tokens: Token count of the original result
+
+    Returns:
+        Stub text
+    """
+    preview = " ".join(content[:STUB_PREVIEW_CHARS].split())
+    return f"[Earlier tool result compacted ({tokens} tokens). Starts: {preview}... Call the tool again if you need it.]"
+
+
+class HistoryManager:
+    """Compacts old tool results once a conversation passes its token budget.
+
+    Tool results are where history grows (webpages, file contents), so only
+    they are compacted; user prompts and assistant turns are left intact.
+    """
+
+    def __init__(self, budget: int = HISTORY_TOKEN_BUDGET, keep_recent: int = HISTORY_KEEP_RECENT):
+        self.budget = budget
+        self.keep_recent = keep_recent
+        self.tokens_saved = 0
+        self.compactions = 0
+        # Token counts per result dict, keyed by id. Each entry also holds the
+        # dict, so its id cannot be reused by a new result while it is cached
+        self._counts: dict[int, tuple[dict, int]] = {}
+
+    def _count(self, result: dict) -> int:
+        return self._counts[id(result)][1]
+
+    def _count_new(self, results: list) -> None:
+        """Count every not yet counted result in one batch.
+
+        Results no longer in the history (e.g. dropped by trim_exchanges)
+        are forgotten, so the cache only ever holds the live results.
+        """
+        counts = {id(r): self._counts[id(r)] for r in results if id(r) in self._counts}
+        new = [r for r in results if id(r) not in counts]
+        for result, tokens in zip(new, count_tokens_batch([str(r.get("content", "")) for r in new])):
+            counts[id(result)] = (result, tokens)
+        self._counts = counts
+
+    def history_tokens(self, messages: list) -> int:
+        """Count tokens held in tool results across the history.
+
+        Args:
+            messages: Conversation message list
+
+        Returns:
+            Total tool-result tokens
+        """
+        results = _tool_results(messages)
+        self._count_new(results)
+        return sum(self._count(r) for r in results)
+
+    def compact(self, messages: list) -> int:
+        """Stub out the oldest tool results until the history fits the budget.
+
+        Modifies messages in place. Every result from the newest tool round,
+        and at least the newest keep_recent results, are never touched, so
+        the model always sees what it just asked for.
+
+        Args:
+            messages: Conversation message list
+
+        Returns:
+            Tokens saved by this compaction (0 if under budget)
+        """
+        rounds = _tool_rounds(messages)
+        results = [result for round_ in rounds for result in round_]
+        self._count_new(results)
+        total = sum(self._count(r) for r in results)
+        if total <= self.budget:
+            return 0
+
+        saved = 0
+        protected = max(self.keep_recent, len(rounds[-1]))
+        candidates = results[:-protected]
+        for result in candidates:
+            if total - saved <= self.budget:
+                break
+            before = self._count(result)
+            stub = make_stub(str(result.get("content", "")), before)
+            after = count_memory_tokens(stub)
+            if after >= before:
+                continue
+            result["content"] = stub
+            self._counts[id(result)] = (result, after)
+            saved += before - after
+
+        if saved:
+            self.tokens_saved += saved
+            self.compactions += 1
+        return saved
+
+
+def _message_text(message) -> str:
+    if not isinstance(message, dict):
+        return str(message)
+    return str(message.get("content") or "") + str(message.get("tool_calls") or "")
+
+
+def trim_exchanges(messages: list, budget: int = SESSION_TOKEN_BUDGET) -> int:
+    """Drop the oldest whole exchanges until a multi-turn conversation fits the budget.
+
+    An exchange runs from one user prompt (a user message with plain text
+    content) to the next, so tool calls are never split from their
+    results. An OpenAI system message and the newest exchange are kept.
+    Modifies messages in place.
+
+    Args:
+        messages: Conversation message list
+        budget: Maximum tokens across all messages
+
+    Returns:
+        Tokens dropped (0 if already within budget)
+    """
+    sizes = count_tokens_batch([_message_text(m) for m in messages])
+    total = sum(sizes)
+    starts = [
+        i for i, m in enumerate(messages)
+        if isinstance(m, dict) and m.get("role") == "user" and isinstance(m.get("content"), str)
+    ]
+    cut = None
+    dropped = 0
+    for start, next_start in zip(starts, starts[1:]):
+        if total - dropped <= budget:
+            break
+        dropped += sum(sizes[start:next_start])
+        cut = (starts[0], next_start)
+    if cut is not None:
+        del messages[cut[0]:cut[1]]
+    return dropped
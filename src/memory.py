@@ -1,11 +1,101 @@
 """Memory module for Eva - load and save memory files."""
+import fcntl
+import hashlib
+import mmap
+import os
+import sys
+import threading
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
 
-import tiktoken
+# Loading policies for memory files
+ALWAYS = "always"  # In every system prompt
+RETRIEVED = "retrieved"  # Sections added to a system prompt when relevant to it
+ON_DEMAND = "on_demand"  # Only read when the model asks, through read_memory
+POLICIES = (ALWAYS, RETRIEVED, ON_DEMAND)
 
-# Required memory files for Eva's identity and context
-MEMORY_FILES = ["soul", "user", "telos", "context", "harness"]
+# Newest context.md entries loaded into system prompts ("0" loads the whole file)
+CONTEXT_TAIL_ENTRIES = int(os.environ.get("EVA_CONTEXT_TAIL_ENTRIES", "50"))
+# Most tokens of context.md put in a system prompt
+CONTEXT_TOKEN_CAP = int(os.environ.get("EVA_CONTEXT_TOKEN_CAP", "4000"))
+
+# context.md entries are appended below this line; everything above it is its header
+ENTRIES_MARKER = "<!-- Eva appends entries below this line -->"
+# The marker is looked for only this far into context.md
+CONTEXT_HEADER_BYTES = 64 * 1024
+
+
+class MemoryFile:
+    """A memory file and how it gets into Eva's system prompt.
+
+    ALWAYS files are laid out by position: stable ones before the response
+    rules (and the prompt-caching breakpoint), the others after them, so
+    an edit to a frequently written file leaves the cached prefix intact.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        title: str,
+        policy: str = ALWAYS,
+        position: int = 50,
+        token_cap: int | None = None,
+        required: bool = False,
+        stable: bool = True,
+        newest_last: bool = False,
+        description: str = "",
+    ):
+        """
+        Args:
+            name: File name in memory/ (without .md extension)
+            title: Heading of its section in the system prompt
+            policy: ALWAYS, RETRIEVED or ON_DEMAND
+            position: Sort key of its section in the system prompt
+            token_cap: Most tokens of it put in a system prompt (None: all)
+            required: Loading memory fails if the file is missing
+            stable: Rarely changes, so it goes in the cached prefix
+            newest_last: Appended to at the end; a cap keeps the end
+            description: What it holds, for the read_memory tool
+
+        Raises:
+            ValueError: If policy is not one of POLICIES
+        """
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown memory policy {policy!r}, expected one of {POLICIES}")
+        self.name = name
+        self.title = title
+        self.policy = policy
+        self.position = position
+        self.token_cap = token_cap
+        self.required = required
+        self.stable = stable
+        self.newest_last = newest_last
+        self.description = description
+
+
+# Every memory file Eva knows about, by name
+MEMORY_REGISTRY: dict[str, MemoryFile] = {}
+
+
+def register_memory(spec: MemoryFile) -> MemoryFile:
+    """Add a memory file to the registry, replacing any of the same name.
+
+    Register before the first snapshot is loaded and before src.tools is
+    imported, which builds the read_memory schema from the registry.
+    """
+    MEMORY_REGISTRY[spec.name] = spec
+    invalidate_memory()
+    return spec
+
+
+def registered_memory(policy: str | None = None, required: bool | None = None) -> list[MemoryFile]:
+    """Registered memory files in prompt order, optionally filtered."""
+    specs = sorted(MEMORY_REGISTRY.values(), key=lambda spec: (spec.position, spec.name))
+    return [
+        spec for spec in specs
+        if (policy is None or spec.policy == policy) and (required is None or spec.required == required)
+    ]
 
 
 def load_memory_file(memory_dir: Path, name: str) -> str:
@@ -27,11 +117,13 @@ def load_memory_file(memory_dir: Path, name: str) -> str:
     return file_path.read_text()
 
 
-def load_all_memory(memory_dir: Path) -> dict[str, str]:
-    """Load all required memory files.
+def load_all_memory(memory_dir: Path, context_entries: int | None = None) -> dict[str, str]:
+    """Load every required memory file.
 
     Args:
         memory_dir: Path to memory directory
+        context_entries: Load only the newest this many context.md entries
+            (with its header) instead of the whole file
 
     Returns:
         Dict mapping memory name to content
@@ -39,11 +131,224 @@ def load_all_memory(memory_dir: Path) -> dict[str, str]:
     Raises:
         FileNotFoundError: If any required memory file is missing
     """
-    return {name: load_memory_file(memory_dir, name) for name in MEMORY_FILES}
+    return {
+        name: read_context_tail(memory_dir, entries=context_entries)
+        if name == "context" and context_entries is not None
+        else load_memory_file(memory_dir, name)
+        for name in (spec.name for spec in registered_memory(required=True))
+    }
+
+
+def read_context_tail(memory_dir: Path, entries: int | None = None, tokens: int | None = None) -> str:
+    """Read the newest entries of context.md without reading the rest.
+
+    The file is memory-mapped and entry boundaries ("\n### ") are found
+    by scanning backward from the end, so only the header and the entries
+    returned are decoded, however long the log has grown. Whole entries
+    are kept; the newest one is always included.
+
+    Args:
+        memory_dir: Path to memory directory
+        entries: Keep at most this many entries
+        tokens: Keep at most this many tokens of entries
+
+    Returns:
+        The header (up to ENTRIES_MARKER) followed by the newest entries,
+        or the whole file if nothing had to be left out. Without the
+        marker, a shortened file has no header.
+
+    Raises:
+        FileNotFoundError: If context.md does not exist
+    """
+    with (memory_dir / "context.md").open("rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return ""
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            marker = ENTRIES_MARKER.encode()
+            found = mm.find(marker, 0, min(size, CONTEXT_HEADER_BYTES))
+            floor = found + len(marker) if found != -1 else 0
+            start = size
+            kept = used = 0
+            while entries is None or kept < entries:
+                boundary = mm.rfind(b"\n### ", floor, start)
+                if boundary == -1:
+                    return mm[:].decode()
+                if tokens is not None:
+                    cost = count_memory_tokens(mm[boundary:start].decode())
+                    if kept and used + cost > tokens:
+                        break
+                    used += cost
+                start = boundary
+                kept += 1
+            header = mm[:floor] + b"\n" if found != -1 else b""
+            return (header + mm[start:]).decode()
+
+
+def memory_hash(memory: dict[str, str]) -> str:
+    """Stable content hash of a set of loaded memory files."""
+    digest = hashlib.sha256()
+    for name in sorted(memory):
+        digest.update(name.encode())
+        digest.update(b"\0")
+        digest.update(memory[name].encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class MemorySnapshot:
+    """Memory files as loaded at one point in time.
+
+    Snapshots are shared and must not be modified. Anything computed from
+    one (such as the system prompt) can be kept with derived() and is
+    reused until the files change and a new snapshot replaces it.
+    """
+
+    def __init__(self, files: dict[str, str], stamp: tuple | None):
+        self.files = files
+        self.stamp = stamp
+        self.digest = memory_hash(files)
+        self._derived: dict = {}
+        self._lock = threading.Lock()
+
+    def derived(self, key, build):
+        """Return build() computed once for this snapshot under key."""
+        with self._lock:
+            if key not in self._derived:
+                self._derived[key] = build()
+            return self._derived[key]
+
+
+_snapshots: dict[Path, MemorySnapshot] = {}
+_snapshots_lock = threading.Lock()
+
+
+def _memory_stamp(memory_dir: Path) -> tuple | None:
+    """(mtime_ns, size) of every memory file, or None if a required one is missing.
+
+    Optional files that do not exist are stamped None, so creating one
+    also counts as a change.
+    """
+    stamp = []
+    for spec in registered_memory():
+        try:
+            st = (memory_dir / f"{spec.name}.md").stat()
+        except FileNotFoundError:
+            if spec.required:
+                return None
+            stamp.append(None)
+            continue
+        stamp.append((st.st_mtime_ns, st.st_size))
+    return tuple(stamp)
+
+
+def _load_snapshot_files(memory_dir: Path) -> dict[str, str]:
+    """Required memory files (the tail of context.md) plus whichever optional ones exist, in prompt order."""
+    files = load_all_memory(memory_dir, context_entries=CONTEXT_TAIL_ENTRIES or None)
+    for spec in registered_memory(required=False):
+        try:
+            files[spec.name] = load_memory_file(memory_dir, spec.name)
+        except FileNotFoundError:
+            continue
+    return {spec.name: files[spec.name] for spec in registered_memory() if spec.name in files}
+
+
+def memory_snapshot(memory_dir: Path) -> MemorySnapshot:
+    """Load memory files, reusing the last snapshot if none has changed.
+
+    The snapshot holds every registered memory file that exists, in
+    prompt order; context.md is cut to its newest EVA_CONTEXT_TAIL_ENTRIES
+    entries.
+
+    Files are re-read when any mtime or size differs from the cached
+    snapshot, so edits made outside Eva (e.g. a git pull) are picked up on
+    the next call. Writes through update_context invalidate it directly.
+
+    Args:
+        memory_dir: Path to memory directory
+
+    Returns:
+        The current MemorySnapshot (the same object while nothing changes)
+
+    Raises:
+        FileNotFoundError: If any required memory file is missing
+    """
+    key = memory_dir.absolute()
+    # Stat before reading: a write during the read leaves a stale stamp,
+    # so the next call reads again rather than missing the change
+    stamp = _memory_stamp(memory_dir)
+    with _snapshots_lock:
+        snapshot = _snapshots.get(key)
+    if snapshot is not None and stamp is not None and snapshot.stamp == stamp:
+        return snapshot
+    snapshot = MemorySnapshot(_load_snapshot_files(memory_dir), stamp)
+    with _snapshots_lock:
+        _snapshots[key] = snapshot
+    return snapshot
+
+
+def invalidate_memory(memory_dir: Path | None = None) -> None:
+    """Drop the cached snapshot for memory_dir (every snapshot if None)."""
+    with _snapshots_lock:
+        if memory_dir is None:
+            _snapshots.clear()
+        else:
+            _snapshots.pop(memory_dir.absolute(), None)
+
+
+# Eva's own memory files. context.md changes after most conversations, so
+# it goes last, after the cached prefix, and a cap keeps its newest entries.
+register_memory(MemoryFile("soul", "Your Identity", position=0, token_cap=2000, required=True))
+register_memory(MemoryFile("user", "Your User", position=10, token_cap=2000, required=True))
+register_memory(MemoryFile("telos", "Your Purpose", position=20, token_cap=2000, required=True))
+register_memory(MemoryFile("harness", "Your Architecture (Self-Awareness)", position=30, token_cap=2000, required=True))
+register_memory(MemoryFile(
+    "context", "Recent Context", position=90, token_cap=CONTEXT_TOKEN_CAP, required=True, stable=False,
+    newest_last=True, description="rolling log of decisions, learnings and commitments",
+))
+register_memory(MemoryFile("work", "Work", policy=RETRIEVED, position=40, description="clients and projects"))
+register_memory(MemoryFile(
+    "ecosystem", "Agent Ecosystem", policy=ON_DEMAND, position=50, description="agent frameworks and tooling",
+))
+
+
+# "tiktoken" counts exactly; "estimate" skips loading the encoder and
+# guesses from the length, which is enough for budget checks
+TOKEN_COUNTER = os.environ.get("EVA_TOKEN_COUNTER", "tiktoken").lower()
+# Average characters per cl100k_base token in English text, for estimates
+CHARS_PER_TOKEN = 4
+
+_encoder = None
+_encoder_failed = False
+_encoder_lock = threading.Lock()
+
+
+def _get_encoder():
+    """The cl100k_base encoder, loaded on first use; None if estimating.
+
+    Loading parses the BPE file (and downloads it the first time), so it
+    is deferred until a token is actually counted. If it cannot be loaded,
+    e.g. offline with no cached BPE file, counts fall back to estimates.
+    """
+    global _encoder, _encoder_failed
+    if TOKEN_COUNTER == "estimate" or _encoder_failed:
+        return None
+    if _encoder is None:
+        with _encoder_lock:
+            if _encoder is None and not _encoder_failed:
+                try:
+                    import tiktoken
 
+                    _encoder = tiktoken.get_encoding("cl100k_base")
+                except Exception as e:
+                    print(f"Warning: tiktoken unavailable ({e}); estimating token counts", file=sys.stderr)
+                    _encoder_failed = True
+    return _encoder
 
-# Initialize encoder once for efficiency
-_encoder = tiktoken.get_encoding("cl100k_base")
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the token count of text from its length, without an encoder."""
+    return -(-len(text) // CHARS_PER_TOKEN)
 
 
 def count_memory_tokens(text: str) -> int:
@@ -53,9 +358,132 @@ def count_memory_tokens(text: str) -> int:
         text: Text to count tokens in
 
     Returns:
-        Number of tokens
+        Number of tokens (estimated with EVA_TOKEN_COUNTER=estimate, or if
+        the encoder cannot be loaded)
+    """
+    encoder = _get_encoder()
+    if encoder is None:
+        return estimate_tokens(text)
+    return len(encoder.encode(text, disallowed_special=()))
+
+
+def count_tokens_batch(texts: list[str]) -> list[int]:
+    """Count tokens in many texts at once (encoded in parallel by tiktoken).
+
+    Args:
+        texts: Texts to count tokens in
+
+    Returns:
+        Token count per text, in order
+    """
+    encoder = _get_encoder()
+    if encoder is None:
+        return [estimate_tokens(text) for text in texts]
+    if len(texts) < 2:
+        return [len(encoder.encode(text, disallowed_special=())) for text in texts]
+    return [len(tokens) for tokens in encoder.encode_batch(texts, disallowed_special=())]
+
+
+def truncate_tokens(text: str, tokens: int, from_end: bool = False) -> str:
+    """Cut text to at most tokens tokens, at a line (or word) boundary.
+
+    Args:
+        text: Text to cut
+        tokens: Most tokens to keep
+        from_end: Keep the end of the text instead of the start
+
+    Returns:
+        text unchanged if it fits, otherwise its first (or last) whole
+        lines that do (whole words if even one line is too long)
+    """
+    if tokens <= 0:
+        return ""
+    encoder = _get_encoder()
+    if encoder is None:
+        if estimate_tokens(text) <= tokens:
+            return text
+        chars = tokens * CHARS_PER_TOKEN
+        cut = text[-chars:] if from_end else text[:chars]
+    else:
+        ids = encoder.encode(text, disallowed_special=())
+        if len(ids) <= tokens:
+            return text
+        cut = encoder.decode(ids[-tokens:] if from_end else ids[:tokens])
+    # Prefer a line boundary, then a word boundary
+    for separator in ("\n", " "):
+        at = cut.find(separator) if from_end else cut.rfind(separator)
+        if at != -1:
+            return cut[at + 1:] if from_end else cut[:at]
+    return cut
+
+
+@contextmanager
+def context_lock(memory_dir: Path):
+    """Hold the exclusive lock that serialises writes to context.md.
+
+    Uses flock on memory/.context.lock, so it works across threads and
+    processes (gateway workers, workflows, the CLI).
+    """
+    with (memory_dir / ".context.lock").open("a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def format_entry(
+    category: str,
+    summary: str,
+    details: str,
+    followup: str | None = None,
+    timestamp: datetime | None = None,
+) -> str:
+    """Format one context.md entry.
+
+    Args:
+        category: Entry category (Decision, Learning, Commitment, etc.)
+        summary: One-line summary
+        details: Full details of the entry
+        followup: Optional follow-up action
+        timestamp: When it happened (defaults to now)
+
+    Returns:
+        The entry text, starting with a blank line
     """
-    return len(_encoder.encode(text))
+    stamp = (timestamp or datetime.now()).strftime("%Y-%m-%d %H:%M")
+    entry = f"\n### {stamp} - [{category}]\n"
+    entry += f"**Summary:** {summary}\n"
+    entry += f"**Details:** {details}\n"
+    if followup:
+        entry += f"**Follow-up:** {followup}\n"
+    return entry
+
+
+def append_entries(memory_dir: Path, entries: list[str]) -> None:
+    """Append formatted entries to context.md in one locked, durable write.
+
+    The entries go out in a single write() on an O_APPEND descriptor while
+    context_lock is held, so writers in other threads and processes never
+    interleave with them, and are fsynced before returning.
+
+    Args:
+        memory_dir: Path to memory directory
+        entries: Entries from format_entry, oldest first
+    """
+    if not entries:
+        return
+    data = "".join(entries).encode()
+    with context_lock(memory_dir):
+        fd = os.open(memory_dir / "context.md", os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            view = memoryview(data)
+            while view:
+                view = view[os.write(fd, view):]
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+    invalidate_memory(memory_dir)
 
 
 def update_context(
@@ -74,14 +502,58 @@ def update_context(
         details: Full details of the entry
         followup: Optional follow-up action
     """
-    context_file = memory_dir / "context.md"
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M")
+    append_entries(memory_dir, [format_entry(category, summary, details, followup)])
 
-    entry = f"\n### {timestamp} - [{category}]\n"
-    entry += f"**Summary:** {summary}\n"
-    entry += f"**Details:** {details}\n"
-    if followup:
-        entry += f"**Follow-up:** {followup}\n"
 
-    with context_file.open("a") as f:
-        f.write(entry)
+class ContextBuffer:
+    """Collects context.md entries in memory and appends them as a group.
+
+    Each flush is one append_entries call: one lock, one write and one
+    fsync for the whole group. Entries are flushed when max_entries are
+    waiting, on flush(), and when used as a context manager, on exit.
+    Entries not yet flushed are lost if the process dies, so use it for
+    bursts of writes (e.g. batch runs), not for single tool calls.
+    """
+
+    def __init__(self, memory_dir: Path, max_entries: int = 32):
+        self.memory_dir = memory_dir
+        self.max_entries = max_entries
+        self._entries: list[str] = []
+        self._lock = threading.Lock()
+        # Held across take-and-write, so groups reach the file in order
+        self._flush_lock = threading.Lock()
+
+    def add(
+        self,
+        category: str,
+        summary: str,
+        details: str,
+        followup: str | None = None,
+    ) -> None:
+        """Queue an entry, timestamped now; flushes once max_entries are waiting."""
+        with self._lock:
+            self._entries.append(format_entry(category, summary, details, followup))
+            full = len(self._entries) >= self.max_entries
+        if full:
+            self.flush()
+
+    def flush(self) -> int:
+        """Append every queued entry to context.md.
+
+        Returns:
+            Number of entries written
+        """
+        with self._flush_lock:
+            with self._lock:
+                entries, self._entries = self._entries, []
+            append_entries(self.memory_dir, entries)
+        return len(entries)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __enter__(self) -> "ContextBuffer":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.flush()
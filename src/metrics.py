@@ -0,0 +1,216 @@
+"""Metrics module for Eva - latency histograms and counters in Prometheus format.
+
+Each process keeps its own counters and histograms in memory. When
+EVA_METRICS_DIR is set (the gateway runs several gunicorn workers), every
+process also writes a snapshot file there, and collect() sums the
+snapshots of all processes so any worker can serve the whole picture.
+"""
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+# Shared directory for per-process snapshots; unset keeps metrics in-process
+METRICS_DIR = os.environ.get("EVA_METRICS_DIR", "")
+# Print a metrics summary to stderr after CLI runs
+METRICS_SUMMARY = os.environ.get("EVA_METRICS_SUMMARY", "").lower() in ("1", "true", "yes")
+
+# Histogram upper bounds: seconds for latencies, counts for agent turns
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, math.inf)
+TURN_BUCKETS = (1, 2, 3, 4, 6, 8, 12, 16, math.inf)
+
+# Help text for every metric Eva records
+DESCRIPTIONS = {
+    "eva_llm_request_seconds": "Model call latency, whole response including any streaming",
+    "eva_llm_errors_total": "Model calls that raised",
+    "eva_llm_tokens_total": "Tokens reported by providers, by type",
+    "eva_agent_turns": "Model calls per conversation",
+    "eva_agent_conversation_seconds": "Wall-clock time per conversation",
+    "eva_agent_conversations_total": "Conversations, by how they ended",
+    "eva_tool_seconds": "execute_tool latency, including memoized hits",
+    "eva_tool_errors_total": "Tool calls that failed",
+    "eva_prefetch_total": "Speculative tool calls, by whether the model used them",
+    "eva_git_seconds": "git subprocess latency in memory sync",
+    "eva_composio_seconds": "Composio action latency",
+    "eva_composio_errors_total": "Composio actions that raised",
+}
+
+
+def _key(name: str, labels: dict) -> str:
+    return json.dumps([name, sorted(labels.items())])
+
+
+class Registry:
+    """Counters and histograms for one process."""
+
+    def __init__(self):
+        self.counters: dict[str, float] = {}
+        self.histograms: dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, name: str, value: float = 1, **labels) -> None:
+        """Add to a counter."""
+        key = _key(name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float, buckets: tuple = LATENCY_BUCKETS, **labels) -> None:
+        """Record one observation in a histogram."""
+        key = _key(name, labels)
+        with self._lock:
+            hist = self.histograms.get(key)
+            if hist is None:
+                hist = {"le": list(buckets), "counts": [0] * len(buckets), "sum": 0.0, "count": 0}
+                self.histograms[key] = hist
+            index = next(i for i, bound in enumerate(hist["le"]) if value <= bound)
+            hist["counts"][index] += 1
+            hist["sum"] += value
+            hist["count"] += 1
+
+    def snapshot(self) -> dict:
+        """JSON-serialisable copy of every metric."""
+        with self._lock:
+            return {
+                "counters": dict(self.counters),
+                "histograms": {
+                    k: {**h, "le": [str(b) for b in h["le"]], "counts": list(h["counts"])}
+                    for k, h in self.histograms.items()
+                },
+            }
+
+    def reset(self) -> None:
+        """Drop every metric."""
+        with self._lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+
+# Metrics recorded by this process
+REGISTRY = Registry()
+
+
+def inc(name: str, value: float = 1, **labels) -> None:
+    """Add to a counter in the process registry."""
+    REGISTRY.inc(name, value, **labels)
+
+
+def observe(name: str, value: float, buckets: tuple = LATENCY_BUCKETS, **labels) -> None:
+    """Record a histogram observation in the process registry."""
+    REGISTRY.observe(name, value, buckets, **labels)
+
+
+@contextmanager
+def timed(name: str, errors: str | None = None, **labels):
+    """Time a block into a latency histogram, counting exceptions in errors."""
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        if errors:
+            inc(errors, **labels)
+        raise
+    finally:
+        observe(name, time.perf_counter() - start, **labels)
+
+
+def flush() -> None:
+    """Write this process's snapshot to EVA_METRICS_DIR, if set."""
+    if not METRICS_DIR:
+        return
+    directory = Path(METRICS_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"metrics-{os.getpid()}.json"
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(REGISTRY.snapshot()))
+    tmp.replace(path)
+
+
+def merge(snapshots: list[dict]) -> dict:
+    """Sum counters and histogram buckets across process snapshots."""
+    merged = {"counters": {}, "histograms": {}}
+    for snap in snapshots:
+        for key, value in snap.get("counters", {}).items():
+            merged["counters"][key] = merged["counters"].get(key, 0) + value
+        for key, hist in snap.get("histograms", {}).items():
+            total = merged["histograms"].get(key)
+            if total is None or total["le"] != hist["le"]:
+                merged["histograms"][key] = {**hist, "counts": list(hist["counts"])}
+                continue
+            total["counts"] = [a + b for a, b in zip(total["counts"], hist["counts"])]
+            total["sum"] += hist["sum"]
+            total["count"] += hist["count"]
+    return merged
+
+
+def collect() -> dict:
+    """Metrics from every process sharing EVA_METRICS_DIR (or just this one)."""
+    if not METRICS_DIR:
+        return REGISTRY.snapshot()
+    flush()
+    snapshots = []
+    for path in Path(METRICS_DIR).glob("metrics-*.json"):
+        try:
+            snapshots.append(json.loads(path.read_text()))
+        except (OSError, json.JSONDecodeError):
+            continue  # Being replaced by its worker right now
+    return merge(snapshots)
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(pairs: list, extra: dict | None = None) -> str:
+    items = [tuple(pair) for pair in pairs] + list((extra or {}).items())
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in items) + "}"
+
+
+def render(snapshot: dict) -> str:
+    """Render a snapshot in the Prometheus text exposition format."""
+    series: dict[str, list[str]] = {}
+    kinds: dict[str, str] = {}
+    for key, value in sorted(snapshot["counters"].items()):
+        name, pairs = json.loads(key)
+        kinds[name] = "counter"
+        series.setdefault(name, []).append(f"{name}{_labels(pairs)} {_number(value)}")
+    for key, hist in sorted(snapshot["histograms"].items()):
+        name, pairs = json.loads(key)
+        kinds[name] = "histogram"
+        lines = series.setdefault(name, [])
+        running = 0
+        for bound, count in zip(hist["le"], hist["counts"]):
+            running += count
+            le = "+Inf" if float(bound) == math.inf else f"{float(bound):g}"
+            lines.append(f"{name}_bucket{_labels(pairs, {'le': le})} {running}")
+        lines.append(f"{name}_sum{_labels(pairs)} {_number(hist['sum'])}")
+        lines.append(f"{name}_count{_labels(pairs)} {hist['count']}")
+
+    out = []
+    for name in sorted(series):
+        out.append(f"# HELP {name} {DESCRIPTIONS.get(name, name)}")
+        out.append(f"# TYPE {name} {kinds[name]}")
+        out.extend(series[name])
+    return "\n".join(out) + "\n"
+
+
+def summary(snapshot: dict | None = None) -> str:
+    """Short human-readable summary for the CLI (stderr)."""
+    snapshot = snapshot or REGISTRY.snapshot()
+    lines = []
+    for key, hist in sorted(snapshot["histograms"].items()):
+        name, pairs = json.loads(key)
+        mean = hist["sum"] / hist["count"] if hist["count"] else 0.0
+        lines.append(f"{name}{_labels(pairs)}: n={hist['count']} total={hist['sum']:.3f} mean={mean:.3f}")
+    for key, value in sorted(snapshot["counters"].items()):
+        name, pairs = json.loads(key)
+        lines.append(f"{name}{_labels(pairs)}: {_number(value)}")
+    return "\n".join(lines)
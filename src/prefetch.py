@@ -0,0 +1,111 @@
+"""Prefetch module for Eva - start likely tool calls while the model is thinking."""
+import os
+import re
+import time
+from concurrent.futures import Future
+from pathlib import Path
+
+from . import metrics
+from .tools import execute_tool, run_in_thread
+
+# Speculatively fetch URLs and GitHub repos named in the prompt ("0" disables)
+PREFETCH = os.environ.get("EVA_PREFETCH", "1").lower() not in ("0", "false", "no", "off")
+# Most targets prefetched for one prompt
+PREFETCH_MAX = int(os.environ.get("EVA_PREFETCH_MAX", "3"))
+
+URL = re.compile(r"https?://[^\s<>\"'`]+")
+GITHUB_REPO = re.compile(r"(?:https?://)?(?:www\.)?github\.com/([\w.-]+)/([\w.-]+)", re.IGNORECASE)
+# Prefetches omit max_chars, so only calls that omit it too can use them
+DEFAULT_MAX_CHARS = None
+
+
+def find_targets(prompt: str) -> list[tuple[str, dict]]:
+    """Find the tool calls a prompt is likely to trigger.
+
+    GitHub repository references become github_get_repo calls; other
+    http(s) URLs become fetch_webpage calls.
+
+    Args:
+        prompt: User prompt
+
+    Returns:
+        (name, args) pairs, in order of appearance, without duplicates
+    """
+    targets: list[tuple[str, dict]] = []
+    for match in GITHUB_REPO.finditer(prompt):
+        repo = match.group(2).removesuffix(".git").rstrip(".")
+        targets.append(("github_get_repo", {"owner": match.group(1), "repo": repo}))
+    for match in URL.finditer(prompt):
+        url = match.group(0).rstrip(".,;:!?)]}")
+        if "github.com" not in url.lower():
+            targets.append(("fetch_webpage", {"url": url}))
+
+    unique = []
+    seen = set()
+    for name, args in targets:
+        key = target_key(name, args)
+        if key not in seen:
+            seen.add(key)
+            unique.append((name, args))
+    return unique[:PREFETCH_MAX]
+
+
+def target_key(name: str, args: dict) -> tuple | None:
+    """Key that matches a model's tool call to a prefetched one, or None if unmatchable."""
+    if name == "fetch_webpage" and args.get("max_chars", DEFAULT_MAX_CHARS) == DEFAULT_MAX_CHARS:
+        return (name, str(args.get("url", "")).rstrip("/"))
+    if name == "github_get_repo":
+        return (name, str(args.get("owner", "")).lower(), str(args.get("repo", "")).lower())
+    return None
+
+
+class Prefetcher:
+    """Runs speculative tool calls for one conversation on daemon threads.
+
+    Results are handed to the first matching tool call via claim(); close()
+    cancels whatever was never claimed and counts it in eva_prefetch_total.
+    A call already running when it is cancelled is abandoned, like a timed
+    out tool call (see agent.execute_tool_calls).
+    """
+
+    def __init__(self, memory_dir: Path):
+        self.memory_dir = memory_dir
+        self.tasks: dict[tuple, tuple[str, Future, float]] = {}
+        self.claimed: set[tuple] = set()
+        self.counts = {"used": 0, "wasted": 0, "cancelled": 0}
+
+    def start(self, targets: list[tuple[str, dict]]) -> None:
+        """Start each target's tool call on a daemon thread."""
+        for name, args in targets:
+            key = target_key(name, args)
+            if key is not None and key not in self.tasks:
+                future = run_in_thread(execute_tool, name, args, self.memory_dir, name=f"eva-prefetch-{name}")
+                self.tasks[key] = (name, future, time.monotonic())
+
+    def claim(self, name: str, args: dict) -> tuple[Future, float] | None:
+        """Take the prefetched call matching a tool call, if there is one.
+
+        Each prefetch is handed out once; a repeated call runs normally.
+
+        Returns:
+            (future, time.monotonic() it started at), or None
+        """
+        key = target_key(name, args)
+        if key not in self.tasks or key in self.claimed:
+            return None
+        self.claimed.add(key)
+        return self.tasks[key][1:]
+
+    def close(self) -> None:
+        """Cancel unclaimed prefetches and record what happened to each. Idempotent."""
+        for key, (name, future, _) in self.tasks.items():
+            if key in self.claimed:
+                outcome = "used"
+            elif future.done():
+                outcome = "wasted"
+            else:
+                outcome = "cancelled"
+                future.cancel()
+            self.counts[outcome] += 1
+            metrics.inc("eva_prefetch_total", tool=name, outcome=outcome)
+        self.tasks.clear()
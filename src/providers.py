@@ -0,0 +1,265 @@
+"""Provider adapters for Eva - one async interface over each LLM API."""
+import json
+import os
+from collections.abc import AsyncIterator
+
+from .clients import get_async_anthropic_client, get_async_openai_client
+
+
+def new_usage() -> dict[str, int]:
+    """Create an empty token usage accumulator for run_agent."""
+    return {
+        "input_tokens": 0,
+        "output_tokens": 0,
+        "cache_creation_input_tokens": 0,
+        "cache_read_input_tokens": 0,
+    }
+
+
+class ToolCall:
+    """A tool the model asked to run."""
+
+    def __init__(self, id: str, name: str, input: dict):
+        self.id = id
+        self.name = name
+        self.input = input
+
+
+class Turn:
+    """One completed model response, normalised across providers."""
+
+    def __init__(self, text: str, tool_calls: list[ToolCall], message, usage: dict[str, int]):
+        self.text = text
+        self.tool_calls = tool_calls
+        self.message = message  # Provider-native assistant message, re-sent next turn
+        self.usage = usage
+
+
+class ProviderAdapter:
+    """Interface each LLM provider implements for the agent loop.
+
+    The loop owns the conversation; an adapter only knows how to start a
+    message list, call the model once, and append tool results in its
+    provider's wire format.
+    """
+
+    name = ""
+
+    def start(self, system, prompt: str) -> list:
+        """Build the initial message list for a conversation."""
+        raise NotImplementedError
+
+    async def complete(self, system, messages: list) -> Turn:
+        """Call the model once and return its full response."""
+        raise NotImplementedError
+
+    async def stream(self, system, messages: list) -> AsyncIterator:
+        """Call the model once, yielding text events and finally the Turn."""
+        raise NotImplementedError
+        yield
+
+    def add_results(self, messages: list, turn: Turn, results: list[str]) -> None:
+        """Append the assistant turn and its tool results to the conversation."""
+        raise NotImplementedError
+
+
+class AnthropicAdapter(ProviderAdapter):
+    """Adapter for the Anthropic Messages API."""
+
+    name = "anthropic"
+
+    def __init__(self, model: str, max_tokens: int, tools: list, prompt_cache: bool = False):
+        self.model = model
+        self.max_tokens = max_tokens
+        self.prompt_cache = prompt_cache
+        if prompt_cache and tools:
+            # Mark the end of the tool list as a prompt-cache breakpoint
+            tools = tools[:-1] + [{**tools[-1], "cache_control": {"type": "ephemeral"}}]
+        self.tools = tools
+
+    def _request(self, system, messages: list) -> dict:
+        return {
+            "model": self.model,
+            "max_tokens": self.max_tokens,
+            "system": system,
+            "tools": self.tools,
+            "messages": messages,
+        }
+
+    @staticmethod
+    def _turn(response) -> Turn:
+        usage = new_usage()
+        for key in usage:
+            # Cache fields are None when caching is not in play
+            value = getattr(response.usage, key, None)
+            if isinstance(value, int):
+                usage[key] = value
+        return Turn(
+            text="".join(b.text for b in response.content if b.type == "text"),
+            tool_calls=[
+                ToolCall(b.id, b.name, b.input) for b in response.content if b.type == "tool_use"
+            ],
+            message=response.content,
+            usage=usage,
+        )
+
+    def start(self, system, prompt: str) -> list:
+        return [{"role": "user", "content": prompt}]
+
+    async def complete(self, system, messages: list) -> Turn:
+        client = get_async_anthropic_client()
+        response = await client.messages.create(**self._request(system, messages))
+        return self._turn(response)
+
+    async def stream(self, system, messages: list) -> AsyncIterator:
+        client = get_async_anthropic_client()
+        async with client.messages.stream(**self._request(system, messages)) as stream:
+            async for text in stream.text_stream:
+                yield {"type": "text", "text": text}
+            response = await stream.get_final_message()
+        yield self._turn(response)
+
+    def add_results(self, messages: list, turn: Turn, results: list[str]) -> None:
+        messages.append({"role": "assistant", "content": turn.message})
+        messages.append({
+            "role": "user",
+            "content": [
+                {"type": "tool_result", "tool_use_id": call.id, "content": result}
+                for call, result in zip(turn.tool_calls, results)
+            ],
+        })
+
+
+class OpenAICompatibleAdapter(ProviderAdapter):
+    """Adapter for OpenAI-style chat completion APIs (NVIDIA, Grok)."""
+
+    def __init__(
+        self,
+        name: str,
+        base_url: str,
+        api_key_env: str,
+        model: str,
+        max_tokens: int,
+        tools: list,
+    ):
+        self.name = name
+        self.base_url = base_url
+        self.api_key_env = api_key_env
+        self.model = model
+        self.max_tokens = max_tokens
+        self.tools = tools
+
+    def _client(self):
+        return get_async_openai_client(self.name, self.base_url, os.environ.get(self.api_key_env))
+
+    def _request(self, messages: list) -> dict:
+        return {
+            "model": self.model,
+            "max_tokens": self.max_tokens,
+            "messages": messages,
+            "tools": self.tools,
+            "tool_choice": "auto",
+        }
+
+    @staticmethod
+    def _usage(response_usage) -> dict[str, int]:
+        usage = new_usage()
+        if not isinstance(getattr(response_usage, "prompt_tokens", None), int):
+            return usage
+        details = getattr(response_usage, "prompt_tokens_details", None)
+        cached = getattr(details, "cached_tokens", None) or 0
+        usage["input_tokens"] = response_usage.prompt_tokens - cached
+        usage["output_tokens"] = response_usage.completion_tokens or 0
+        usage["cache_read_input_tokens"] = cached
+        return usage
+
+    def start(self, system, prompt: str) -> list:
+        return [
+            {"role": "system", "content": system},
+            {"role": "user", "content": prompt},
+        ]
+
+    async def complete(self, system, messages: list) -> Turn:
+        response = await self._client().chat.completions.create(**self._request(messages))
+        message = response.choices[0].message
+        text = message.content
+        # Kimi K2.5 is a reasoning model - content may be in reasoning_content
+        if not text and not message.tool_calls and hasattr(message, "reasoning_content"):
+            text = message.reasoning_content
+        return Turn(
+            text=text or "",
+            tool_calls=[
+                ToolCall(tc.id, tc.function.name, json.loads(tc.function.arguments))
+                for tc in message.tool_calls or []
+            ],
+            message=message,
+            usage=self._usage(response.usage),
+        )
+
+    async def stream(self, system, messages: list) -> AsyncIterator:
+        # Without include_usage the stream carries no token counts at all
+        stream = await self._client().chat.completions.create(
+            **self._request(messages), stream=True, stream_options={"include_usage": True}
+        )
+
+        content = []
+        reasoning = []
+        usage = new_usage()
+        fragments: dict[int, dict] = {}
+        async for chunk in stream:
+            # Some providers report usage on a final, choice-less chunk
+            chunk_usage = self._usage(getattr(chunk, "usage", None))
+            if any(chunk_usage.values()):
+                usage = chunk_usage
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta
+            if delta.content:
+                content.append(delta.content)
+                yield {"type": "text", "text": delta.content}
+            # Kimi K2.5 streams its reasoning separately from the answer
+            if getattr(delta, "reasoning_content", None):
+                reasoning.append(delta.reasoning_content)
+            for tc in delta.tool_calls or []:
+                call = fragments.setdefault(tc.index, {"id": "", "name": "", "arguments": ""})
+                if tc.id:
+                    call["id"] = tc.id
+                if tc.function and tc.function.name:
+                    call["name"] += tc.function.name
+                if tc.function and tc.function.arguments:
+                    call["arguments"] += tc.function.arguments
+
+        ordered = [fragments[i] for i in sorted(fragments)]
+        text = "".join(content)
+        if not text and not ordered and reasoning:
+            text = "".join(reasoning)
+            yield {"type": "text", "text": text}
+
+        yield Turn(
+            text=text,
+            tool_calls=[
+                ToolCall(c["id"], c["name"], json.loads(c["arguments"] or "{}")) for c in ordered
+            ],
+            message={
+                "role": "assistant",
+                "content": "".join(content) or None,
+                "tool_calls": [
+                    {
+                        "id": c["id"],
+                        "type": "function",
+                        "function": {"name": c["name"], "arguments": c["arguments"]},
+                    }
+                    for c in ordered
+                ],
+            },
+            usage=usage,
+        )
+
+    def add_results(self, messages: list, turn: Turn, results: list[str]) -> None:
+        messages.append(turn.message)
+        for call, result in zip(turn.tool_calls, results):
+            messages.append({
+                "role": "tool",
+                "tool_call_id": call.id,
+                "content": result,
+            })
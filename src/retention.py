@@ -0,0 +1,148 @@
+"""Retention module for Eva - archive old context.md entries to monthly files.
+
+context.md's newest entries go into every system prompt and the whole
+file is read by the workflows, so it is kept to the last
+EVA_CONTEXT_RETENTION_DAYS of entries. Older entries move to
+memory/context-archive/YYYY-MM.md, as its Retention Policy section says.
+"""
+import os
+import re
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from .memory import ENTRIES_MARKER, context_lock, count_memory_tokens, invalidate_memory
+
+# Days of detailed entries kept in context.md
+CONTEXT_RETENTION_DAYS = int(os.environ.get("EVA_CONTEXT_RETENTION_DAYS", "30"))
+
+ENTRY_HEADING = re.compile(r"^### (\d{4}-\d{2}-\d{2} \d{2}:\d{2}) - \[", re.MULTILINE)
+ARCHIVE_DIR = "context-archive"
+
+
+def split_entries(text: str) -> tuple[str, list[str]]:
+    """Split context.md into its header and its dated entries.
+
+    Args:
+        text: Content of context.md
+
+    Returns:
+        (header, entries); joining them gives back the original text
+    """
+    start = text.find(ENTRIES_MARKER)
+    start = start + len(ENTRIES_MARKER) if start != -1 else 0
+    headings = [m.start() for m in ENTRY_HEADING.finditer(text, start)]
+    if not headings:
+        return text, []
+    entries = [text[a:b] for a, b in zip(headings, headings[1:] + [len(text)])]
+    return text[:headings[0]], entries
+
+
+def entry_time(entry: str) -> datetime | None:
+    """Timestamp of an entry, or None if its heading cannot be parsed."""
+    match = ENTRY_HEADING.search(entry)
+    if match is None:
+        return None
+    try:
+        return datetime.strptime(match.group(1), "%Y-%m-%d %H:%M")
+    except ValueError:
+        return None
+
+
+def _write_atomic(path: Path, text: str) -> None:
+    """Replace path with text so readers see the old or new file, never half of one."""
+    tmp = path.with_name(f".{path.name}.tmp")
+    with tmp.open("w") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def _append_archive(path: Path, month: str, entries: list[str]) -> None:
+    """Append entries to a monthly archive, skipping any already there."""
+    existing = path.read_text() if path.exists() else f"# Context Archive - {month}\n"
+    new = [e for e in entries if e.strip() not in existing]
+    if not new:
+        return
+    text = existing
+    for entry in new:
+        text = text.rstrip("\n") + "\n\n" + entry.strip("\n") + "\n"
+    _write_atomic(path, text)
+
+
+def archive_context(
+    memory_dir: Path,
+    days: int = CONTEXT_RETENTION_DAYS,
+    now: datetime | None = None,
+) -> dict:
+    """Move context.md entries older than the retention window to monthly archives.
+
+    Runs under context_lock, so appends from update_context wait rather
+    than being lost. Archives are written before context.md is replaced,
+    and entries already in an archive are not added twice, so an
+    interrupted run can simply be repeated. Entries without a parsable
+    timestamp are kept.
+
+    Args:
+        memory_dir: Path to memory directory
+        days: Days of entries to keep in context.md
+        now: Current time (defaults to datetime.now(); entries use local time)
+
+    Returns:
+        Dict with archived and kept entry counts, the archive files written,
+        and context.md token counts before and after
+
+    Raises:
+        FileNotFoundError: If context.md does not exist
+    """
+    context_file = memory_dir / "context.md"
+    cutoff = (now or datetime.now()) - timedelta(days=days)
+
+    with context_lock(memory_dir):
+        text = context_file.read_text()
+        header, entries = split_entries(text)
+        kept: list[str] = []
+        by_month: dict[str, list[str]] = {}
+        for entry in entries:
+            when = entry_time(entry)
+            if when is not None and when < cutoff:
+                by_month.setdefault(when.strftime("%Y-%m"), []).append(entry)
+            else:
+                kept.append(entry)
+
+        tokens_before = count_memory_tokens(text)
+        report = {
+            "archived": len(entries) - len(kept),
+            "kept": len(kept),
+            "files": [],
+            "tokens_before": tokens_before,
+            "tokens_after": tokens_before,
+        }
+        if not by_month:
+            return report
+
+        archive_dir = memory_dir / ARCHIVE_DIR
+        archive_dir.mkdir(exist_ok=True)
+        for month, moved in sorted(by_month.items()):
+            path = archive_dir / f"{month}.md"
+            _append_archive(path, month, moved)
+            report["files"].append(path)
+
+        new_text = header + "".join(kept)
+        _write_atomic(context_file, new_text)
+        report["tokens_after"] = count_memory_tokens(new_text)
+
+    invalidate_memory(memory_dir)
+    return report
+
+
+def format_report(report: dict) -> str:
+    """One-line summary of an archive_context run."""
+    saved = report["tokens_before"] - report["tokens_after"]
+    if not report["archived"]:
+        return f"Nothing to archive: {report['kept']} entries, {report['tokens_before']} tokens in context.md"
+    names = ", ".join(p.name for p in report["files"])
+    return (
+        f"Archived {report['archived']} entries to {names}; kept {report['kept']}. "
+        f"context.md: {report['tokens_before']} -> {report['tokens_after']} tokens (-{saved})"
+    )
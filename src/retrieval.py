@@ -0,0 +1,247 @@
+"""Retrieval module for Eva - BM25 search over memory sections.
+
+Memory files are split into chunks at markdown headings (context.md into
+its dated entries) and indexed with Okapi BM25. The index is built once
+per MemorySnapshot, so it is rebuilt only when a memory file changes.
+"""
+import math
+import os
+import re
+from collections import Counter
+
+from .memory import MEMORY_REGISTRY, ON_DEMAND, MemorySnapshot, count_tokens_batch
+from .retention import split_entries
+
+# Opt-in: build system prompts from a small core plus the sections relevant
+# to the prompt, instead of every memory file in full
+RETRIEVAL = os.environ.get("EVA_MEMORY_RETRIEVAL", "").lower() in ("1", "true", "yes")
+# Tokens of retrieved sections added to a system prompt
+RETRIEVAL_TOKEN_BUDGET = int(os.environ.get("EVA_RETRIEVAL_TOKEN_BUDGET", "1500"))
+# Most retrieved sections added to a system prompt
+RETRIEVAL_TOP_K = int(os.environ.get("EVA_RETRIEVAL_TOP_K", "6"))
+# Newest context.md entries always included, whatever the prompt
+RETRIEVAL_RECENT_ENTRIES = int(os.environ.get("EVA_RETRIEVAL_RECENT_ENTRIES", "3"))
+
+# Okapi BM25 parameters
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+HEADING = re.compile(r"^(#{1,3})\s+(.+?)\s*$")
+WORD = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset(
+    "a an and are as at be but by do does for from has have how i in is it its me my of on or our so "
+    "that the their them then there these this to was we what when where which who why will with you your".split()
+)
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase words without stopwords, with a plural "s" folded away."""
+    words = []
+    for word in WORD.findall(text.lower()):
+        if word in STOPWORDS:
+            continue
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        words.append(word)
+    return words
+
+
+class Chunk:
+    """One section of a memory file."""
+
+    def __init__(self, name: str, title: str, text: str, position: int):
+        self.name = name
+        self.title = title
+        self.text = text
+        self.position = position
+        self.tokens = 0  # Counted for every chunk at once by MemoryIndex
+        self.terms = Counter(tokenize(f"{title}\n{text}"))
+        self.length = sum(self.terms.values())
+
+    def render(self) -> str:
+        """The section as it appears in a prompt or search result."""
+        return f"### {self.title}\n{self.text.strip()}"
+
+
+def split_sections(name: str, text: str) -> list[Chunk]:
+    """Split a markdown memory file at its #, ## and ### headings.
+
+    Each chunk's title is its heading path, e.g. "user.md > Family > Boys
+    (Kids)". Headings inside fenced code blocks are ignored, and sections
+    with nothing under their heading are dropped.
+
+    Args:
+        name: Memory file name (without .md)
+        text: File content
+
+    Returns:
+        Chunks in file order
+    """
+    chunks: list[Chunk] = []
+    path: list[str] = []
+    lines: list[str] = []
+    in_fence = False
+
+    def close() -> None:
+        body = "\n".join(lines).strip()
+        if body:
+            title = " > ".join([f"{name}.md", *path])
+            chunks.append(Chunk(name, title, body, len(chunks)))
+        lines.clear()
+
+    for line in text.splitlines():
+        if line.startswith("```"):
+            in_fence = not in_fence
+        match = None if in_fence else HEADING.match(line)
+        if match is None:
+            lines.append(line)
+            continue
+        close()
+        level = len(match.group(1))
+        # The file's own # title is already in the name
+        path[:] = path[:max(0, level - 2)] + ([match.group(2)] if level > 1 else [])
+    close()
+    return chunks
+
+
+def context_entries(text: str) -> list[Chunk]:
+    """Chunks for the dated entries of context.md, oldest first."""
+    _, entries = split_entries(text)
+    chunks = []
+    for position, entry in enumerate(entries):
+        heading, _, body = entry.strip().partition("\n")
+        chunks.append(Chunk("context", f"context.md > {heading.lstrip('# ').strip()}", body, position))
+    return chunks
+
+
+class MemoryIndex:
+    """BM25 index over the sections of a set of memory files."""
+
+    def __init__(self, chunks: list[Chunk]):
+        self.chunks = chunks
+        for chunk, tokens in zip(chunks, count_tokens_batch([c.text for c in chunks])):
+            chunk.tokens = tokens
+        self.df: Counter = Counter()
+        for chunk in chunks:
+            self.df.update(chunk.terms.keys())
+        self.avg_length = sum(c.length for c in chunks) / len(chunks) if chunks else 0.0
+
+    def search(self, query: str, k: int | None = None, names: set[str] | None = None) -> list[tuple[float, Chunk]]:
+        """Rank chunks by BM25 relevance to a query.
+
+        Args:
+            query: Free-text query
+            k: Return at most this many
+            names: Only search these memory files
+
+        Returns:
+            (score, chunk) pairs with a positive score, best first
+        """
+        terms = set(tokenize(query))
+        n = len(self.chunks)
+        results = []
+        for chunk in self.chunks:
+            if names is not None and chunk.name not in names:
+                continue
+            score = 0.0
+            for term in terms:
+                tf = chunk.terms.get(term, 0)
+                if not tf:
+                    continue
+                idf = math.log(1 + (n - self.df[term] + 0.5) / (self.df[term] + 0.5))
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * chunk.length / (self.avg_length or 1))
+                score += idf * tf * (BM25_K1 + 1) / (tf + norm)
+            if score > 0:
+                results.append((score, chunk))
+        results.sort(key=lambda pair: (-pair[0], pair[1].name, pair[1].position))
+        return results[:k] if k is not None else results
+
+
+def memory_index(memory: MemorySnapshot) -> MemoryIndex:
+    """The BM25 index for a snapshot: every file but soul and ON_DEMAND ones, by section.
+
+    The newest RETRIEVAL_RECENT_ENTRIES context entries are left out,
+    since relevant_memory always includes them. Built once per snapshot.
+    """
+    def build() -> MemoryIndex:
+        chunks = []
+        for name, text in memory.files.items():
+            spec = MEMORY_REGISTRY.get(name)
+            if name == "soul" or (spec is not None and spec.policy == ON_DEMAND):
+                continue
+            if name == "context":
+                entries = context_entries(text)
+                chunks.extend(entries[:max(0, len(entries) - RETRIEVAL_RECENT_ENTRIES)])
+            else:
+                chunks.extend(split_sections(name, text))
+        return MemoryIndex(chunks)
+
+    return memory.derived("retrieval_index", build)
+
+
+def recent_context(memory: MemorySnapshot) -> str:
+    """The newest RETRIEVAL_RECENT_ENTRIES context.md entries, as written."""
+    _, entries = split_entries(memory.files["context"])
+    recent = entries[max(0, len(entries) - RETRIEVAL_RECENT_ENTRIES):] if RETRIEVAL_RECENT_ENTRIES else []
+    return "".join(recent).strip()
+
+
+def relevant_memory(
+    memory: MemorySnapshot,
+    query: str,
+    budget: int = RETRIEVAL_TOKEN_BUDGET,
+    k: int = RETRIEVAL_TOP_K,
+    names: set[str] | None = None,
+) -> list[Chunk]:
+    """The memory sections most relevant to a prompt, within a token budget.
+
+    Sections are taken best first; one that does not fit is skipped in
+    favour of smaller, lower-ranked ones.
+
+    Args:
+        memory: Loaded memory snapshot
+        query: The user's prompt
+        budget: Maximum tokens across the returned sections
+        k: Maximum number of sections
+        names: Only choose sections of these memory files
+
+    Returns:
+        Chunks in file order
+    """
+    chosen = []
+    used = 0
+    for _, chunk in memory_index(memory).search(query, names=names):
+        if len(chosen) == k:
+            break
+        if used + chunk.tokens <= budget:
+            chosen.append(chunk)
+            used += chunk.tokens
+    return sorted(chosen, key=lambda c: (list(memory.files).index(c.name), c.position))
+
+
+def search_memory(memory: MemorySnapshot, query: str, name: str | None = None, k: int = 5) -> str:
+    """Search memory for read_memory(query=...), including soul and recent context.
+
+    Args:
+        memory: Loaded memory snapshot
+        query: Free-text query
+        name: Only search this memory file
+        k: Maximum sections returned
+
+    Returns:
+        Matching sections, best first, or a note that nothing matched
+    """
+    def build() -> MemoryIndex:
+        chunks = []
+        for file_name, text in memory.files.items():
+            if file_name == "context":
+                chunks.extend(context_entries(text))
+            else:
+                chunks.extend(split_sections(file_name, text))
+        return MemoryIndex(chunks)
+
+    index = memory.derived("search_index", build)
+    results = index.search(query, k=k, names={name} if name else None)
+    if not results:
+        return f"No memory sections match {query!r}."
+    return "\n\n".join(chunk.render() for _, chunk in results)
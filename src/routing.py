@@ -0,0 +1,247 @@
+"""Routing module for Eva - hedged and failover requests across providers."""
+import asyncio
+import math
+import os
+import threading
+import time
+from collections import deque
+from collections.abc import AsyncIterator
+
+from .providers import ProviderAdapter, Turn
+
+# Hedge delay used until a provider has enough latency samples
+HEDGE_DELAY = float(os.environ.get("EVA_HEDGE_DELAY", "8"))
+# Never hedge sooner than this, even for a very fast primary
+HEDGE_MIN_DELAY = float(os.environ.get("EVA_HEDGE_MIN_DELAY", "0.5"))
+
+# Latency samples kept per provider, and how many are needed before trusting them
+WINDOW_SIZE = 50
+MIN_SAMPLES = 5
+
+
+class LatencyTracker:
+    """Rolling per-provider latency and error statistics.
+
+    Latency is time until the provider starts answering: the full response
+    for a plain call, the first event for a stream. Losers of a hedge race
+    are recorded with the time they had spent so far, which is a lower bound
+    on their latency and enough to push a slow provider's p95 up. Failures
+    count towards the error rate only: a provider that fails fast must not
+    look fast.
+    """
+
+    def __init__(self, window: int = WINDOW_SIZE):
+        self.window = window
+        self._latencies: dict[str, deque] = {}
+        self._outcomes: dict[str, deque] = {}
+        self._lock = threading.Lock()
+
+    def record(self, provider: str, seconds: float, ok: bool = True) -> None:
+        """Record one request outcome for a provider."""
+        with self._lock:
+            if ok:
+                self._latencies.setdefault(provider, deque(maxlen=self.window)).append(seconds)
+            self._outcomes.setdefault(provider, deque(maxlen=self.window)).append(ok)
+
+    def samples(self, provider: str) -> int:
+        """Number of latency samples held for a provider."""
+        return len(self._latencies.get(provider, ()))
+
+    def measured(self, provider: str) -> bool:
+        """Whether enough outcomes are recorded to judge a provider."""
+        return len(self._outcomes.get(provider, ())) >= MIN_SAMPLES
+
+    def p95(self, provider: str) -> float | None:
+        """95th percentile latency of successful calls, or None without enough samples."""
+        with self._lock:
+            latencies = sorted(self._latencies.get(provider, ()))
+        if len(latencies) < MIN_SAMPLES:
+            return None
+        return latencies[int(0.95 * (len(latencies) - 1))]
+
+    def error_rate(self, provider: str) -> float:
+        """Fraction of recent requests that failed."""
+        with self._lock:
+            outcomes = list(self._outcomes.get(provider, ()))
+        if not outcomes:
+            return 0.0
+        return outcomes.count(False) / len(outcomes)
+
+    def hedge_delay(self, provider: str) -> float:
+        """How long to wait on a provider before sending the backup request."""
+        p95 = self.p95(provider)
+        if p95 is None:
+            return HEDGE_DELAY
+        return max(HEDGE_MIN_DELAY, p95)
+
+    def rank(self, providers: list[str]) -> list[str]:
+        """Order providers best first, demoting failing or slow ones.
+
+        Error rate, in 10% steps, is compared before p95 latency, so a
+        provider that keeps failing is demoted however quickly it fails.
+        Providers without enough samples keep their configured position
+        relative to each other and are not demoted.
+        """
+        def score(item: tuple[int, str]) -> tuple[int, float, int]:
+            index, provider = item
+            p95 = self.p95(provider)
+            return (int(10 * self.error_rate(provider)), math.inf if p95 is None else p95, index)
+
+        known = [(i, p) for i, p in enumerate(providers) if self.measured(p)]
+        ranked = iter(p for _, p in sorted(known, key=score))
+        # Re-fill only the slots held by measured providers, so unmeasured ones stay put
+        return [next(ranked) if self.measured(p) else p for p in providers]
+
+
+# Process-wide tracker shared by every routed conversation
+TRACKER = LatencyTracker()
+
+_END = object()
+
+
+class HedgedAdapter(ProviderAdapter):
+    """Sends each model call to the best provider, hedging to the next one.
+
+    If the primary has not answered within its p95-derived hedge delay, or
+    fails, the same request goes to the secondary and whichever answers
+    first wins; the other is cancelled. Adapters must share a wire format
+    (e.g. NVIDIA and Grok, both OpenAI-compatible) so either can continue
+    the conversation.
+    """
+
+    def __init__(self, adapters: list[ProviderAdapter], tracker: LatencyTracker = TRACKER):
+        if len(adapters) < 2:
+            raise ValueError("Hedged routing needs at least two providers")
+        if len({type(a) for a in adapters}) > 1:
+            raise ValueError("Hedged providers must share a message format")
+        self.adapters = {a.name: a for a in adapters}
+        self.tracker = tracker
+        self.name = "+".join(self.adapters)
+        self.model = "+".join(getattr(a, "model", "") for a in adapters)
+        self.prompt_cache = getattr(adapters[0], "prompt_cache", False)
+        self.winners: list[str] = []
+
+    def _order(self) -> list[ProviderAdapter]:
+        return [self.adapters[name] for name in self.tracker.rank(list(self.adapters))]
+
+    def start(self, system, prompt: str) -> list:
+        return self._order()[0].start(system, prompt)
+
+    def add_results(self, messages: list, turn: Turn, results: list[str]) -> None:
+        self._order()[0].add_results(messages, turn, results)
+
+    async def complete(self, system, messages: list) -> Turn:
+        primary, secondary = self._order()[:2]
+        backups = [secondary]
+        names: dict[asyncio.Future, str] = {}
+        started: dict[str, float] = {}
+
+        def launch(adapter: ProviderAdapter) -> asyncio.Future:
+            started[adapter.name] = time.monotonic()
+            task = asyncio.ensure_future(adapter.complete(system, messages))
+            names[task] = adapter.name
+            return task
+
+        pending = {launch(primary)}
+        hedge_delay = self.tracker.hedge_delay(primary.name)
+        error = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending,
+                    timeout=hedge_delay if backups else None,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if not done:
+                    # Primary is slower than its p95: hedge
+                    pending.add(launch(backups.pop()))
+                    continue
+                for task in done:
+                    name = names[task]
+                    elapsed = time.monotonic() - started[name]
+                    if task.exception() is None:
+                        self.tracker.record(name, elapsed)
+                        self.winners.append(name)
+                        return task.result()
+                    error = task.exception()
+                    self.tracker.record(name, elapsed, ok=False)
+                    if backups:
+                        # Primary failed: fail over
+                        pending.add(launch(backups.pop()))
+        finally:
+            for task in pending:
+                task.cancel()
+                self.tracker.record(names[task], time.monotonic() - started[names[task]])
+        raise error
+
+    async def stream(self, system, messages: list) -> AsyncIterator:
+        primary, secondary = self._order()[:2]
+        backups = [secondary]
+        queues: dict[str, asyncio.Queue] = {}
+        pumps: dict[str, asyncio.Future] = {}
+        started: dict[str, float] = {}
+
+        async def pump(adapter: ProviderAdapter, q: asyncio.Queue) -> None:
+            try:
+                async for item in adapter.stream(system, messages):
+                    await q.put(item)
+                await q.put(_END)
+            except Exception as e:
+                await q.put(e)
+
+        def launch(adapter: ProviderAdapter) -> None:
+            queues[adapter.name] = asyncio.Queue()
+            started[adapter.name] = time.monotonic()
+            pumps[adapter.name] = asyncio.ensure_future(pump(adapter, queues[adapter.name]))
+
+        launch(primary)
+        racing = [primary.name]
+        hedge_delay = self.tracker.hedge_delay(primary.name)
+        winner = None
+        first = None
+        try:
+            # Race on the first event (time to first token), not the whole stream
+            while winner is None:
+                getters = {asyncio.ensure_future(queues[n].get()): n for n in racing}
+                done, waiting = await asyncio.wait(
+                    getters,
+                    timeout=hedge_delay if backups else None,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                for getter in waiting:
+                    getter.cancel()
+                if not done:
+                    launch(backups[0])
+                    racing.append(backups.pop().name)
+                    continue
+                for getter in done:
+                    name = getters[getter]
+                    item = getter.result()
+                    elapsed = time.monotonic() - started[name]
+                    if isinstance(item, Exception):
+                        self.tracker.record(name, elapsed, ok=False)
+                        racing.remove(name)
+                        if backups:
+                            launch(backups[0])
+                            racing.append(backups.pop().name)
+                        elif not racing:
+                            raise item
+                    elif winner is None:
+                        self.tracker.record(name, elapsed)
+                        winner, first = name, item
+        finally:
+            for name, task in pumps.items():
+                if name != winner and not task.done():
+                    task.cancel()
+                    self.tracker.record(name, time.monotonic() - started[name])
+
+        self.winners.append(winner)
+        try:
+            item = first
+            while item is not _END:
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+                item = await queues[winner].get()
+        finally:
+            pumps[winner].cancel()
@@ -0,0 +1,472 @@
+"""Stand-in LLM server for Eva - replay recorded model turns without a network.
+
+Speaks enough of the Anthropic Messages API and the OpenAI chat-completions
+API (plain and streaming) for the agent loop, answering from a cassette:
+
+    {
+      "scripts": [
+        {"match": "weather", "turns": [
+          {"tool_calls": [{"name": "fetch_webpage", "input": {"url": "https://..."}}]},
+          {"text": "Sunny. — Eva", "usage": {"input_tokens": 900, "output_tokens": 4}}
+        ]},
+        {"turns": [{"text": "Done. — Eva"}]}
+      ]
+    }
+
+A request is answered by the first script whose "match" appears in the
+conversation's first user message (scripts without one match anything),
+using the turn at the index of assistant messages already in the
+conversation; the last turn repeats once a script runs out. Selection is
+stateless, so concurrent conversations replay independently.
+
+Point Eva at it with ANTHROPIC_BASE_URL=http://host:port and
+NVIDIA_BASE_URL / GROK_BASE_URL=http://host:port/v1. In record mode every
+request is forwarded to a real provider and its answer appended to the
+cassette.
+"""
+import argparse
+import json
+import os
+import threading
+import time
+import uuid
+from pathlib import Path
+
+import httpx
+from flask import Flask, Response, jsonify, request
+from werkzeug.serving import make_server
+
+# Simulated provider speed: seconds before the first token, then tokens per second
+PROFILES = {
+    "instant": {"ttft": 0.0, "tokens_per_second": 0.0},
+    "fast": {"ttft": 0.3, "tokens_per_second": 150.0},
+    "typical": {"ttft": 1.0, "tokens_per_second": 60.0},
+    "slow": {"ttft": 4.0, "tokens_per_second": 20.0},
+}
+
+
+def load_cassette(path: Path) -> dict:
+    """Load a cassette file, or an empty one if it does not exist yet."""
+    if not path.exists():
+        return {"scripts": []}
+    return json.loads(path.read_text())
+
+
+def _text_of(content) -> str:
+    """Plain text of an Anthropic or OpenAI message content field."""
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return "".join(b.get("text", "") for b in content if isinstance(b, dict))
+    return ""
+
+
+def _first_prompt(messages: list) -> str:
+    return next((_text_of(m.get("content")) for m in messages if m.get("role") == "user"), "")
+
+
+def _chunks(text: str) -> list[str]:
+    """Split text into word-sized stream deltas that join back to the original."""
+    words = text.split(" ")
+    return [w + " " for w in words[:-1]] + [words[-1]] if text else []
+
+
+def _estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+class StandIn:
+    """Cassette replay (or recording) plus latency simulation and counters."""
+
+    def __init__(
+        self,
+        cassette: dict,
+        profile: str | dict = "instant",
+        cassette_path: Path | None = None,
+        record_url: str | None = None,
+    ):
+        self.cassette = cassette
+        self.profile = PROFILES[profile] if isinstance(profile, str) else profile
+        self.cassette_path = cassette_path
+        self.record_url = record_url.rstrip("/") if record_url else None
+        self.requests = 0
+        self.simulated_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def turn_for(self, messages: list) -> dict:
+        """Pick the scripted turn answering a conversation.
+
+        Raises:
+            LookupError: If no script matches
+        """
+        prompt = _first_prompt(messages)
+        index = sum(1 for m in messages if m.get("role") == "assistant")
+        for script in self.cassette.get("scripts", []):
+            if script.get("match", "") in prompt and script.get("turns"):
+                turns = script["turns"]
+                return turns[min(index, len(turns) - 1)]
+        raise LookupError(f"No cassette script matches: {prompt[:80]!r}")
+
+    def record(self, messages: list, turn: dict) -> None:
+        """Append a recorded turn to the script for this conversation's prompt."""
+        prompt = _first_prompt(messages)
+        with self._lock:
+            scripts = self.cassette.setdefault("scripts", [])
+            script = next((s for s in scripts if s.get("match") == prompt), None)
+            if script is None:
+                script = {"match": prompt, "turns": []}
+                scripts.append(script)
+            script["turns"].append(turn)
+            if self.cassette_path is not None:
+                self.cassette_path.write_text(json.dumps(self.cassette, indent=2))
+
+    def usage(self, turn: dict, body: dict) -> dict[str, int]:
+        """Token usage for a turn: recorded counts, else a rough estimate."""
+        usage = dict(turn.get("usage") or {})
+        usage.setdefault("input_tokens", _estimate_tokens(json.dumps(body.get("messages", []), default=str)))
+        usage.setdefault("output_tokens", _estimate_tokens(
+            turn.get("text", "") + json.dumps(turn.get("tool_calls", []))
+        ))
+        return usage
+
+    def delays(self, usage: dict[str, int], pieces: int) -> tuple[float, float]:
+        """Seconds before the first piece and between pieces under the profile."""
+        rate = self.profile["tokens_per_second"]
+        generate = usage["output_tokens"] / rate if rate else 0.0
+        gap = generate / pieces if pieces else 0.0
+        with self._lock:
+            self.requests += 1
+            self.simulated_seconds += self.profile["ttft"] + generate
+        return self.profile["ttft"], gap
+
+    def stats(self) -> dict:
+        """Requests served and total simulated provider time."""
+        with self._lock:
+            return {"requests": self.requests, "simulated_seconds": self.simulated_seconds}
+
+
+def _normalise_anthropic(response: dict) -> dict:
+    content = response.get("content", [])
+    return {
+        "text": "".join(b.get("text", "") for b in content if b.get("type") == "text"),
+        "tool_calls": [
+            {"name": b["name"], "input": b.get("input", {})} for b in content if b.get("type") == "tool_use"
+        ],
+        "usage": {
+            "input_tokens": response.get("usage", {}).get("input_tokens", 0),
+            "output_tokens": response.get("usage", {}).get("output_tokens", 0),
+        },
+    }
+
+
+def _normalise_openai(response: dict) -> dict:
+    message = response["choices"][0]["message"]
+    usage = response.get("usage") or {}
+    return {
+        "text": message.get("content") or message.get("reasoning_content") or "",
+        "tool_calls": [
+            {"name": tc["function"]["name"], "input": json.loads(tc["function"]["arguments"] or "{}")}
+            for tc in message.get("tool_calls") or []
+        ],
+        "usage": {
+            "input_tokens": usage.get("prompt_tokens", 0),
+            "output_tokens": usage.get("completion_tokens", 0),
+        },
+    }
+
+
+def _sse(event: str | None, data) -> str:
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {data if isinstance(data, str) else json.dumps(data)}\n\n"
+
+
+def _anthropic_message(turn: dict, usage: dict, model: str) -> dict:
+    content = [{"type": "text", "text": turn["text"]}] if turn.get("text") else []
+    content += [
+        {"type": "tool_use", "id": f"toolu_{uuid.uuid4().hex[:24]}", "name": c["name"], "input": c["input"]}
+        for c in turn.get("tool_calls", [])
+    ]
+    return {
+        "id": f"msg_{uuid.uuid4().hex[:24]}",
+        "type": "message",
+        "role": "assistant",
+        "model": model,
+        "content": content,
+        "stop_reason": "tool_use" if turn.get("tool_calls") else "end_turn",
+        "stop_sequence": None,
+        "usage": {"input_tokens": usage["input_tokens"], "output_tokens": usage["output_tokens"]},
+    }
+
+
+def _anthropic_events(message: dict):
+    """Anthropic streaming events for a complete message, one per text chunk."""
+    start = {**message, "content": [], "stop_reason": None, "usage": {**message["usage"], "output_tokens": 0}}
+    yield "message_start", {"type": "message_start", "message": start}
+    for index, block in enumerate(message["content"]):
+        if block["type"] == "text":
+            yield "content_block_start", {"type": "content_block_start", "index": index,
+                                          "content_block": {"type": "text", "text": ""}}
+            for piece in _chunks(block["text"]):
+                yield "content_block_delta", {"type": "content_block_delta", "index": index,
+                                              "delta": {"type": "text_delta", "text": piece}}
+        else:
+            yield "content_block_start", {"type": "content_block_start", "index": index,
+                                          "content_block": {**block, "input": {}}}
+            yield "content_block_delta", {"type": "content_block_delta", "index": index,
+                                          "delta": {"type": "input_json_delta",
+                                                    "partial_json": json.dumps(block["input"])}}
+        yield "content_block_stop", {"type": "content_block_stop", "index": index}
+    yield "message_delta", {"type": "message_delta",
+                            "delta": {"stop_reason": message["stop_reason"], "stop_sequence": None},
+                            "usage": {"output_tokens": message["usage"]["output_tokens"]}}
+    yield "message_stop", {"type": "message_stop"}
+
+
+def _openai_completion(turn: dict, usage: dict, model: str) -> dict:
+    tool_calls = [
+        {"id": f"call_{uuid.uuid4().hex[:24]}", "type": "function",
+         "function": {"name": c["name"], "arguments": json.dumps(c["input"])}}
+        for c in turn.get("tool_calls", [])
+    ]
+    message = {"role": "assistant", "content": turn.get("text") or None}
+    if tool_calls:
+        message["tool_calls"] = tool_calls
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex[:24]}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{"index": 0, "message": message, "finish_reason": "tool_calls" if tool_calls else "stop"}],
+        "usage": {
+            "prompt_tokens": usage["input_tokens"],
+            "completion_tokens": usage["output_tokens"],
+            "total_tokens": usage["input_tokens"] + usage["output_tokens"],
+        },
+    }
+
+
+def _openai_chunks(completion: dict, include_usage: bool = False):
+    """OpenAI streaming chunks for a complete response.
+
+    Like the real API, the final usage chunk is only sent when the request
+    asked for it with stream_options={"include_usage": true}.
+    """
+    base = {k: completion[k] for k in ("id", "created", "model")}
+    base["object"] = "chat.completion.chunk"
+    choice = completion["choices"][0]
+    message = choice["message"]
+
+    def chunk(delta: dict, finish: str | None = None) -> dict:
+        return {**base, "choices": [{"index": 0, "delta": delta, "finish_reason": finish}]}
+
+    yield chunk({"role": "assistant", "content": ""})
+    for piece in _chunks(message["content"] or ""):
+        yield chunk({"content": piece})
+    for index, call in enumerate(message.get("tool_calls", [])):
+        yield chunk({"tool_calls": [{"index": index, **call}]})
+    yield chunk({}, choice["finish_reason"])
+    if include_usage:
+        yield {**base, "choices": [], "usage": completion["usage"]}
+
+
+def create_app(standin: StandIn) -> Flask:
+    """Build the Flask app serving a StandIn."""
+    app = Flask(__name__)
+
+    def answer(body: dict, upstream_path: str, normalise) -> tuple[dict, dict]:
+        messages = body.get("messages", [])
+        if standin.record_url:
+            headers = {
+                k: v for k, v in request.headers.items()
+                if k.lower() in ("authorization", "x-api-key", "anthropic-version", "anthropic-beta")
+            }
+            upstream = httpx.post(
+                standin.record_url + upstream_path,
+                json={**body, "stream": False},
+                headers=headers,
+                timeout=300,
+            )
+            upstream.raise_for_status()
+            turn = normalise(upstream.json())
+            standin.record(messages, turn)
+        else:
+            turn = standin.turn_for(messages)
+        return turn, standin.usage(turn, body)
+
+    def stream(events, pieces: int, usage: dict) -> Response:
+        ttft, gap = standin.delays(usage, pieces)
+
+        def generate():
+            time.sleep(ttft)
+            for event, data in events:
+                yield _sse(event, data)
+                if gap and event in ("content_block_delta", None):
+                    time.sleep(gap)
+
+        return Response(generate(), mimetype="text/event-stream")
+
+    @app.route("/v1/messages", methods=["POST"])
+    def anthropic_messages():
+        body = request.get_json(force=True)
+        try:
+            turn, usage = answer(body, "/v1/messages", _normalise_anthropic)
+        except LookupError as e:
+            return jsonify({"type": "error", "error": {"type": "not_found_error", "message": str(e)}}), 404
+        message = _anthropic_message(turn, usage, body.get("model", "stand-in"))
+        if body.get("stream"):
+            return stream(_anthropic_events(message), max(1, len(_chunks(turn.get("text", "")))), usage)
+        ttft, gap = standin.delays(usage, 1)
+        time.sleep(ttft + gap)
+        return jsonify(message)
+
+    @app.route("/v1/chat/completions", methods=["POST"])
+    def openai_chat():
+        body = request.get_json(force=True)
+        try:
+            turn, usage = answer(body, "/chat/completions", _normalise_openai)
+        except LookupError as e:
+            return jsonify({"error": {"message": str(e), "type": "not_found"}}), 404
+        completion = _openai_completion(turn, usage, body.get("model", "stand-in"))
+        if body.get("stream"):
+            include_usage = bool((body.get("stream_options") or {}).get("include_usage"))
+            events = [(None, c) for c in _openai_chunks(completion, include_usage)] + [(None, "[DONE]")]
+            return stream(events, max(1, len(_chunks(turn.get("text", "")))), usage)
+        ttft, gap = standin.delays(usage, 1)
+        time.sleep(ttft + gap)
+        return jsonify(completion)
+
+    @app.route("/_standin/stats", methods=["GET"])
+    def stats():
+        return jsonify(standin.stats())
+
+    return app
+
+
+def serve(standin: StandIn, host: str = "127.0.0.1", port: int = 0):
+    """Serve a StandIn on a background thread.
+
+    Args:
+        standin: Cassette and profile to serve
+        host: Interface to bind
+        port: Port to bind (0 picks a free one)
+
+    Returns:
+        The running werkzeug server; its base URL is http://host:server.port,
+        and server.shutdown() stops it
+    """
+    server = make_server(host, port, create_app(standin), threaded=True)
+    threading.Thread(target=server.serve_forever, name="eva-standin", daemon=True).start()
+    return server
+
+
+def measure_overhead(
+    standin: StandIn,
+    prompt: str,
+    memory_dir: Path,
+    provider: str = "nvidia",
+    runs: int = 10,
+) -> dict:
+    """Run the agent against a stand-in and split wall time into provider and Eva time.
+
+    The response cache and prefetching are off for the run, and every
+    global and environment variable it changes is restored afterwards.
+
+    Args:
+        standin: Cassette and latency profile to answer with
+        prompt: Prompt to run
+        memory_dir: Path to memory directory
+        provider: "anthropic", "nvidia" or "grok"
+        runs: Number of agent runs
+
+    Returns:
+        Dict with runs, turns, wall_seconds, provider_seconds and
+        overhead_per_turn (Eva's own time per model call, in seconds)
+    """
+    from . import agent, cache
+    from .clients import reset_clients
+
+    server = serve(standin)
+    url = f"http://127.0.0.1:{server.port}"
+    # Every run must reach the stand-in: no cached answers, no prefetches
+    overrides = [
+        (agent, "PROVIDER", provider),
+        (agent, "ROUTE", []),
+        (agent, "NVIDIA_BASE_URL", f"{url}/v1"),
+        (agent, "GROK_BASE_URL", f"{url}/v1"),
+        (agent, "PREFETCH", False),
+        (cache, "RESPONSE_CACHE", "off"),
+    ]
+    env = {"ANTHROPIC_BASE_URL": url}
+    for key in ("ANTHROPIC_API_KEY", "NVIDIA_API_KEY", "GROK_API_KEY"):
+        env[key] = os.environ.get(key, "stand-in")
+    saved = [(module, name, getattr(module, name)) for module, name, _ in overrides]
+    saved_env = {key: os.environ.get(key) for key in env}
+    try:
+        for module, name, value in overrides:
+            setattr(module, name, value)
+        os.environ.update(env)
+        reset_clients()
+        start = time.perf_counter()
+        for _ in range(runs):
+            agent.run_agent(prompt, memory_dir)
+        wall = time.perf_counter() - start
+    finally:
+        for module, name, value in saved:
+            setattr(module, name, value)
+        for key, value in saved_env.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+        reset_clients()
+        server.shutdown()
+
+    stats = standin.stats()
+    turns = stats["requests"]
+    return {
+        "runs": runs,
+        "turns": turns,
+        "wall_seconds": wall,
+        "provider_seconds": stats["simulated_seconds"],
+        "overhead_per_turn": (wall - stats["simulated_seconds"]) / turns if turns else 0.0,
+    }
+
+
+def main():
+    """CLI entry point: serve a cassette, or benchmark Eva against one."""
+    parser = argparse.ArgumentParser(description="Eva stand-in LLM server")
+    parser.add_argument("cassette", type=Path, help="Cassette JSON file")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=18791)
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="instant")
+    parser.add_argument("--ttft", type=float, help="Override the profile's seconds to first token")
+    parser.add_argument("--tokens-per-second", type=float, help="Override the profile's token rate")
+    parser.add_argument("--record", metavar="URL", help="Forward to this provider base URL and record")
+    parser.add_argument("--bench", metavar="PROMPT", help="Measure Eva's per-turn overhead on PROMPT and exit")
+    parser.add_argument("--provider", default="nvidia", help="Provider to benchmark (default: nvidia)")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--memory-dir", type=Path, default=Path("memory"))
+    args = parser.parse_args()
+
+    profile = dict(PROFILES[args.profile])
+    if args.ttft is not None:
+        profile["ttft"] = args.ttft
+    if args.tokens_per_second is not None:
+        profile["tokens_per_second"] = args.tokens_per_second
+    standin = StandIn(load_cassette(args.cassette), profile, args.cassette, args.record)
+
+    if args.bench:
+        result = measure_overhead(standin, args.bench, args.memory_dir, args.provider, args.runs)
+        print(
+            f"{result['runs']} runs, {result['turns']} turns in {result['wall_seconds']:.2f}s "
+            f"({result['provider_seconds']:.2f}s simulated provider time)\n"
+            f"Eva overhead: {1000 * result['overhead_per_turn']:.1f} ms per turn"
+        )
+        return
+
+    print(f"Serving {args.cassette} on http://{args.host}:{args.port} ({args.profile})")
+    make_server(args.host, args.port, create_app(standin), threaded=True).serve_forever()
+
+
+if __name__ == "__main__":
+    main()
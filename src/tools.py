@@ -1,7 +1,30 @@
-"""Tools module for Eva - tool definitions and execution."""
+"""Tools module for Eva - tool definitions and execution.
+
+Each tool is a function registered with the @tool decorator, which keeps
+its Anthropic and OpenAI schemas (built once, at import) together with
+what the agent loop needs to schedule it: whether it writes, its timeout,
+its concurrency class and how long its results may be memoized.
+"""
+import json
+import os
+import re
+import threading
+from collections.abc import Callable
+from concurrent.futures import Future
 from pathlib import Path
 
-from .memory import load_memory_file, update_context
+from . import metrics
+from .cache import MemoryCache
+from .memory import (
+    ALWAYS,
+    ON_DEMAND,
+    load_memory_file,
+    memory_snapshot,
+    registered_memory,
+    truncate_tokens,
+    update_context,
+)
+from .retrieval import search_memory
 from .composio_tools import (
     github_get_repo,
     github_list_issues,
@@ -12,23 +35,187 @@ from .composio_tools import (
     google_search_query,
 )
 
-# Tool definitions in Anthropic SDK format
-TOOLS = [
-    {
+# Concurrency classes
+PARALLEL = "parallel"  # May run alongside the turn's other PARALLEL calls
+SERIAL = "serial"  # Runs alone, after everything requested before it, in request order
+
+# Seconds a read-only tool may run before the agent stops waiting for it
+TOOL_TIMEOUT = float(os.environ.get("EVA_TOOL_TIMEOUT", "30"))
+
+# Max memoized tool results kept per process
+TOOL_CACHE_SIZE = int(os.environ.get("EVA_TOOL_CACHE_SIZE", "256"))
+
+# A full commit SHA names immutable content
+COMMIT_SHA = re.compile(r"^[0-9a-f]{40}$")
+
+# Characters fetch_webpage downloads when the model does not ask for a limit;
+# the agent then cuts the page to the conversation's token budget
+FETCH_MAX_CHARS = int(os.environ.get("EVA_FETCH_MAX_CHARS", "40000"))
+# Tokens of each search result's description
+SEARCH_DESCRIPTION_TOKENS = 30
+# Files whose head and tail are kept when cut (the middle is dropped)
+CODE_EXTENSIONS = frozenset(
+    ".c .cc .cpp .cs .css .go .h .hpp .java .js .jsx .kt .lua .php .py .rb .rs .scala .sh .sql .swift .ts .tsx".split()
+)
+
+TOOL_CACHE = MemoryCache(TOOL_CACHE_SIZE)
+
+
+class ToolExecutionError(Exception):
+    """Raised when tool execution fails."""
+
+    pass
+
+
+class Tool:
+    """A registered tool: its schemas, its handler and how to schedule it."""
+
+    def __init__(
+        self,
+        definition: dict,
+        run: Callable[[dict, Path], str],
+        write: bool = False,
+        timeout: float | None = TOOL_TIMEOUT,
+        concurrency: str | None = None,
+        cache_ttl: float | None = None,
+        pinned: Callable[[dict], bool] | None = None,
+        invalidates: tuple[str, ...] = (),
+        keep_tail: Callable[[dict], bool] | None = None,
+    ):
+        """
+        Args:
+            definition: Tool definition in Anthropic SDK format
+            run: Handler taking (args, memory_dir) and returning the result
+            write: Changes memory or external state (never memoized or prefetched)
+            timeout: Seconds before the agent stops waiting for a call (None: waits)
+            concurrency: PARALLEL or SERIAL (default: SERIAL for writes)
+            cache_ttl: Seconds a result is memoized (None: never)
+            pinned: Args whose result never changes, kept until evicted
+            invalidates: Tools whose memoized results a call may make stale
+            keep_tail: Args whose result keeps its head and tail when cut (code)
+        """
+        self.name = definition["name"]
+        self.definition = definition
+        self.openai_definition = {
+            "type": "function",
+            "function": {
+                "name": definition["name"],
+                "description": definition["description"],
+                "parameters": definition["input_schema"],
+            },
+        }
+        self.run = run
+        self.write = write
+        self.timeout = timeout
+        self.concurrency = concurrency or (SERIAL if write else PARALLEL)
+        self.cache_ttl = cache_ttl
+        self.pinned = pinned
+        self.invalidates = invalidates
+        self.keep_tail = keep_tail
+
+
+# Every tool Eva can call, by name, in the order they are offered to the model
+TOOL_REGISTRY: dict[str, Tool] = {}
+
+
+def tool(definition: dict, **options) -> Callable:
+    """Register the decorated (args, memory_dir) -> str function as a tool.
+
+    Args:
+        definition: Tool definition in Anthropic SDK format
+        **options: Scheduling metadata, as for Tool
+
+    Returns:
+        Decorator that registers its function and returns it unchanged
+    """
+    def register(run: Callable[[dict, Path], str]) -> Callable[[dict, Path], str]:
+        TOOL_REGISTRY[definition["name"]] = Tool(definition, run, **options)
+        return run
+
+    return register
+
+
+def get_tool(name: str) -> Tool:
+    """The registered tool called name.
+
+    Raises:
+        ToolExecutionError: If tool is unknown
+    """
+    spec = TOOL_REGISTRY.get(name)
+    if spec is None:
+        raise ToolExecutionError(f"Unknown tool: {name}")
+    return spec
+
+
+def tool_keeps_tail(name: str, args: dict) -> bool:
+    """Whether a call's result should keep its head and tail when cut to fit."""
+    spec = TOOL_REGISTRY.get(name)
+    return spec is not None and spec.keep_tail is not None and spec.keep_tail(args)
+
+
+def is_code_path(path: str) -> bool:
+    """Whether a repository path names a source file."""
+    return Path(path).suffix.lower() in CODE_EXTENSIONS
+
+
+def tool_timeout(name: str) -> float | None:
+    """Seconds to wait for a call to name; None for writes and unknown tools."""
+    spec = TOOL_REGISTRY.get(name)
+    return spec.timeout if spec is not None else None
+
+
+def read_memory_tool() -> dict:
+    """The read_memory tool definition, generated from the memory registry."""
+    specs = registered_memory()
+    files = []
+    for spec in specs:
+        if spec.policy == ALWAYS:
+            where = "already in your prompt"
+        elif spec.policy == ON_DEMAND:
+            where = "only through this tool"
+        else:
+            where = "relevant sections added to your prompt"
+        about = f"{spec.description}, " if spec.description else ""
+        files.append(f"{spec.name} ({about}{where})")
+    return {
         "name": "read_memory",
-        "description": "Read a memory file (soul, user, telos, context, harness)",
+        "description": (
+            f"Read a memory file: {'; '.join(files)}. "
+            "Or search memory for the sections relevant to a query"
+        ),
         "input_schema": {
             "type": "object",
             "properties": {
                 "name": {
                     "type": "string",
-                    "enum": ["soul", "user", "telos", "context", "harness"],
-                    "description": "Name of memory file to read",
-                }
+                    "enum": [spec.name for spec in specs],
+                    "description": "Name of memory file to read (or to limit a query to)",
+                },
+                "query": {
+                    "type": "string",
+                    "description": "Search memory for sections about this instead of reading a whole file",
+                },
             },
-            "required": ["name"],
         },
-    },
+    }
+
+
+GITHUB_TOKEN_HINT = "Set GITHUB_TOKEN env var: export GITHUB_TOKEN='ghp_xxx'"
+
+
+@tool(read_memory_tool(), timeout=10)
+def _read_memory(args: dict, memory_dir: Path) -> str:
+    try:
+        if args.get("query"):
+            return search_memory(memory_snapshot(memory_dir), args["query"], args.get("name"))
+        if not args.get("name"):
+            return "Error: read_memory needs a name or a query"
+        return load_memory_file(memory_dir, args["name"])
+    except FileNotFoundError as e:
+        return f"Error: {e}"
+
+
+@tool(
     {
         "name": "update_context",
         "description": "Add entry to context.md rolling log",
@@ -55,7 +242,22 @@ TOOLS = [
             "required": ["category", "summary", "details"],
         },
     },
-    # GitHub Tools
+    write=True,
+    timeout=None,
+)
+def _update_context(args: dict, memory_dir: Path) -> str:
+    update_context(
+        memory_dir,
+        category=args["category"],
+        summary=args["summary"],
+        details=args["details"],
+        followup=args.get("followup"),
+    )
+    return "Context updated successfully."
+
+
+# GitHub Tools
+@tool(
     {
         "name": "github_get_repo",
         "description": "Get information about a GitHub repository (stars, forks, issues, description)",
@@ -68,6 +270,17 @@ TOOLS = [
             "required": ["owner", "repo"],
         },
     },
+    cache_ttl=300,
+)
+def _github_get_repo(args: dict, memory_dir: Path) -> str:
+    try:
+        result = github_get_repo(args["owner"], args["repo"])
+        return f"📁 {result['full_name']}\n⭐ {result['stars']} | 🍴 {result['forks']} | 🐛 {result['open_issues']} open issues\n📝 {result['description'] or 'No description'}\n🔗 {result['html_url']}"
+    except RuntimeError as e:
+        return f"⚠️ {e}\n{GITHUB_TOKEN_HINT}"
+
+
+@tool(
     {
         "name": "github_list_issues",
         "description": "List issues in a GitHub repository",
@@ -82,6 +295,27 @@ TOOLS = [
             "required": ["owner", "repo"],
         },
     },
+    cache_ttl=60,
+)
+def _github_list_issues(args: dict, memory_dir: Path) -> str:
+    try:
+        issues = github_list_issues(
+            args["owner"],
+            args["repo"],
+            state=args.get("state", "open"),
+            limit=args.get("limit", 10),
+        )
+        if not issues:
+            return "No issues found."
+        lines = [f"🐛 Issues in {args['owner']}/{args['repo']}:", ""]
+        for i in issues:
+            lines.append(f"#{i['number']}: {i['title']} ({i['state']}) - {i['author']}")
+        return "\n".join(lines)
+    except RuntimeError as e:
+        return f"⚠️ {e}\n{GITHUB_TOKEN_HINT}"
+
+
+@tool(
     {
         "name": "github_create_issue",
         "description": "Create a new issue in a GitHub repository",
@@ -97,6 +331,25 @@ TOOLS = [
             "required": ["owner", "repo", "title"],
         },
     },
+    write=True,
+    timeout=None,
+    invalidates=("github_list_issues", "github_get_repo"),
+)
+def _github_create_issue(args: dict, memory_dir: Path) -> str:
+    try:
+        result = github_create_issue(
+            args["owner"],
+            args["repo"],
+            args["title"],
+            body=args.get("body", ""),
+            labels=args.get("labels"),
+        )
+        return f"✅ Issue created: #{result['number']}\n🔗 {result['url']}"
+    except RuntimeError as e:
+        return f"⚠️ {e}\n{GITHUB_TOKEN_HINT}"
+
+
+@tool(
     {
         "name": "github_create_pull_request",
         "description": "Create a pull request in a GitHub repository",
@@ -113,6 +366,26 @@ TOOLS = [
             "required": ["owner", "repo", "title", "head", "base"],
         },
     },
+    write=True,
+    timeout=None,
+    invalidates=("github_get_repo",),
+)
+def _github_create_pull_request(args: dict, memory_dir: Path) -> str:
+    try:
+        result = github_create_pull_request(
+            args["owner"],
+            args["repo"],
+            args["title"],
+            args["head"],
+            args["base"],
+            body=args.get("body", ""),
+        )
+        return f"✅ Pull request created: #{result['number']}\n🔗 {result['url']}"
+    except RuntimeError as e:
+        return f"⚠️ {e}\n{GITHUB_TOKEN_HINT}"
+
+
+@tool(
     {
         "name": "github_get_file_contents",
         "description": "Get contents of a file from a GitHub repository",
@@ -127,7 +400,28 @@ TOOLS = [
             "required": ["owner", "repo", "path"],
         },
     },
-    # Web Browsing Tools
+    cache_ttl=300,
+    pinned=lambda args: bool(COMMIT_SHA.match(args.get("ref", ""))),
+    keep_tail=lambda args: is_code_path(args.get("path", "")),
+)
+def _github_get_file_contents(args: dict, memory_dir: Path) -> str:
+    try:
+        content = github_get_file_contents(
+            args["owner"],
+            args["repo"],
+            args["path"],
+            ref=args.get("ref", "main"),
+        )
+        # The agent cuts it to the conversation's token budget
+        return f"FILE CONTENTS of {args['path']}:\n---\n{content}\n---\nEND OF FILE"
+    except RuntimeError as e:
+        return f"⚠️ {e}\n{GITHUB_TOKEN_HINT}"
+    except Exception as e:
+        return f"⚠️ Could not read file: {args.get('path', 'unknown')}. File may not exist or default branch isn't 'main'."
+
+
+# Web Browsing Tools
+@tool(
     {
         "name": "fetch_webpage",
         "description": "Fetch and extract text content from any webpage URL",
@@ -135,12 +429,20 @@ TOOLS = [
             "type": "object",
             "properties": {
                 "url": {"type": "string", "description": "Full URL to fetch (e.g., https://example.com)"},
-                "max_chars": {"type": "integer", "description": "Maximum characters to return", "default": 3000},
+                "max_chars": {"type": "integer", "description": "Maximum characters to return (default: what fits)"},
             },
             "required": ["url"],
         },
     },
-    # Search Tools
+    cache_ttl=600,
+)
+def _fetch_webpage(args: dict, memory_dir: Path) -> str:
+    content = fetch_webpage(args["url"], max_chars=args.get("max_chars", FETCH_MAX_CHARS))
+    return f"RAW CONTENT FROM {args['url']}:\n{content}\n[END OF CONTENT]"
+
+
+# Search Tools
+@tool(
     {
         "name": "google_search",
         "description": "Search Google and return results",
@@ -153,18 +455,71 @@ TOOLS = [
             "required": ["query"],
         },
     },
-]
+    cache_ttl=3600,
+)
+def _google_search(args: dict, memory_dir: Path) -> str:
+    results = google_search_query(args["query"], num_results=args.get("num_results", 5))
+    lines = [f"🔍 Google results for: {args['query']}", ""]
+    for i, r in enumerate(results, 1):
+        lines.append(f"{i}. {r['title']}")
+        lines.append(f"   {r['url']}")
+        if r.get('description'):
+            description = truncate_tokens(r['description'], SEARCH_DESCRIPTION_TOKENS)
+            lines.append(f"   {description}..." if description != r['description'] else f"   {description}")
+        lines.append("")
+    return "\n".join(lines)
 
 
-class ToolExecutionError(Exception):
-    """Raised when tool execution fails."""
+# Tool definitions in Anthropic SDK format
+TOOLS = [spec.definition for spec in TOOL_REGISTRY.values()]
+# The same tools in OpenAI function format
+OPENAI_TOOLS = [spec.openai_definition for spec in TOOL_REGISTRY.values()]
+
+# Tools that change memory or external state
+WRITE_TOOLS = frozenset(name for name, spec in TOOL_REGISTRY.items() if spec.write)
+# Tools never run concurrently with other tool calls, and always in the
+# order the model requested them
+SERIAL_TOOLS = frozenset(name for name, spec in TOOL_REGISTRY.items() if spec.concurrency == SERIAL)
+
+
+def _tool_cache_key(name: str, args: dict) -> str:
+    return f"{name}\0{json.dumps(args, sort_keys=True, default=str)}"
 
-    pass
+
+def _is_error(result: str) -> bool:
+    """Whether a tool result reports a failure (never memoized)."""
+    return result.startswith(("⚠️", "Error")) or "\nError fetching " in result
+
+
+def invalidate_tool_cache(name: str | None = None) -> int:
+    """Drop memoized tool results.
+
+    Args:
+        name: Tool whose results to drop, or None for all tools
+
+    Returns:
+        Number of results dropped
+    """
+    if name is None:
+        count = len(TOOL_CACHE)
+        TOOL_CACHE.clear()
+        return count
+    return TOOL_CACHE.delete_prefix(f"{name}\0")
+
+
+def tool_cache_stats() -> dict[str, int]:
+    """Hit, miss and size counters for the tool result cache."""
+    return {"hits": TOOL_CACHE.hits, "misses": TOOL_CACHE.misses, "entries": len(TOOL_CACHE)}
 
 
 def execute_tool(name: str, args: dict, memory_dir: Path) -> str:
     """Execute a tool and return result as string.
 
+    Results of read-only tools with a cache_ttl are memoized for that
+    long; pinned ones (files read at a full commit SHA) are kept until
+    evicted. Write tools always run, and drop the reads they may have
+    made stale.
+
     Args:
         name: Tool name
         args: Tool arguments
@@ -176,104 +531,68 @@ def execute_tool(name: str, args: dict, memory_dir: Path) -> str:
     Raises:
         ToolExecutionError: If tool is unknown
     """
-    if name == "read_memory":
-        try:
-            return load_memory_file(memory_dir, args["name"])
-        except FileNotFoundError as e:
-            return f"Error: {e}"
-
-    elif name == "update_context":
-        update_context(
-            memory_dir,
-            category=args["category"],
-            summary=args["summary"],
-            details=args["details"],
-            followup=args.get("followup"),
-        )
-        return "Context updated successfully."
+    with metrics.timed("eva_tool_seconds", errors="eva_tool_errors_total", tool=name):
+        result = _memoized_tool(get_tool(name), args, memory_dir)
+    if _is_error(result):
+        metrics.inc("eva_tool_errors_total", tool=name)
+    return result
 
-    # GitHub Tools
-    elif name == "github_get_repo":
-        try:
-            result = github_get_repo(args["owner"], args["repo"])
-            return f"📁 {result['full_name']}\n⭐ {result['stars']} | 🍴 {result['forks']} | 🐛 {result['open_issues']} open issues\n📝 {result['description'] or 'No description'}\n🔗 {result['html_url']}"
-        except RuntimeError as e:
-            return f"⚠️ {e}\nSet GITHUB_TOKEN env var: export GITHUB_TOKEN='ghp_xxx'"
 
-    elif name == "github_list_issues":
-        try:
-            issues = github_list_issues(
-                args["owner"],
-                args["repo"],
-                state=args.get("state", "open"),
-                limit=args.get("limit", 10),
-            )
-            if not issues:
-                return "No issues found."
-            lines = [f"🐛 Issues in {args['owner']}/{args['repo']}:", ""]
-            for i in issues:
-                lines.append(f"#{i['number']}: {i['title']} ({i['state']}) - {i['author']}")
-            return "\n".join(lines)
-        except RuntimeError as e:
-            return f"⚠️ {e}\nSet GITHUB_TOKEN env var: export GITHUB_TOKEN='ghp_xxx'"
-
-    elif name == "github_create_issue":
-        try:
-            result = github_create_issue(
-                args["owner"],
-                args["repo"],
-                args["title"],
-                body=args.get("body", ""),
-                labels=args.get("labels"),
-            )
-            return f"✅ Issue created: #{result['number']}\n🔗 {result['url']}"
-        except RuntimeError as e:
-            return f"⚠️ {e}\nSet GITHUB_TOKEN env var: export GITHUB_TOKEN='ghp_xxx'"
-
-    elif name == "github_create_pull_request":
-        try:
-            result = github_create_pull_request(
-                args["owner"],
-                args["repo"],
-                args["title"],
-                args["head"],
-                args["base"],
-                body=args.get("body", ""),
-            )
-            return f"✅ Pull request created: #{result['number']}\n🔗 {result['url']}"
-        except RuntimeError as e:
-            return f"⚠️ {e}\nSet GITHUB_TOKEN env var: export GITHUB_TOKEN='ghp_xxx'"
-
-    elif name == "github_get_file_contents":
+def run_in_thread(
+    fn: Callable[..., str],
+    *args,
+    name: str,
+    slots: threading.BoundedSemaphore | None = None,
+) -> Future:
+    """Run fn(*args) on a daemon thread and return a Future for its result.
+
+    Daemon threads, so a call abandoned at its timeout never holds up
+    interpreter exit the way ThreadPoolExecutor workers would. Cancelling
+    the Future before the call starts skips it.
+
+    Args:
+        fn: Function to call (usually execute_tool)
+        *args: Its arguments
+        name: Thread name
+        slots: Optional semaphore limiting how many calls run at once
+
+    Returns:
+        Future resolved with fn's return value or exception
+    """
+    future: Future = Future()
+
+    def work() -> None:
+        if slots is not None:
+            slots.acquire()
         try:
-            content = github_get_file_contents(
-                args["owner"],
-                args["repo"],
-                args["path"],
-                ref=args.get("ref", "main"),
-            )
-            # Truncate if too long
-            display = content[:3000] if len(content) < 3000 else content[:3000] + "\n[...truncated]"
-            return f"FILE CONTENTS of {args['path']}:\n---\n{display}\n---\nEND OF FILE"
-        except RuntimeError as e:
-            return f"⚠️ {e}\nSet GITHUB_TOKEN env var: export GITHUB_TOKEN='ghp_xxx'"
-        except Exception as e:
-            return f"⚠️ Could not read file: {args.get('path', 'unknown')}. File may not exist or default branch isn't 'main'."
-
-    elif name == "fetch_webpage":
-        content = fetch_webpage(args["url"], max_chars=args.get("max_chars", 3000))
-        return f"RAW CONTENT FROM {args['url']}:\n{content}\n[END OF CONTENT]"
-
-    elif name == "google_search":
-        results = google_search_query(args["query"], num_results=args.get("num_results", 5))
-        lines = [f"🔍 Google results for: {args['query']}", ""]
-        for i, r in enumerate(results, 1):
-            lines.append(f"{i}. {r['title']}")
-            lines.append(f"   {r['url']}")
-            if r.get('description'):
-                lines.append(f"   {r['description'][:100]}...")
-            lines.append("")
-        return "\n".join(lines)
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                future.set_result(fn(*args))
+            except BaseException as e:
+                future.set_exception(e)
+        finally:
+            if slots is not None:
+                slots.release()
 
-    else:
-        raise ToolExecutionError(f"Unknown tool: {name}")
+    threading.Thread(target=work, name=name, daemon=True).start()
+    return future
+
+
+def _memoized_tool(spec: Tool, args: dict, memory_dir: Path) -> str:
+    """Run a tool through the result cache (see execute_tool)."""
+    if spec.cache_ttl is None:
+        result = spec.run(args, memory_dir)
+        for stale in spec.invalidates:
+            invalidate_tool_cache(stale)
+        return result
+
+    key = _tool_cache_key(spec.name, args)
+    cached = TOOL_CACHE.get(key)
+    if cached is not None:
+        return cached
+    result = spec.run(args, memory_dir)
+    if not _is_error(result):
+        ttl = None if spec.pinned is not None and spec.pinned(args) else spec.cache_ttl
+        TOOL_CACHE.set(key, result, ttl)
+    return result
@@ -2,6 +2,19 @@
 import subprocess
 from pathlib import Path
 
+from .. import metrics
+
+
+def _git(repo_dir: Path, *args: str, check: bool = True) -> subprocess.CompletedProcess:
+    """Run a git command in repo_dir, timing it under eva_git_seconds."""
+    with metrics.timed("eva_git_seconds", command=args[0]):
+        return subprocess.run(
+            ["git", *args],
+            cwd=repo_dir,
+            check=check,
+            capture_output=True,
+        )
+
 
 def sync_memory(repo_dir: Path) -> None:
     """Pull latest memory from git.
@@ -9,12 +22,7 @@ def sync_memory(repo_dir: Path) -> None:
     Args:
         repo_dir: Path to repository root
     """
-    subprocess.run(
-        ["git", "pull", "--rebase"],
-        cwd=repo_dir,
-        check=True,
-        capture_output=True,
-    )
+    _git(repo_dir, "pull", "--rebase")
 
 
 def push_memory(repo_dir: Path, message: str) -> None:
@@ -24,28 +32,12 @@ def push_memory(repo_dir: Path, message: str) -> None:
         repo_dir: Path to repository root
         message: Commit message
     """
-    subprocess.run(
-        ["git", "add", "memory/context.md"],
-        cwd=repo_dir,
-        check=True,
-        capture_output=True,
-    )
+    paths = ["memory/context.md"]
+    if (repo_dir / "memory" / "context-archive").is_dir():
+        paths.append("memory/context-archive")
+    _git(repo_dir, "add", *paths)
     # Check if there are changes to commit
-    result = subprocess.run(
-        ["git", "diff", "--cached", "--quiet"],
-        cwd=repo_dir,
-        capture_output=True,
-    )
+    result = _git(repo_dir, "diff", "--cached", "--quiet", check=False)
     if result.returncode != 0:  # Changes exist
-        subprocess.run(
-            ["git", "commit", "-m", message],
-            cwd=repo_dir,
-            check=True,
-            capture_output=True,
-        )
-        subprocess.run(
-            ["git", "push"],
-            cwd=repo_dir,
-            check=True,
-            capture_output=True,
-        )
+        _git(repo_dir, "commit", "-m", message)
+        _git(repo_dir, "push")
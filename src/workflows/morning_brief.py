@@ -3,21 +3,23 @@ from datetime import datetime
 from pathlib import Path
 
 from ..composio_tools import fetch_emails, fetch_calendar_events, send_email
-from ..memory import load_memory_file, update_context
+from ..context_index import is_open_followup, parse_entries
+from ..memory import CONTEXT_TAIL_ENTRIES, read_context_tail, update_context
+from ..retention import archive_context
 from .base import sync_memory, push_memory
 
 
 def generate_brief(
     emails: list[dict],
     events: list[dict],
-    context: str,
+    followups: list[dict],
 ) -> str:
     """Generate formatted morning brief.
 
     Args:
         emails: Unread emails
         events: Today's calendar events
-        context: Recent context entries
+        followups: Open follow-up entries from context.md, newest first
 
     Returns:
         Formatted brief message
@@ -58,9 +60,11 @@ def generate_brief(
 
     lines.append("")
 
-    # Context/followups section (parse recent commitments)
-    if "Commitment" in context or "Follow-up" in context:
-        lines.append("**Open Items:** Check context.md for pending follow-ups")
+    # Open follow-ups from context.md
+    if followups:
+        lines.append(f"**Open Items** ({len(followups)}):")
+        for entry in followups[:3]:
+            lines.append(f"  • {entry['timestamp'][:10]}: {entry['followup'].splitlines()[0][:60]}")
     else:
         lines.append("**Open Items:** None tracked")
 
@@ -79,16 +83,20 @@ def run_morning_brief(repo_dir: Path, user_email: str) -> None:
     """
     memory_dir = repo_dir / "memory"
 
-    # Sync memory
+    # Sync memory, then move entries past the retention window to the archive
     sync_memory(repo_dir)
+    archive_context(memory_dir)
 
     # Fetch today's data
     emails = fetch_emails(max_results=20, query="is:unread")
     events = fetch_calendar_events(hours_ahead=16)  # Full day ahead
-    context = load_memory_file(memory_dir, "context")
+    # Only the newest entries are read; archive_context has just rewritten the
+    # file, which would make the SQLite index rebuild from scratch
+    recent = parse_entries(read_context_tail(memory_dir, entries=CONTEXT_TAIL_ENTRIES or None))
+    followups = [record for _, record in reversed(recent) if is_open_followup(record["followup"])]
 
     # Generate and send brief
-    brief = generate_brief(emails, events, context)
+    brief = generate_brief(emails, events, followups)
     today = datetime.now().strftime("%A, %B %d")
     send_email(user_email, f"☀️ Eva Morning Brief - {today}", brief)
 
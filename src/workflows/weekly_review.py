@@ -1,9 +1,10 @@
 """Weekly review workflow - Sunday evening recap."""
-from datetime import datetime
+from datetime import datetime, timedelta
 from pathlib import Path
 
 from ..composio_tools import fetch_calendar_events, send_email
-from ..memory import load_memory_file, update_context
+from ..context_index import ContextIndex
+from ..memory import update_context
 from .base import sync_memory, push_memory
 
 
@@ -19,8 +20,10 @@ def run_weekly_review(repo_dir: Path, user_email: str) -> None:
     # Sync memory
     sync_memory(repo_dir)
 
-    # Load context for analysis
-    context = load_memory_file(memory_dir, "context")
+    # This week's context entries, by category
+    index = ContextIndex(memory_dir)
+    week_start = datetime.now() - timedelta(days=7)
+    counts = index.counts(since=week_start)
 
     # Get next week's events
     next_week_events = fetch_calendar_events(hours_ahead=168)  # 7 days
@@ -33,13 +36,11 @@ def run_weekly_review(repo_dir: Path, user_email: str) -> None:
         "**This Week's Activity:**",
     ]
 
-    # Count context entries (rough analysis)
-    entry_count = context.count("## 202")
-    lines.append(f"  • {entry_count} context entries logged")
+    lines.append(f"  • {sum(counts.values())} context entries logged")
 
     # Check for commitments/follow-ups
-    commitments = context.count("Commitment")
-    followups = context.count("Follow-up")
+    commitments = counts.get("Commitment", 0)
+    followups = len(index.open_followups(since=week_start))
     if commitments or followups:
         lines.append(f"  • {commitments} commitments, {followups} follow-ups tracked")
 
@@ -0,0 +1,21 @@
+"""Shared pytest fixtures."""
+import pytest
+
+from src.clients import reset_clients
+from src.tools import invalidate_tool_cache
+
+
+@pytest.fixture(autouse=True)
+def fresh_clients():
+    """Keep pooled LLM clients (often mocks) from leaking between tests."""
+    reset_clients()
+    yield
+    reset_clients()
+
+
+@pytest.fixture(autouse=True)
+def fresh_tool_cache():
+    """Keep memoized tool results from leaking between tests."""
+    invalidate_tool_cache()
+    yield
+    invalidate_tool_cache()
@@ -1,9 +1,29 @@
 """Tests for agent module."""
+import asyncio
+import os
+import threading
+import time
+from copy import deepcopy
+
 import pytest
 from pathlib import Path
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
-from src.agent import build_system_prompt, run_agent
+from src.agent import (
+    Session,
+    build_system_blocks,
+    build_system_prompt,
+    execute_tool_calls,
+    new_usage,
+    run_agent,
+    run_agent_async,
+    run_agent_stream,
+    validate_route,
+)
+from src.budget import AgentBudget
+from src.cache import MemoryCache
+from src import memory as memory_module
+from src.memory import MEMORY_REGISTRY, ON_DEMAND, MemoryFile, load_all_memory
 
 
 class TestBuildSystemPrompt:
@@ -41,6 +61,77 @@ class TestBuildSystemPrompt:
 
         assert "Eva" in result
 
+    def test_sections_follow_registry(self, monkeypatch):
+        """ALWAYS files are laid out by position, unstable ones after the rules, each within its cap."""
+        monkeypatch.setattr(memory_module, "TOKEN_COUNTER", "estimate")
+        monkeypatch.setitem(
+            MEMORY_REGISTRY, "context",
+            MemoryFile("context", "Recent Context", position=90, token_cap=10, required=True, stable=False, newest_last=True),
+        )
+        monkeypatch.setitem(MEMORY_REGISTRY, "goals", MemoryFile("goals", "This Quarter", position=15))
+        monkeypatch.setitem(MEMORY_REGISTRY, "ecosystem", MemoryFile("ecosystem", "Ecosystem", policy=ON_DEMAND))
+        memory = {name: f"# {name} content" for name in ("soul", "user", "telos", "harness", "goals", "ecosystem")}
+        memory["context"] = "".join(f"entry {i:02d} old news\n" for i in range(20))
+
+        result = build_system_prompt(memory)
+
+        assert result.index("## Your User") < result.index("## This Quarter") < result.index("## Your Purpose")
+        assert result.index("RESPONSE RULES") < result.index("## Recent Context")
+        assert "ecosystem content" not in result
+        assert "entry 19" in result and "entry 00" not in result
+        assert "Only the newest part of context.md fits here" in result
+
+
+class TestBuildSystemBlocks:
+    """Tests for build_system_blocks function."""
+
+    def test_stable_block_cached_and_context_last(self):
+        """build_system_blocks caches stable sections and keeps context uncached."""
+        memory = {
+            "soul": "# Soul content",
+            "user": "# User content",
+            "telos": "# Telos content",
+            "context": "# Context content",
+            "harness": "# Harness content",
+        }
+
+        stable, context = build_system_blocks(memory)
+
+        assert stable["cache_control"] == {"type": "ephemeral"}
+        assert "Soul content" in stable["text"]
+        assert "Harness content" in stable["text"]
+        assert "Context content" not in stable["text"]
+        assert "Context content" in context["text"]
+        assert "cache_control" not in context
+
+    def test_same_text_as_plain_prompt(self):
+        """build_system_blocks only adds a breakpoint to build_system_prompt's text."""
+        memory = {name: f"# {name} content" for name in ("soul", "user", "telos", "context", "harness")}
+
+        blocks = build_system_blocks(memory)
+
+        assert "".join(block["text"] for block in blocks) == build_system_prompt(memory)
+
+
+class TestValidateRoute:
+    """Tests for validate_route function."""
+
+    def test_shared_format_accepted(self):
+        """validate_route accepts providers that share a message format."""
+        validate_route(["nvidia", "grok"])
+        validate_route(["anthropic"])
+        validate_route([])
+
+    def test_mixed_formats_rejected(self):
+        """validate_route rejects routes mixing Anthropic and OpenAI formats."""
+        with pytest.raises(ValueError, match="mixes message formats"):
+            validate_route(["anthropic", "grok"])
+
+    def test_unknown_provider_rejected(self):
+        """validate_route rejects names get_adapter would not recognise."""
+        with pytest.raises(ValueError, match="unknown providers: grokk"):
+            validate_route(["nvidia", "grokk"])
+
 
 class TestRunAgent:
     """Tests for run_agent function."""
@@ -64,10 +155,10 @@ class TestRunAgent:
         mock_response.content = [mock_text_block]
         mock_response.stop_reason = "end_turn"
 
-        with patch("src.agent.anthropic.Anthropic") as mock_anthropic:
+        with patch("src.clients.anthropic.AsyncAnthropic") as mock_anthropic:
             mock_client = MagicMock()
             mock_anthropic.return_value = mock_client
-            mock_client.messages.create.return_value = mock_response
+            mock_client.messages.create = AsyncMock(return_value=mock_response)
 
             # Act
             result = run_agent("Hello", memory_dir)
@@ -107,10 +198,10 @@ class TestRunAgent:
         mock_response_2.content = [mock_text_block]
         mock_response_2.stop_reason = "end_turn"
 
-        with patch("src.agent.anthropic.Anthropic") as mock_anthropic:
+        with patch("src.clients.anthropic.AsyncAnthropic") as mock_anthropic:
             mock_client = MagicMock()
             mock_anthropic.return_value = mock_client
-            mock_client.messages.create.side_effect = [mock_response_1, mock_response_2]
+            mock_client.messages.create = AsyncMock(side_effect=[mock_response_1, mock_response_2])
 
             # Act
             result = run_agent("What's in my soul?", memory_dir)
@@ -119,6 +210,60 @@ class TestRunAgent:
             assert "I am Eva" in result
             assert mock_client.messages.create.call_count == 2
 
+    def test_prompt_cache_marks_breakpoints_and_reports_usage(self, tmp_path: Path):
+        """run_agent adds cache_control markers and accumulates cache token counts."""
+        memory_dir = tmp_path / "memory"
+        _write_memory(memory_dir)
+
+        mock_text_block = MagicMock()
+        mock_text_block.type = "text"
+        mock_text_block.text = "Cached."
+        mock_response = MagicMock()
+        mock_response.content = [mock_text_block]
+        mock_response.usage = MagicMock(
+            input_tokens=12,
+            output_tokens=3,
+            cache_creation_input_tokens=0,
+            cache_read_input_tokens=3000,
+        )
+
+        with patch("src.agent.PROVIDER", "anthropic"), \
+             patch("src.agent.PROMPT_CACHE", True), \
+             patch("src.clients.anthropic.AsyncAnthropic") as mock_anthropic:
+            mock_client = MagicMock()
+            mock_anthropic.return_value = mock_client
+            mock_client.messages.create = AsyncMock(return_value=mock_response)
+
+            usage = new_usage()
+            result = run_agent("Hello", memory_dir, usage=usage)
+
+        kwargs = mock_client.messages.create.call_args.kwargs
+        assert result == "Cached."
+        assert kwargs["tools"][-1]["cache_control"] == {"type": "ephemeral"}
+        assert kwargs["system"][0]["cache_control"] == {"type": "ephemeral"}
+        assert usage["cache_read_input_tokens"] == 3000
+        assert usage["input_tokens"] == 12
+
+    def test_system_prompt_reused_until_memory_changes(self, tmp_path: Path):
+        """Requests share one system prompt string until a memory file changes."""
+        memory_dir = tmp_path / "memory"
+        _write_memory(memory_dir)
+        response = MagicMock(content=[MagicMock(type="text", text="Hi. — Eva")])
+
+        with patch("src.agent.PROVIDER", "anthropic"), \
+             patch("src.agent.PROMPT_CACHE", False), \
+             patch("src.clients.anthropic.AsyncAnthropic") as mock_anthropic:
+            create = AsyncMock(return_value=response)
+            mock_anthropic.return_value.messages.create = create
+            run_agent("One", memory_dir)
+            run_agent("Two", memory_dir)
+            (memory_dir / "context.md").write_text("# Context\nMoved to Lisbon")
+            run_agent("Three", memory_dir)
+
+        systems = [call.kwargs["system"] for call in create.call_args_list]
+        assert systems[1] is systems[0]
+        assert "Moved to Lisbon" in systems[2]
+
     def test_missing_memory_raises(self, tmp_path: Path):
         """run_agent raises FileNotFoundError for missing memory."""
         memory_dir = tmp_path / "memory"
@@ -127,3 +272,516 @@ class TestRunAgent:
 
         with pytest.raises(FileNotFoundError):
             run_agent("Hello", memory_dir)
+
+
+class TestExecuteToolCalls:
+    """Tests for execute_tool_calls function."""
+
+    def test_results_keep_call_order(self, tmp_path: Path):
+        """execute_tool_calls returns results in request order, not completion order."""
+        def slow_tool(name, args, memory_dir):
+            time.sleep(args["delay"])
+            return args["label"]
+
+        calls = [
+            ("fetch_webpage", {"delay": 0.2, "label": "first"}),
+            ("github_get_repo", {"delay": 0.0, "label": "second"}),
+            ("google_search", {"delay": 0.1, "label": "third"}),
+        ]
+
+        with patch("src.agent.execute_tool", side_effect=slow_tool):
+            result = execute_tool_calls(calls, tmp_path)
+
+        assert result == ["first", "second", "third"]
+
+    def test_independent_calls_run_in_parallel(self, tmp_path: Path):
+        """execute_tool_calls overlaps read-only tool calls."""
+        def slow_tool(name, args, memory_dir):
+            time.sleep(0.2)
+            return name
+
+        calls = [("fetch_webpage", {}), ("github_get_repo", {}), ("google_search", {})]
+
+        with patch("src.agent.execute_tool", side_effect=slow_tool):
+            start = time.perf_counter()
+            execute_tool_calls(calls, tmp_path)
+            elapsed = time.perf_counter() - start
+
+        assert elapsed < 0.5
+
+    def test_deadline_abandons_slow_calls(self, tmp_path: Path):
+        """execute_tool_calls reports a timeout instead of waiting past the deadline."""
+        def slow_tool(name, args, memory_dir):
+            time.sleep(args["delay"])
+            return name
+
+        calls = [("fetch_webpage", {"delay": 1.0}), ("google_search", {"delay": 0.0})]
+
+        with patch("src.agent.execute_tool", side_effect=slow_tool):
+            start = time.perf_counter()
+            result = execute_tool_calls(calls, tmp_path, deadline=time.monotonic() + 0.2)
+            elapsed = time.perf_counter() - start
+
+        assert result == ["Error: fetch_webpage timed out", "google_search"]
+        assert elapsed < 0.8
+
+    def test_abandoned_calls_do_not_block_exit(self, tmp_path: Path):
+        """execute_tool_calls leaves timed-out calls on daemon threads only."""
+        release = threading.Event()
+
+        def stuck_tool(name, args, memory_dir):
+            release.wait(5)
+            return name
+
+        with patch("src.agent.execute_tool", side_effect=stuck_tool):
+            result = execute_tool_calls([("fetch_webpage", {})], tmp_path, deadline=time.monotonic() + 0.1)
+            workers = [t for t in threading.enumerate() if t.name.startswith("eva-tool-")]
+            release.set()
+
+        assert result == ["Error: fetch_webpage timed out"]
+        assert workers and all(t.daemon for t in workers)
+
+    def test_per_tool_timeout(self, tmp_path: Path):
+        """A read that outlives its tool's timeout is abandoned; the others still answer."""
+        from src.tools import TOOL_REGISTRY
+
+        release = threading.Event()
+
+        def tool(name, args, memory_dir):
+            if name == "fetch_webpage":
+                release.wait(5)
+            return name
+
+        with patch.object(TOOL_REGISTRY["fetch_webpage"], "timeout", 0.1), \
+             patch("src.agent.execute_tool", side_effect=tool):
+            start = time.monotonic()
+            result = execute_tool_calls([("fetch_webpage", {}), ("google_search", {})], tmp_path)
+            elapsed = time.monotonic() - start
+            release.set()
+
+        assert result == ["Error: fetch_webpage timed out", "google_search"]
+        assert elapsed < 1
+
+    def test_calls_skipped_once_deadline_passed(self, tmp_path: Path):
+        """execute_tool_calls does not start calls after the deadline."""
+        with patch("src.agent.execute_tool") as mock_tool:
+            result = execute_tool_calls(
+                [("fetch_webpage", {}), ("google_search", {})],
+                tmp_path,
+                deadline=time.monotonic() - 1,
+            )
+
+        mock_tool.assert_not_called()
+        assert result == [
+            "Error: fetch_webpage skipped, time budget exhausted",
+            "Error: google_search skipped, time budget exhausted",
+        ]
+
+    def test_serial_tools_never_overlap(self, tmp_path: Path):
+        """execute_tool_calls runs serial tools alone."""
+        active = []
+        overlaps = []
+        lock = threading.Lock()
+
+        def tracked_tool(name, args, memory_dir):
+            with lock:
+                active.append(name)
+                if name == "update_context" and len(active) > 1:
+                    overlaps.append(list(active))
+            time.sleep(0.05)
+            with lock:
+                active.remove(name)
+            return name
+
+        calls = [
+            ("fetch_webpage", {}),
+            ("update_context", {}),
+            ("github_get_repo", {}),
+            ("google_search", {}),
+        ]
+
+        with patch("src.agent.execute_tool", side_effect=tracked_tool):
+            result = execute_tool_calls(calls, tmp_path)
+
+        assert overlaps == []
+        assert result == ["fetch_webpage", "update_context", "github_get_repo", "google_search"]
+
+
+async def _aiter(items):
+    for item in items:
+        yield item
+
+
+class TestToolOutputBudget:
+    """Tests for cutting tool results to the conversation's output budget."""
+
+    def test_large_result_cut_before_model_sees_it(self, tmp_path: Path, monkeypatch):
+        """A tool result beyond its share reaches the model shortened and marked."""
+        from src.budget import OutputBudget
+
+        monkeypatch.setattr(memory_module, "TOKEN_COUNTER", "estimate")
+        memory_dir = tmp_path / "memory"
+        _write_memory(memory_dir)
+        tool_block = MagicMock(type="tool_use", id="t1", input={"url": "https://example.com"})
+        tool_block.name = "fetch_webpage"
+        responses = [
+            MagicMock(content=[tool_block]),
+            MagicMock(content=[MagicMock(type="text", text="Long page. — Eva")]),
+        ]
+
+        with patch("src.agent.PROVIDER", "anthropic"), \
+             patch("src.agent.PREFETCH", False), \
+             patch("src.agent.execute_tool", return_value="paragraph text\n\n" * 500), \
+             patch("src.agent.OutputBudget", lambda: OutputBudget(per_result=100)), \
+             patch("src.clients.anthropic.AsyncAnthropic") as mock_anthropic:
+            create = AsyncMock(side_effect=responses)
+            mock_anthropic.return_value.messages.create = create
+            run_agent("Read https://example.com", memory_dir)
+
+        sent = create.call_args_list[1].kwargs["messages"][-1]["content"][0]["content"]
+        assert memory_module.count_memory_tokens(sent) <= 100
+        assert sent.startswith("paragraph text")
+        assert "[...truncated: about 100 of" in sent
+
+
+def _write_memory(memory_dir: Path) -> None:
+    memory_dir.mkdir()
+    for name in ("soul", "user", "telos", "context", "harness"):
+        (memory_dir / f"{name}.md").write_text(f"# {name.title()}")
+
+
+class TestRunAgentStream:
+    """Tests for run_agent_stream function."""
+
+    def test_anthropic_yields_text_deltas(self, tmp_path: Path):
+        """run_agent_stream yields text deltas then a done event."""
+        memory_dir = tmp_path / "memory"
+        _write_memory(memory_dir)
+
+        mock_text_block = MagicMock()
+        mock_text_block.type = "text"
+        mock_text_block.text = "Hello, I am Eva."
+        final = MagicMock()
+        final.content = [mock_text_block]
+
+        stream = MagicMock()
+        stream.text_stream.__aiter__.return_value = ["Hello, ", "I am Eva."]
+        stream.get_final_message = AsyncMock(return_value=final)
+
+        with patch("src.agent.PROVIDER", "anthropic"), \
+             patch("src.clients.anthropic.AsyncAnthropic") as mock_anthropic:
+            mock_client = MagicMock()
+            mock_anthropic.return_value = mock_client
+            mock_client.messages.stream.return_value.__aenter__.return_value = stream
+
+            events = list(run_agent_stream("Hello", memory_dir))
+
+        assert events[:2] == [
+            {"type": "text", "text": "Hello, "},
+            {"type": "text", "text": "I am Eva."},
+        ]
+        assert events[-1]["type"] == "done"
+        assert events[-1]["text"] == "Hello, I am Eva."
+
+    def test_openai_assembles_streamed_tool_calls(self, tmp_path: Path):
+        """run_agent_stream joins tool call fragments before executing them."""
+        memory_dir = tmp_path / "memory"
+        _write_memory(memory_dir)
+
+        def chunk(content=None, tool_calls=None):
+            delta = MagicMock(content=content, tool_calls=tool_calls, reasoning_content=None)
+            return MagicMock(choices=[MagicMock(delta=delta)])
+
+        def tool_fragment(index, id=None, name=None, arguments=None):
+            fragment = MagicMock(index=index, id=id)
+            fragment.function.name = name
+            fragment.function.arguments = arguments
+            return fragment
+
+        first_turn = [
+            chunk(tool_calls=[tool_fragment(0, id="call_1", name="read_memory", arguments='{"na')]),
+            chunk(tool_calls=[tool_fragment(0, arguments='me": "soul"}')]),
+        ]
+        second_turn = [chunk(content="Your soul "), chunk(content="is Eva.")]
+
+        with patch("src.agent.PROVIDER", "grok"), \
+             patch("src.clients.openai.AsyncOpenAI") as mock_openai:
+            mock_client = MagicMock()
+            mock_openai.return_value = mock_client
+            mock_client.chat.completions.create = AsyncMock(
+                side_effect=[_aiter(first_turn), _aiter(second_turn)]
+            )
+
+            events = list(run_agent_stream("What's in my soul?", memory_dir))
+
+        assert events[0] == {"type": "tool_call", "name": "read_memory", "input": {"name": "soul"}}
+        assert events[-1]["type"] == "done"
+        assert events[-1]["text"] == "Your soul is Eva."
+        second_messages = mock_client.chat.completions.create.call_args_list[1].kwargs["messages"]
+        assert second_messages[-1]["tool_call_id"] == "call_1"
+        assert "# Soul" in second_messages[-1]["content"]
+
+
+class TestSession:
+    """Tests for multi-turn Session conversations."""
+
+    @staticmethod
+    def _chat(mock_openai, answers):
+        """Answer each streamed chat call in turn, recording a copy of the messages sent."""
+        sent = []
+
+        async def create(**kwargs):
+            sent.append(deepcopy(kwargs["messages"]))
+            answer = answers.pop(0)
+            if isinstance(answer, Exception):
+                raise answer
+            delta = MagicMock(content=answer, tool_calls=None, reasoning_content=None)
+            return _aiter([MagicMock(choices=[MagicMock(delta=delta)])])
+
+        mock_openai.return_value.chat.completions.create = create
+        return sent
+
+    def test_follow_up_sees_earlier_exchange(self, tmp_path: Path):
+        """The second prompt is sent after the first prompt and its answer."""
+        memory_dir = tmp_path / "memory"
+        _write_memory(memory_dir)
+
+        with patch("src.agent.PROVIDER", "grok"), \
+             patch("src.clients.openai.AsyncOpenAI") as mock_openai:
+            sent = self._chat(mock_openai, ["Paris. — Eva", "About 2 million. — Eva"])
+            session = Session(memory_dir)
+            first = session.ask("Capital of France?")
+            second = session.ask("And its population?")
+
+        assert (first, second) == ("Paris. — Eva", "About 2 million. — Eva")
+        assert [m["content"] for m in sent[1][1:]] == [
+            "Capital of France?", "Paris. — Eva", "And its population?",
+        ]
+        assert sent[1][0]["role"] == "system"
+        assert session.messages[-1] == {"role": "assistant", "content": "About 2 million. — Eva"}
+
+    def test_memory_reloaded_only_when_files_change(self, tmp_path: Path):
+        """Memory files are re-read only after one of them changes."""
+        memory_dir = tmp_path / "memory"
+        _write_memory(memory_dir)
+
+        with patch("src.agent.PROVIDER", "grok"), \
+             patch("src.clients.openai.AsyncOpenAI") as mock_openai, \
+             patch("src.memory.load_all_memory", wraps=load_all_memory) as load:
+            sent = self._chat(mock_openai, ["One. — Eva", "Two. — Eva", "Three. — Eva"])
+            session = Session(memory_dir)
+            session.ask("One")
+            session.ask("Two")
+            assert load.call_count == 1
+
+            context = memory_dir / "context.md"
+            context.write_text("# Context\nMoved to Lisbon")
+            os.utime(context, ns=(1, 1))
+            session.ask("Three")
+
+        assert load.call_count == 2
+        assert "Moved to Lisbon" not in sent[1][0]["content"]
+        assert "Moved to Lisbon" in sent[2][0]["content"]
+
+    def test_failed_prompt_is_forgotten(self, tmp_path: Path):
+        """A prompt whose run raised is removed from the conversation."""
+        memory_dir = tmp_path / "memory"
+        _write_memory(memory_dir)
+
+        with patch("src.agent.PROVIDER", "grok"), \
+             patch("src.clients.openai.AsyncOpenAI") as mock_openai:
+            sent = self._chat(mock_openai, ["Hi. — Eva", RuntimeError("down"), "Still here. — Eva"])
+            session = Session(memory_dir)
+            session.ask("Hello")
+            with pytest.raises(RuntimeError):
+                session.ask("Broken")
+            session.ask("Again")
+
+        assert [m["content"] for m in sent[2][1:]] == ["Hello", "Hi. — Eva", "Again"]
+
+    def test_old_exchanges_trimmed_to_budget(self, tmp_path: Path):
+        """Past the session token budget the oldest exchanges are dropped."""
+        memory_dir = tmp_path / "memory"
+        _write_memory(memory_dir)
+
+        with patch("src.agent.PROVIDER", "grok"), \
+             patch("src.clients.openai.AsyncOpenAI") as mock_openai:
+            sent = self._chat(mock_openai, ["word " * 300, "Short. — Eva", "Done. — Eva"])
+            session = Session(memory_dir, token_budget=200)
+            session.ask("First")
+            session.ask("Second")
+            session.ask("Third")
+
+        assert [m["content"] for m in sent[2][1:]] == ["Second", "Short. — Eva", "Third"]
+
+
+class TestRunAgentAsync:
+    """Tests for run_agent_async function."""
+
+    def test_conversations_share_the_loop(self, tmp_path: Path):
+        """run_agent_async overlaps LLM waits across concurrent conversations."""
+        memory_dir = tmp_path / "memory"
+        _write_memory(memory_dir)
+
+        async def slow_create(**kwargs):
+            await asyncio.sleep(0.2)
+            text = MagicMock(type="text", text="Done.")
+            return MagicMock(content=[text])
+
+        async def run_many():
+            return await asyncio.gather(*(run_agent_async("Hi", memory_dir) for _ in range(5)))
+
+        with patch("src.agent.PROVIDER", "anthropic"), \
+             patch("src.clients.anthropic.AsyncAnthropic") as mock_anthropic:
+            mock_anthropic.return_value.messages.create = slow_create
+
+            start = time.perf_counter()
+            results = asyncio.run(run_many())
+            elapsed = time.perf_counter() - start
+
+        assert results == ["Done."] * 5
+        assert elapsed < 0.6
+
+    def test_nvidia_tool_loop(self, tmp_path: Path):
+        """run_agent_async drives the OpenAI-compatible adapter through a tool call."""
+        memory_dir = tmp_path / "memory"
+        _write_memory(memory_dir)
+
+        tool_call = MagicMock(id="call_1")
+        tool_call.function.name = "read_memory"
+        tool_call.function.arguments = '{"name": "soul"}'
+        first = MagicMock()
+        first.choices = [MagicMock(message=MagicMock(content=None, tool_calls=[tool_call]))]
+        second = MagicMock()
+        second.choices = [MagicMock(message=MagicMock(content="Soul read.", tool_calls=None))]
+
+        with patch("src.agent.PROVIDER", "nvidia"), \
+             patch("src.clients.openai.AsyncOpenAI") as mock_openai:
+            create = AsyncMock(side_effect=[first, second])
+            mock_openai.return_value.chat.completions.create = create
+
+            result = asyncio.run(run_agent_async("Read my soul", memory_dir))
+
+        assert result == "Soul read."
+        messages = create.call_args_list[1].kwargs["messages"]
+        assert messages[-1] == {"role": "tool", "tool_call_id": "call_1", "content": "# Soul"}
+
+
+class TestAgentBudgetEnforcement:
+    """Tests for AgentBudget limits inside the agent loop."""
+
+    def test_max_turns_returns_partial_answer(self, tmp_path: Path):
+        """run_agent stops after max_turns with the model's last text."""
+        memory_dir = tmp_path / "memory"
+        _write_memory(memory_dir)
+
+        text = MagicMock(type="text", text="Still looking...")
+        tool = MagicMock(type="tool_use", id="t1", input={"name": "soul"})
+        tool.name = "read_memory"
+        looping = MagicMock(content=[text, tool])
+
+        with patch("src.agent.PROVIDER", "anthropic"), \
+             patch("src.clients.anthropic.AsyncAnthropic") as mock_anthropic:
+            create = AsyncMock(return_value=looping)
+            mock_anthropic.return_value.messages.create = create
+
+            result = run_agent("Loop forever", memory_dir, budget=AgentBudget(max_turns=3))
+
+        assert result == "Still looking..."
+        assert create.call_count == 3
+
+    def test_deadline_cuts_off_slow_model(self, tmp_path: Path):
+        """run_agent gives up on a model call that outlives the deadline."""
+        memory_dir = tmp_path / "memory"
+        _write_memory(memory_dir)
+
+        async def hang(**kwargs):
+            await asyncio.sleep(5)
+
+        with patch("src.agent.PROVIDER", "anthropic"), \
+             patch("src.clients.anthropic.AsyncAnthropic") as mock_anthropic:
+            mock_anthropic.return_value.messages.create = hang
+
+            start = time.perf_counter()
+            result = run_agent("Hello", memory_dir, budget=AgentBudget(timeout=0.2))
+            elapsed = time.perf_counter() - start
+
+        assert "deadline" in result
+        assert elapsed < 1.0
+
+
+class TestResponseCache:
+    """Tests for the optional response cache around the agent loop."""
+
+    def test_repeat_prompt_served_from_cache(self, tmp_path: Path):
+        """run_agent answers a repeated prompt without calling the model."""
+        memory_dir = tmp_path / "memory"
+        _write_memory(memory_dir)
+        response = MagicMock(content=[MagicMock(type="text", text="Focus on Eva.")])
+
+        with patch("src.agent.PROVIDER", "anthropic"), \
+             patch("src.agent.get_response_cache", return_value=MemoryCache(8)), \
+             patch("src.clients.anthropic.AsyncAnthropic") as mock_anthropic:
+            create = AsyncMock(return_value=response)
+            mock_anthropic.return_value.messages.create = create
+
+            first = run_agent("What should I do today?", memory_dir)
+            second = run_agent("what should I do today?  ", memory_dir)
+            (memory_dir / "context.md").write_text("# Context\nNew entry")
+            third = run_agent("What should I do today?", memory_dir)
+
+        assert first == second == third == "Focus on Eva."
+        assert create.call_count == 2
+
+    def test_write_tool_bypasses_cache(self, tmp_path: Path):
+        """run_agent does not cache answers from runs that used a write tool."""
+        memory_dir = tmp_path / "memory"
+        _write_memory(memory_dir)
+        tool = MagicMock(type="tool_use", id="t1", input={"category": "Note", "summary": "s", "details": "d"})
+        tool.name = "update_context"
+        done = MagicMock(content=[MagicMock(type="text", text="Logged.")])
+        cache = MemoryCache(8)
+
+        with patch("src.agent.PROVIDER", "anthropic"), \
+             patch("src.agent.get_response_cache", return_value=cache), \
+             patch("src.agent.execute_tool", return_value="ok"), \
+             patch("src.clients.anthropic.AsyncAnthropic") as mock_anthropic:
+            mock_anthropic.return_value.messages.create = AsyncMock(
+                side_effect=[MagicMock(content=[tool]), done]
+            )
+
+            result = run_agent("Log a note", memory_dir)
+
+        assert result == "Logged."
+        assert len(cache) == 0
+
+    def test_cache_io_runs_off_the_event_loop(self, tmp_path: Path):
+        """run_agent does response cache I/O on worker threads, not the shared loop."""
+        memory_dir = tmp_path / "memory"
+        _write_memory(memory_dir)
+        response = MagicMock(content=[MagicMock(type="text", text="Focus on Eva.")])
+        on_loop = []
+
+        def running_loop() -> bool:
+            try:
+                asyncio.get_running_loop()
+                return True
+            except RuntimeError:
+                return False
+
+        class RecordingCache(MemoryCache):
+            def get(self, key):
+                on_loop.append(running_loop())
+                return super().get(key)
+
+            def set(self, key, value, ttl):
+                on_loop.append(running_loop())
+                super().set(key, value, ttl)
+
+        with patch("src.agent.PROVIDER", "anthropic"), \
+             patch("src.agent.get_response_cache", return_value=RecordingCache(8)), \
+             patch("src.clients.anthropic.AsyncAnthropic") as mock_anthropic:
+            mock_anthropic.return_value.messages.create = AsyncMock(return_value=response)
+            run_agent("What should I do today?", memory_dir)
+
+        assert on_loop == [False, False]
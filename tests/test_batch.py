@@ -0,0 +1,160 @@
+"""Tests for batch module."""
+import asyncio
+import json
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from src.batch import finished_ids, read_prompts, run_batch
+from src.eva import main
+
+
+def _write_memory(memory_dir: Path) -> None:
+    memory_dir.mkdir()
+    for name in ("soul", "user", "telos", "context", "harness"):
+        (memory_dir / f"{name}.md").write_text(f"# {name.title()}")
+
+
+def _write_prompts(path: Path, prompts: list[dict]) -> None:
+    path.write_text("".join(json.dumps(p) + "\n" for p in prompts))
+
+
+class TestReadPrompts:
+    """Tests for read_prompts and finished_ids."""
+
+    def test_ids_default_to_line_number(self, tmp_path: Path):
+        """read_prompts numbers prompts that have no id."""
+        path = tmp_path / "prompts.jsonl"
+        path.write_text('{"prompt": "a"}\n\n{"id": "x", "prompt": "b"}\n')
+
+        assert read_prompts(path) == [{"id": "1", "prompt": "a"}, {"id": "x", "prompt": "b"}]
+
+    def test_missing_prompt_rejected(self, tmp_path: Path):
+        """read_prompts names the offending line."""
+        path = tmp_path / "prompts.jsonl"
+        path.write_text('{"id": "x"}\n')
+
+        with pytest.raises(ValueError, match="prompts.jsonl:1"):
+            read_prompts(path)
+
+    def test_finished_ids_skip_errors_and_torn_lines(self, tmp_path: Path):
+        """finished_ids ignores failed results and a half-written last line."""
+        path = tmp_path / "results.jsonl"
+        path.write_text('{"id": "a", "response": "ok"}\n{"id": "b", "error": "boom"}\n{"id": "c", "resp')
+
+        assert finished_ids(path) == {"a"}
+
+
+class TestRunBatch:
+    """Tests for run_batch."""
+
+    def test_runs_all_prompts_with_bounded_concurrency(self, tmp_path: Path):
+        """run_batch answers every prompt, never exceeding the concurrency limit."""
+        memory_dir = tmp_path / "memory"
+        _write_memory(memory_dir)
+        prompts = tmp_path / "prompts.jsonl"
+        _write_prompts(prompts, [{"id": str(i), "prompt": f"p{i}"} for i in range(6)])
+        out = tmp_path / "results.jsonl"
+        active = 0
+        peak = 0
+        memories = []
+
+        async def fake_agent(prompt, memory_dir, usage, budget, memory=None):
+            nonlocal active, peak
+            memories.append(memory)
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.02)
+            active -= 1
+            usage["output_tokens"] += 3
+            return prompt.upper()
+
+        with patch("src.batch.run_agent_async", side_effect=fake_agent):
+            summary = run_batch(prompts, memory_dir, out, concurrency=2)
+
+        results = [json.loads(line) for line in out.read_text().splitlines()]
+        assert sorted(r["response"] for r in results) == [f"P{i}" for i in range(6)]
+        assert peak == 2
+        assert all(m is memories[0] for m in memories)  # Memory loaded once
+        assert summary["completed"] == 6
+        assert summary["usage"]["output_tokens"] == 18
+
+    def test_resume_skips_finished_and_retries_failed(self, tmp_path: Path):
+        """run_batch resumes from its output file after a crash."""
+        memory_dir = tmp_path / "memory"
+        _write_memory(memory_dir)
+        prompts = tmp_path / "prompts.jsonl"
+        _write_prompts(prompts, [{"id": i, "prompt": i} for i in ("a", "b", "c")])
+        out = tmp_path / "results.jsonl"
+        out.write_text('{"id": "a", "response": "A"}\n{"id": "b", "error": "timeout"}\n')
+        seen = []
+
+        async def fake_agent(prompt, memory_dir, usage, budget, memory=None):
+            seen.append(prompt)
+            return prompt.upper()
+
+        with patch("src.batch.run_agent_async", side_effect=fake_agent):
+            summary = run_batch(prompts, memory_dir, out)
+
+        assert sorted(seen) == ["b", "c"]
+        assert summary["skipped"] == 1
+        assert finished_ids(out) == {"a", "b", "c"}
+
+    def test_resume_after_torn_last_line(self, tmp_path: Path):
+        """A half-written last line is dropped, not appended onto."""
+        memory_dir = tmp_path / "memory"
+        _write_memory(memory_dir)
+        prompts = tmp_path / "prompts.jsonl"
+        _write_prompts(prompts, [{"id": i, "prompt": i} for i in ("a", "b")])
+        out = tmp_path / "results.jsonl"
+        out.write_text('{"id": "a", "response": "A"}\n{"id": "b", "resp')
+
+        async def fake_agent(prompt, memory_dir, usage, budget, memory=None):
+            return prompt.upper()
+
+        with patch("src.batch.run_agent_async", side_effect=fake_agent):
+            summary = run_batch(prompts, memory_dir, out)
+
+        results = [json.loads(line) for line in out.read_text().splitlines()]
+        assert [r["id"] for r in results] == ["a", "b"]
+        assert results[1]["response"] == "B"
+        assert summary["skipped"] == 1
+
+    def test_failures_recorded_not_raised(self, tmp_path: Path):
+        """run_batch writes a failing prompt's error and carries on."""
+        memory_dir = tmp_path / "memory"
+        _write_memory(memory_dir)
+        prompts = tmp_path / "prompts.jsonl"
+        _write_prompts(prompts, [{"id": "bad", "prompt": "x"}, {"id": "good", "prompt": "y"}])
+        out = tmp_path / "results.jsonl"
+
+        async def fake_agent(prompt, memory_dir, usage, budget, memory=None):
+            if prompt == "x":
+                raise RuntimeError("provider down")
+            return "ok"
+
+        with patch("src.batch.run_agent_async", side_effect=fake_agent):
+            summary = run_batch(prompts, memory_dir, out)
+
+        results = {r["id"]: r for r in map(json.loads, out.read_text().splitlines())}
+        assert results["bad"]["error"] == "provider down"
+        assert results["good"]["response"] == "ok"
+        assert (summary["completed"], summary["failed"]) == (1, 1)
+
+    def test_cli_prints_summary(self, tmp_path: Path, capsys):
+        """eva --batch runs the file and prints a throughput summary."""
+        memory_dir = tmp_path / "memory"
+        _write_memory(memory_dir)
+        prompts = tmp_path / "prompts.jsonl"
+        _write_prompts(prompts, [{"id": "a", "prompt": "a"}])
+
+        async def fake_agent(prompt, memory_dir, usage, budget, memory=None):
+            return "ok"
+
+        argv = ["eva", "--batch", str(prompts), "--memory-dir", str(memory_dir), "--concurrency", "3"]
+        with patch("sys.argv", argv), patch("src.batch.run_agent_async", side_effect=fake_agent):
+            main()
+
+        assert "1 completed" in capsys.readouterr().out
+        assert (tmp_path / "prompts.results.jsonl").exists()
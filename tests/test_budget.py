@@ -0,0 +1,109 @@
+"""Tests for budget module."""
+import time
+from unittest.mock import patch
+
+import pytest
+
+from src import memory
+from src.budget import AgentBudget, OutputBudget, fit_tokens
+from src.providers import new_usage
+
+
+class TestAgentBudget:
+    """Tests for AgentBudget."""
+
+    def test_unlimited_budget_never_exceeded(self):
+        """exceeded returns None when no limits are set."""
+        budget = AgentBudget()
+
+        assert budget.exceeded(100, new_usage()) is None
+        assert budget.remaining() is None
+
+    def test_turn_and_token_limits(self):
+        """exceeded names the first limit that is reached."""
+        budget = AgentBudget(max_turns=3, max_input_tokens=1000, max_output_tokens=100)
+        usage = new_usage()
+
+        assert budget.exceeded(2, usage) is None
+        assert budget.exceeded(3, usage) == "max_turns"
+
+        usage["cache_read_input_tokens"] = 1000
+        assert budget.exceeded(1, usage) == "max_input_tokens"
+
+        usage = new_usage()
+        usage["output_tokens"] = 150
+        assert budget.exceeded(1, usage) == "max_output_tokens"
+
+    def test_deadline(self):
+        """exceeded reports the deadline once the timeout has passed."""
+        budget = AgentBudget(timeout=0.05)
+
+        assert budget.exceeded(0, new_usage()) is None
+        time.sleep(0.06)
+        assert budget.exceeded(0, new_usage()) == "deadline"
+        assert budget.remaining() == 0.0
+
+    def test_from_env_defaults_and_overrides(self):
+        """from_env reads limits from the environment and honours overrides."""
+        with patch.dict("os.environ", {"EVA_MAX_TURNS": "", "EVA_TIMEOUT": "30"}):
+            budget = AgentBudget.from_env()
+            override = AgentBudget.from_env(max_turns=2, timeout=5)
+
+        assert budget.max_turns == 15
+        assert budget.timeout == 30.0
+        assert override.max_turns == 2
+        assert override.timeout == 5
+
+
+@pytest.fixture
+def estimated_tokens(monkeypatch):
+    """Count tokens as characters / 4, so cuts are predictable."""
+    monkeypatch.setattr(memory, "TOKEN_COUNTER", "estimate")
+
+
+class TestFitTokens:
+    """Tests for fit_tokens."""
+
+    def test_cuts_at_paragraph_with_note(self, estimated_tokens):
+        """Text is cut back to a paragraph break and the cut is marked."""
+        text = "\n\n".join(f"Paragraph {i}. " + "word " * 30 for i in range(20))
+
+        result = fit_tokens(text, 200)
+
+        assert memory.count_memory_tokens(result) <= 200
+        assert result.startswith("Paragraph 0.")
+        body, note = result.rsplit("\n", 1)
+        assert body.endswith("word ") and "\n\n" in body
+        assert note.startswith("[...truncated: about 200 of")
+        assert fit_tokens("short", 200) == "short"
+
+    def test_code_keeps_head_and_tail(self, estimated_tokens):
+        """With keep_tail the first and last lines survive and the middle goes."""
+        code = "import os\n" + "".join(f"x{i} = {i}\n" for i in range(500)) + "main()\n"
+
+        result = fit_tokens(code, 100, keep_tail=True)
+
+        assert result.startswith("import os\n")
+        assert result.endswith("main()\n")
+        assert "x250 = 250" not in result
+        assert "[...truncated" in result
+
+
+class TestOutputBudget:
+    """Tests for OutputBudget."""
+
+    def test_small_results_whole_large_ones_share(self, estimated_tokens):
+        """Small results are kept; large ones split what is left, up to per_result."""
+        budget = OutputBudget(total=1000, per_result=600, min_result=50)
+        small = "ok"
+        large = "line of text\n" * 1000
+
+        first = budget.fit([small, large, large])
+
+        assert first[0] == small
+        assert all(400 <= memory.count_memory_tokens(r) <= 500 for r in first[1:])
+        assert budget.used <= 1000
+
+        second = budget.fit([large])
+        assert memory.count_memory_tokens(second[0]) <= 50
+        assert "[...truncated" in second[0]
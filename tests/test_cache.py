@@ -0,0 +1,120 @@
+"""Tests for cache module."""
+import multiprocessing
+import sqlite3
+import time
+from pathlib import Path
+
+import pytest
+
+from src.cache import DiskCache, MemoryCache, normalize_prompt, response_key
+from src.memory import memory_hash
+
+MEMORY = memory_hash({"soul": "# Soul", "context": "# Context"})
+
+
+def _disk_writer(path: str) -> None:
+    DiskCache(Path(path), max_entries=10).set("from-child", {"answer": 42}, ttl=60)
+
+
+class TestMemoryCache:
+    """Tests for MemoryCache."""
+
+    def test_get_set_and_counters(self):
+        """MemoryCache returns stored values and counts hits and misses."""
+        cache = MemoryCache(max_entries=4)
+
+        assert cache.get("k") is None
+        cache.set("k", "v", ttl=60)
+
+        assert cache.get("k") == "v"
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_expired_entries_miss(self):
+        """MemoryCache drops entries once their TTL passes."""
+        cache = MemoryCache(max_entries=4)
+        cache.set("k", "v", ttl=0.01)
+        time.sleep(0.02)
+
+        assert cache.get("k") is None
+        assert len(cache) == 0
+
+    def test_evicts_least_recently_used(self):
+        """MemoryCache evicts the least recently used entry when full."""
+        cache = MemoryCache(max_entries=2)
+        cache.set("a", 1, ttl=None)
+        cache.set("b", 2, ttl=None)
+        cache.get("a")
+        cache.set("c", 3, ttl=None)
+
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.get("c") == 3
+
+
+class TestDiskCache:
+    """Tests for DiskCache."""
+
+    def test_round_trip_ttl_and_lru(self, tmp_path: Path):
+        """DiskCache stores JSON values with TTL and LRU eviction."""
+        cache = DiskCache(tmp_path / "cache.sqlite", max_entries=2)
+        cache.set("a", {"text": "one"}, ttl=None)
+        time.sleep(0.01)
+        cache.set("b", "two", ttl=60)
+        time.sleep(0.01)
+        cache.get("a")
+        time.sleep(0.01)
+        cache.set("c", "three", ttl=60)
+
+        assert cache.get("a") == {"text": "one"}
+        assert cache.get("b") is None
+        assert cache.get("c") == "three"
+
+        cache.set("old", "x", ttl=-1)
+        assert cache.get("old") is None
+
+    def test_closes_connections(self, tmp_path: Path, monkeypatch):
+        """Every connection DiskCache opens is closed again."""
+        opened = []
+        connect = sqlite3.connect
+        monkeypatch.setattr(sqlite3, "connect", lambda *a, **kw: opened.append(connect(*a, **kw)) or opened[-1])
+        cache = DiskCache(tmp_path / "cache.sqlite", max_entries=10)
+        cache.set("a", 1, ttl=60)
+        cache.get("a")
+        cache.set("old", "x", ttl=-1)
+        cache.get("old")
+        cache.delete("a")
+        cache.clear()
+
+        assert len(opened) == 7
+        for db in opened:
+            with pytest.raises(sqlite3.ProgrammingError):
+                db.execute("SELECT 1")
+
+    def test_shared_between_processes(self, tmp_path: Path):
+        """DiskCache entries written by another process are visible."""
+        path = tmp_path / "cache.sqlite"
+        cache = DiskCache(path, max_entries=10)
+
+        child = multiprocessing.get_context("spawn").Process(target=_disk_writer, args=(str(path),))
+        child.start()
+        child.join(30)
+
+        assert cache.get("from-child") == {"answer": 42}
+
+
+class TestResponseKey:
+    """Tests for response_key."""
+
+    def test_normalizes_prompt(self):
+        """response_key ignores case and whitespace differences."""
+        assert normalize_prompt("  What should I   do TODAY? ") == "what should i do today?"
+        assert response_key("What should I do today?", MEMORY, "anthropic", "m") == \
+            response_key("what should i  do today? ", MEMORY, "anthropic", "m")
+
+    def test_changes_with_memory_and_model(self):
+        """response_key differs when memory, provider or model change."""
+        key = response_key("Hi", MEMORY, "anthropic", "m")
+
+        assert key != response_key("Hi", memory_hash({"soul": "# Soul", "context": "# New"}), "anthropic", "m")
+        assert key != response_key("Hi", MEMORY, "nvidia", "m")
+        assert key != response_key("Hi", MEMORY, "anthropic", "other")
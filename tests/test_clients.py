@@ -0,0 +1,58 @@
+"""Tests for clients module."""
+import asyncio
+from unittest.mock import patch
+
+import src.clients as clients
+from src.clients import (
+    background_loop,
+    get_async_anthropic_client,
+    get_async_openai_client,
+    run_sync,
+)
+
+
+class TestClientRegistry:
+    """Tests for the pooled client registry."""
+
+    def test_anthropic_client_is_reused(self):
+        """get_async_anthropic_client returns the same client on one loop."""
+        async def lookup():
+            return get_async_anthropic_client(), get_async_anthropic_client()
+
+        with patch.dict("os.environ", {"ANTHROPIC_API_KEY": "test"}):
+            first, second = run_sync(lookup())
+
+        assert first is second
+
+    def test_openai_clients_keyed_by_provider_and_url(self):
+        """get_async_openai_client keeps one client per provider and base URL."""
+        async def lookup():
+            return (
+                get_async_openai_client("nvidia", "https://nvidia.example/v1", "key"),
+                get_async_openai_client("nvidia", "https://nvidia.example/v1", "key"),
+                get_async_openai_client("grok", "https://grok.example/v1", "key"),
+            )
+
+        nvidia, nvidia_again, grok = run_sync(lookup())
+
+        assert nvidia is nvidia_again
+        assert nvidia is not grok
+
+    def test_clients_are_per_event_loop(self):
+        """get_async_openai_client never shares a client across event loops."""
+        async def lookup():
+            return get_async_openai_client("grok", "https://grok.example/v1", "key")
+
+        shared = run_sync(lookup())
+        private = asyncio.run(lookup())
+
+        assert shared is not private
+
+    def test_new_process_gets_new_loop(self):
+        """background_loop is rebuilt after a fork (pid change)."""
+        parent = background_loop()
+
+        with patch.object(clients, "_pid", -1):
+            child = background_loop()
+
+        assert child is not parent
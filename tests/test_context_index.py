@@ -0,0 +1,157 @@
+"""Tests for context_index module."""
+import sqlite3
+import time
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+from src.context_index import ContextIndex, parse_entry
+from src.memory import update_context
+from src.retention import archive_context
+
+HEADER = "# Context\n\n<!-- Eva appends entries below this line -->\n"
+
+
+def _entry(stamp: str, category: str, summary: str, followup: str | None = None) -> str:
+    entry = f"\n### {stamp} - [{category}]\n**Summary:** {summary}\n**Details:** Line one\nline two\n"
+    if followup:
+        entry += f"**Follow-up:** {followup}\n"
+    return entry
+
+
+def _write_context(memory_dir: Path, entries: list[str]) -> Path:
+    memory_dir.mkdir(exist_ok=True)
+    path = memory_dir / "context.md"
+    path.write_text(HEADER + "".join(entries))
+    return path
+
+
+class TestParseEntry:
+    """Tests for parse_entry."""
+
+    def test_fields(self):
+        """parse_entry reads the heading and multi-line fields."""
+        record = parse_entry(_entry("2026-02-19 21:10", "Project", "Phase 3 done", "1. Connect Gmail\n2. Deploy").lstrip())
+
+        assert record == {
+            "timestamp": "2026-02-19 21:10",
+            "category": "Project",
+            "summary": "Phase 3 done",
+            "details": "Line one\nline two",
+            "followup": "1. Connect Gmail\n2. Deploy",
+        }
+
+    def test_not_an_entry(self):
+        """parse_entry rejects text without an entry heading."""
+        assert parse_entry("## Recent Context\n") is None
+
+
+class TestContextIndex:
+    """Tests for ContextIndex."""
+
+    def test_query_by_category_and_date(self, tmp_path: Path):
+        """query filters by category (any case) and half-open date range, newest first."""
+        memory_dir = tmp_path / "memory"
+        _write_context(memory_dir, [
+            _entry("2026-02-01 09:00", "Decision", "A"),
+            _entry("2026-02-10 09:00", "Commitment", "B", "Call Acme"),
+            _entry("2026-02-20 09:00", "Decision", "C"),
+        ])
+        index = ContextIndex(memory_dir)
+
+        decisions = index.query(category="decision")
+        february = index.query(since=datetime(2026, 2, 5), until="2026-02-20 09:00")
+
+        assert [e["summary"] for e in decisions] == ["C", "A"]
+        assert [e["summary"] for e in february] == ["B"]
+        assert index.counts(since="2026-02-05") == {"Commitment": 1, "Decision": 1}
+
+    def test_open_followups(self, tmp_path: Path):
+        """open_followups skips entries with no follow-up or one marked None/Done."""
+        memory_dir = tmp_path / "memory"
+        _write_context(memory_dir, [
+            _entry("2026-02-01 09:00", "Decision", "A", "Send proposal"),
+            _entry("2026-02-02 09:00", "Decision", "B", "None"),
+            _entry("2026-02-03 09:00", "Decision", "C", "Done."),
+            _entry("2026-02-04 09:00", "Decision", "D"),
+        ])
+
+        assert [e["summary"] for e in ContextIndex(memory_dir).open_followups()] == ["A"]
+
+    def test_appends_parse_only_the_tail(self, tmp_path: Path):
+        """After an append only the last indexed entry and the new ones are parsed."""
+        memory_dir = tmp_path / "memory"
+        _write_context(memory_dir, [_entry(f"2026-01-{d:02d} 09:00", "Decision", f"E{d}") for d in range(1, 21)])
+        index = ContextIndex(memory_dir)
+        assert index.refresh() == 20
+        assert index.refresh() == 0
+
+        update_context(memory_dir, "Learning", "Fresh", "Details", followup="Check in")
+
+        assert index.refresh() == 2
+        assert len(index.query()) == 21
+        assert index.query(category="Learning")[0]["followup"] == "Check in"
+
+    def test_non_ascii_offsets_resume(self, tmp_path: Path):
+        """Offsets stay byte-accurate past multi-byte text, so appends resume cleanly."""
+        memory_dir = tmp_path / "memory"
+        _write_context(memory_dir, [_entry(f"2026-01-{d:02d} 09:00", "Decision", f"Café ☕ {d}") for d in range(1, 21)])
+        index = ContextIndex(memory_dir)
+        index.refresh()
+
+        update_context(memory_dir, "Learning", "Fresh", "Details")
+
+        assert index.refresh() == 2
+        assert len(index.query()) == 21
+
+    def test_rewrite_rebuilds(self, tmp_path: Path):
+        """Archiving (which rewrites context.md) leaves the index consistent."""
+        memory_dir = tmp_path / "memory"
+        _write_context(memory_dir, [
+            _entry("2020-01-01 09:00", "Decision", "Old"),
+            _entry("2026-03-01 09:00", "Decision", "New"),
+        ])
+        index = ContextIndex(memory_dir)
+        assert len(index.query()) == 2
+
+        archive_context(memory_dir, days=30, now=datetime(2026, 3, 10))
+
+        assert [e["summary"] for e in index.query()] == ["New"]
+
+    def test_closes_connections(self, tmp_path: Path, monkeypatch):
+        """Every connection the index opens is closed again."""
+        memory_dir = tmp_path / "memory"
+        _write_context(memory_dir, [_entry("2026-01-01 09:00", "Decision", "A", "Todo")])
+        opened = []
+        connect = sqlite3.connect
+        monkeypatch.setattr(sqlite3, "connect", lambda *a, **kw: opened.append(connect(*a, **kw)) or opened[-1])
+        index = ContextIndex(memory_dir)
+        index.query()
+        index.counts()
+        index.open_followups()
+
+        assert len(opened) == 7
+        for db in opened:
+            with pytest.raises(sqlite3.ProgrammingError):
+                db.execute("SELECT 1")
+
+    def test_queries_large_log_quickly(self, tmp_path: Path):
+        """Queries over thousands of indexed entries take milliseconds."""
+        memory_dir = tmp_path / "memory"
+        entries = [
+            _entry(f"2025-{m:02d}-{d:02d} {h:02d}:00", ["Decision", "Commitment"][h % 2], f"E{m}{d}{h}", "Todo")
+            for m in range(1, 13) for d in range(1, 29) for h in range(0, 24, 3)
+        ]
+        _write_context(memory_dir, entries)
+        index = ContextIndex(memory_dir)
+        index.refresh()
+
+        start = time.perf_counter()
+        commitments = index.query(category="Commitment", since="2025-06-01", until="2025-07-01")
+        followups = index.open_followups(since="2025-12-01", limit=10)
+        elapsed = time.perf_counter() - start
+
+        assert len(commitments) == 28 * 4
+        assert len(followups) == 10
+        assert elapsed < 0.1, f"queries took {elapsed:.3f}s"
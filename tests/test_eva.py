@@ -3,7 +3,7 @@ import pytest
 from unittest.mock import patch, MagicMock
 from pathlib import Path
 
-from src.eva import main
+from src.eva import interactive_mode, main
 
 
 class TestMain:
@@ -48,3 +48,45 @@ class TestMain:
 
         captured = capsys.readouterr()
         assert "Error" in captured.err
+
+
+class TestInteractiveMode:
+    """Tests for the interactive REPL."""
+
+    def test_budget_passed_and_done_text_printed(self, tmp_path: Path, capsys):
+        """interactive_mode applies the budget and prints a budget stop message."""
+        done = {"type": "done", "text": "Stopped before finishing: deadline budget reached. — Eva"}
+
+        with patch("builtins.input", side_effect=["Hello", EOFError]):
+            with patch("src.eva.Session") as mock_session:
+                mock_session.return_value.stream.return_value = iter([done])
+                interactive_mode(tmp_path, max_turns=2, timeout=5.0)
+
+        budget = mock_session.return_value.stream.call_args.kwargs["budget"]
+        assert (budget.max_turns, budget.timeout) == (2, 5.0)
+        assert "Stopped before finishing" in capsys.readouterr().out
+
+    def test_streamed_answer_not_repeated(self, tmp_path: Path, capsys):
+        """interactive_mode does not print the done text again after streaming it."""
+        events = [{"type": "text", "text": "Hi. — Eva"}, {"type": "done", "text": "Hi. — Eva"}]
+
+        with patch("builtins.input", side_effect=["Hello", EOFError]):
+            with patch("src.eva.Session") as mock_session:
+                mock_session.return_value.stream.return_value = iter(events)
+                interactive_mode(tmp_path)
+
+        assert capsys.readouterr().out.count("Hi. — Eva") == 1
+
+    def test_prompts_share_one_session(self, tmp_path: Path):
+        """Every prompt goes to the same Session, and /reset clears it."""
+        done = {"type": "done", "text": "Ok. — Eva"}
+
+        with patch("builtins.input", side_effect=["One", "/reset", "Two", EOFError]):
+            with patch("src.eva.Session") as mock_session:
+                mock_session.return_value.stream.side_effect = lambda *a, **k: iter([done])
+                interactive_mode(tmp_path)
+
+        mock_session.assert_called_once_with(tmp_path)
+        prompts = [c.args[0] for c in mock_session.return_value.stream.call_args_list]
+        assert prompts == ["One", "Two"]
+        mock_session.return_value.reset.assert_called_once()
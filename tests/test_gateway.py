@@ -104,6 +104,40 @@ class TestTriggerEndpoint:
         assert b"heartbeat" in response.data
 
 
+class TestChatEndpoint:
+    """Tests for /chat endpoint."""
+
+    @pytest.fixture
+    def client(self):
+        app.config["TESTING"] = True
+        with app.test_client() as client:
+            yield client
+
+    def test_chat_streams_events(self, client):
+        """POST /chat streams agent events as SSE."""
+        events = [
+            {"type": "text", "text": "Hi"},
+            {"type": "done", "text": "Hi"},
+        ]
+
+        with patch("src.gateway.run_agent_stream", return_value=iter(events)), \
+             patch.dict("os.environ", {"EVA_CHAT_TOKEN": ""}):
+            response = client.post("/chat", json={"prompt": "Hello"})
+            body = response.get_data(as_text=True)
+
+        assert response.status_code == 200
+        assert response.mimetype == "text/event-stream"
+        assert 'event: text\ndata: {"type": "text", "text": "Hi"}' in body
+        assert "event: done" in body
+
+    def test_chat_requires_token_when_configured(self, client):
+        """POST /chat rejects requests without the configured bearer token."""
+        with patch.dict("os.environ", {"EVA_CHAT_TOKEN": "secret"}):
+            response = client.post("/chat", json={"prompt": "Hello"})
+
+        assert response.status_code == 403
+
+
 class TestHealthEndpoint:
     """Tests for /health endpoint."""
 
@@ -0,0 +1,140 @@
+"""Tests for history module."""
+from src.history import HistoryManager, trim_exchanges
+from src.memory import count_memory_tokens
+
+
+def _anthropic_history(payloads: list[str]) -> list:
+    messages = [{"role": "user", "content": "Compare these pages"}]
+    for i, payload in enumerate(payloads):
+        messages.append({"role": "assistant", "content": f"calling tool {i}"})
+        messages.append({
+            "role": "user",
+            "content": [{"type": "tool_result", "tool_use_id": f"t{i}", "content": payload}],
+        })
+    return messages
+
+
+class TestHistoryManager:
+    """Tests for HistoryManager."""
+
+    def test_under_budget_is_untouched(self):
+        """compact leaves history alone while it fits the budget."""
+        messages = _anthropic_history(["short result", "another one"])
+        manager = HistoryManager(budget=1000, keep_recent=1)
+
+        saved = manager.compact(messages)
+
+        assert saved == 0
+        assert messages[2]["content"][0]["content"] == "short result"
+
+    def test_old_results_stubbed_recent_kept(self):
+        """compact stubs the oldest results and keeps the newest verbatim."""
+        big = "word " * 2000
+        messages = _anthropic_history([big, big, big])
+        manager = HistoryManager(budget=2500, keep_recent=1)
+
+        saved = manager.compact(messages)
+
+        first = messages[2]["content"][0]["content"]
+        last = messages[6]["content"][0]["content"]
+        assert first.startswith("[Earlier tool result compacted")
+        assert last == big
+        assert saved > 0
+        assert manager.history_tokens(messages) <= 2500
+        assert manager.tokens_saved == saved
+
+    def test_openai_tool_messages(self):
+        """compact handles OpenAI role=tool messages."""
+        big = "line of page text\n" * 500
+        messages = [
+            {"role": "system", "content": "You are Eva"},
+            {"role": "user", "content": "Fetch"},
+            {"role": "assistant", "content": None, "tool_calls": [{"id": "a"}]},
+            {"role": "tool", "tool_call_id": "a", "content": big},
+            {"role": "assistant", "content": None, "tool_calls": [{"id": "b"}]},
+            {"role": "tool", "tool_call_id": "b", "content": big},
+        ]
+        manager = HistoryManager(budget=count_memory_tokens(big), keep_recent=1)
+
+        saved = manager.compact(messages)
+
+        assert saved > 0
+        assert messages[3]["content"].startswith("[Earlier tool result compacted")
+        assert messages[5]["content"] == big
+        assert messages[0]["content"] == "You are Eva"
+
+    def test_newest_round_kept_even_beyond_keep_recent(self):
+        """compact never stubs results the model has not seen yet."""
+        big = "word " * 3000
+        messages = _anthropic_history([big])
+        messages.append({"role": "assistant", "content": "calling five tools"})
+        messages.append({
+            "role": "user",
+            "content": [
+                {"type": "tool_result", "tool_use_id": f"p{i}", "content": big}
+                for i in range(5)
+            ],
+        })
+        manager = HistoryManager(budget=12000, keep_recent=3)
+
+        saved = manager.compact(messages)
+
+        assert saved > 0
+        assert messages[2]["content"][0]["content"].startswith("[Earlier tool result compacted")
+        assert all(block["content"] == big for block in messages[4]["content"])
+
+    def test_openai_parallel_round_kept(self):
+        """compact keeps every role=tool message answering the last assistant turn."""
+        big = "line of page text\n" * 500
+        messages = [
+            {"role": "user", "content": "Fetch"},
+            {"role": "assistant", "content": None, "tool_calls": [{"id": "a"}, {"id": "b"}]},
+            {"role": "tool", "tool_call_id": "a", "content": big},
+            {"role": "tool", "tool_call_id": "b", "content": big},
+        ]
+        manager = HistoryManager(budget=count_memory_tokens(big), keep_recent=1)
+
+        assert manager.compact(messages) == 0
+        assert messages[2]["content"] == big
+
+    def test_forgets_dropped_results(self):
+        """Results dropped from the history leave the count cache, and new ones are counted afresh."""
+        messages = _anthropic_history(["short"] * 10)
+        manager = HistoryManager(budget=100000, keep_recent=1)
+        manager.history_tokens(messages)
+
+        del messages[1:]
+        big = "word " * 500
+        messages.extend(_anthropic_history([big])[1:])
+
+        assert manager.history_tokens(messages) == count_memory_tokens(big)
+        assert len(manager._counts) == 1
+
+
+class TestTrimExchanges:
+    """Tests for trim_exchanges."""
+
+    def test_within_budget_is_untouched(self):
+        """A conversation under budget is left alone."""
+        messages = [{"role": "user", "content": "Hi"}, {"role": "assistant", "content": "Hello"}]
+
+        assert trim_exchanges(messages, budget=1000) == 0
+        assert len(messages) == 2
+
+    def test_drops_whole_oldest_exchanges(self):
+        """Old exchanges go with their tool rounds; the system message and newest exchange stay."""
+        messages = [{"role": "system", "content": "You are Eva"}]
+        messages += _anthropic_history(["word " * 1000])
+        messages += [{"role": "assistant", "content": "Done"}, {"role": "user", "content": "Next question"}]
+
+        dropped = trim_exchanges(messages, budget=100)
+
+        assert dropped > 900
+        assert messages == [{"role": "system", "content": "You are Eva"}, {"role": "user", "content": "Next question"}]
+
+    def test_newest_exchange_kept_even_over_budget(self):
+        """The exchange in progress is never dropped."""
+        messages = _anthropic_history(["word " * 1000])
+
+        assert trim_exchanges(messages, budget=10) == 0
+        assert len(messages) == 3
@@ -1,10 +1,43 @@
 """Tests for memory module."""
+import multiprocessing
+import os
+import re
+import subprocess
+import sys
 import time
 
 import pytest
 from pathlib import Path
 
-from src.memory import load_memory_file, load_all_memory, count_memory_tokens, update_context
+from src import memory
+from src.memory import (
+    MEMORY_REGISTRY,
+    ON_DEMAND,
+    ContextBuffer,
+    MemoryFile,
+    count_memory_tokens,
+    count_tokens_batch,
+    estimate_tokens,
+    invalidate_memory,
+    load_all_memory,
+    load_memory_file,
+    memory_snapshot,
+    read_context_tail,
+    registered_memory,
+    truncate_tokens,
+    update_context,
+)
+
+
+def _context_writer(memory_dir: str, writer: int, count: int) -> None:
+    for i in range(count):
+        update_context(Path(memory_dir), "Learning", f"w{writer}-{i}", f"w{writer}-{i} " * 400)
+
+
+def _write_memory(memory_dir: Path) -> None:
+    memory_dir.mkdir()
+    for name in ("soul", "user", "telos", "context", "harness"):
+        (memory_dir / f"{name}.md").write_text(f"# {name.title()}")
 
 
 class TestLoadMemoryFile:
@@ -105,6 +138,49 @@ class TestCountMemoryTokens:
         result = count_memory_tokens(text)
         assert result == 2
 
+    def test_encoder_not_loaded_at_import(self):
+        """Importing Eva does not load (or download) the tiktoken encoding."""
+        code = (
+            "import tiktoken\n"
+            "def boom(name): raise AssertionError('encoder loaded at import')\n"
+            "tiktoken.get_encoding = boom\n"
+            "import src.agent, src.gateway, src.eva\n"
+        )
+        root = Path(__file__).parent.parent
+
+        result = subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True, text=True)
+
+        assert result.returncode == 0, result.stderr
+
+    def test_estimate_mode_skips_encoder(self, monkeypatch):
+        """EVA_TOKEN_COUNTER=estimate counts from length without loading tiktoken."""
+        monkeypatch.setattr(memory, "TOKEN_COUNTER", "estimate")
+        monkeypatch.setattr(memory, "_encoder", None)
+
+        assert count_memory_tokens("x" * 10) == estimate_tokens("x" * 10) == 3
+        assert memory._encoder is None
+
+    def test_falls_back_to_estimate_when_encoder_fails(self, monkeypatch, capsys):
+        """If the encoding cannot be loaded, counts are estimated after one warning."""
+        import tiktoken
+
+        def offline(name):
+            raise ConnectionError("no network")
+
+        monkeypatch.setattr(memory, "_encoder", None)
+        monkeypatch.setattr(memory, "_encoder_failed", False)
+        monkeypatch.setattr(tiktoken, "get_encoding", offline)
+
+        assert count_memory_tokens("abcdefgh") == 2
+        assert count_tokens_batch(["abcd", "abcdefghi"]) == [1, 3]
+        assert capsys.readouterr().err.count("estimating token counts") == 1
+
+    def test_batch_matches_single(self):
+        """count_tokens_batch gives the same counts as counting one at a time."""
+        texts = ["Hello world", "", "A longer sentence, with punctuation!", "<|endoftext|> is plain text"]
+
+        assert count_tokens_batch(texts) == [count_memory_tokens(t) for t in texts]
+
 
 class TestUpdateContext:
     """Tests for update_context function."""
@@ -167,6 +243,229 @@ class TestUpdateContext:
         assert "Check back tomorrow" in content
 
 
+class TestConcurrentAppends:
+    """Tests for locked appends and ContextBuffer."""
+
+    def test_writers_in_many_processes_never_interleave(self, tmp_path: Path):
+        """Entries from concurrent processes are each written whole."""
+        memory_dir = tmp_path / "memory"
+        memory_dir.mkdir()
+        (memory_dir / "context.md").write_text("# Context\n")
+        spawn = multiprocessing.get_context("spawn")
+        writers = [spawn.Process(target=_context_writer, args=(str(memory_dir), w, 25)) for w in range(4)]
+        for writer in writers:
+            writer.start()
+        for writer in writers:
+            writer.join(60)
+
+        entries = re.findall(
+            r"\n### [\d-]+ [\d:]+ - \[Learning\]\n\*\*Summary:\*\* (\S+)\n\*\*Details:\*\* ((?:\S+ )+)\n",
+            (memory_dir / "context.md").read_text(),
+        )
+        assert len(entries) == 100
+        assert all(details == f"{summary} " * 400 for summary, details in entries)
+
+    def test_buffer_flushes_as_group(self, tmp_path: Path):
+        """ContextBuffer writes nothing until flushed, then every entry in order."""
+        memory_dir = tmp_path / "memory"
+        memory_dir.mkdir()
+        context_file = memory_dir / "context.md"
+        context_file.write_text("# Context\n")
+
+        with ContextBuffer(memory_dir, max_entries=3) as buffer:
+            buffer.add("Learning", "one", "1")
+            buffer.add("Learning", "two", "2")
+            assert context_file.read_text() == "# Context\n"
+            buffer.add("Learning", "three", "3")  # Reaches max_entries
+            assert len(buffer) == 0
+            buffer.add("Decision", "four", "4", followup="Later")
+            assert "four" not in context_file.read_text()
+
+        summaries = re.findall(r"\*\*Summary:\*\* (\w+)", context_file.read_text())
+        assert summaries == ["one", "two", "three", "four"]
+        assert "**Follow-up:** Later" in context_file.read_text()
+
+    def test_flush_invalidates_snapshot(self, tmp_path: Path):
+        """A flushed group is visible through memory_snapshot straight away."""
+        memory_dir = tmp_path / "memory"
+        _write_memory(memory_dir)
+        memory_snapshot(memory_dir)
+        buffer = ContextBuffer(memory_dir)
+
+        buffer.add("Learning", "Buffered", "Details")
+        assert buffer.flush() == 1
+
+        assert "Buffered" in memory_snapshot(memory_dir).files["context"]
+
+
+def _write_log(memory_dir: Path, count: int) -> None:
+    memory_dir.mkdir()
+    entries = "".join(f"\n### 2026-03-{i + 1:02d} 09:00 - [Learning]\n**Summary:** Entry {i}\n" for i in range(count))
+    (memory_dir / "context.md").write_text(f"# Context\n\n### Format\nRules\n\n{memory.ENTRIES_MARKER}\n{entries}")
+
+
+class TestReadContextTail:
+    """Tests for read_context_tail."""
+
+    def test_newest_entries_with_header(self, tmp_path: Path):
+        """read_context_tail keeps the header and only the newest entries."""
+        memory_dir = tmp_path / "memory"
+        _write_log(memory_dir, 10)
+
+        tail = read_context_tail(memory_dir, entries=3)
+
+        assert tail.startswith("# Context\n\n### Format\nRules")
+        assert [f"Entry {i}" in tail for i in (6, 7, 8, 9)] == [False, True, True, True]
+        assert tail.endswith("**Summary:** Entry 9\n")
+
+    def test_whole_file_when_everything_fits(self, tmp_path: Path):
+        """Nothing is cut, or re-joined, when the file has no more entries than asked for."""
+        memory_dir = tmp_path / "memory"
+        _write_log(memory_dir, 3)
+        text = (memory_dir / "context.md").read_text()
+
+        assert read_context_tail(memory_dir, entries=3) == text
+        assert read_context_tail(memory_dir) == text
+        (memory_dir / "context.md").write_text("")
+        assert read_context_tail(memory_dir, entries=3) == ""
+
+    def test_token_budget(self, tmp_path: Path, monkeypatch):
+        """A token budget keeps whole entries, and always the newest one."""
+        monkeypatch.setattr(memory, "TOKEN_COUNTER", "estimate")
+        memory_dir = tmp_path / "memory"
+        _write_log(memory_dir, 10)
+        entry_tokens = estimate_tokens("\n### 2026-03-01 09:00 - [Learning]\n**Summary:** Entry 0\n")
+
+        tail = read_context_tail(memory_dir, tokens=entry_tokens * 2)
+
+        assert "Entry 7" not in tail and "Entry 8" in tail and "Entry 9" in tail
+        assert "Entry 9" in read_context_tail(memory_dir, tokens=1)
+
+    def test_missing_file_raises(self, tmp_path: Path):
+        """read_context_tail raises FileNotFoundError like load_memory_file."""
+        with pytest.raises(FileNotFoundError):
+            read_context_tail(tmp_path)
+
+    def test_snapshot_loads_tail(self, tmp_path: Path, monkeypatch):
+        """Snapshots hold the newest EVA_CONTEXT_TAIL_ENTRIES context entries."""
+        monkeypatch.setattr(memory, "CONTEXT_TAIL_ENTRIES", 2)
+        memory_dir = tmp_path / "memory"
+        _write_log(memory_dir, 5)
+        for name in ("soul", "user", "telos", "harness"):
+            (memory_dir / f"{name}.md").write_text(f"# {name.title()}")
+
+        context = memory_snapshot(memory_dir).files["context"]
+
+        assert "Entry 2" not in context and "Entry 3" in context and "Entry 4" in context
+
+
+class TestMemoryRegistry:
+    """Tests for the memory file registry."""
+
+    def test_default_files_in_prompt_order(self):
+        """Stable files come first and context.md last; ecosystem.md is on demand."""
+        names = [spec.name for spec in registered_memory()]
+
+        assert names[:4] == ["soul", "user", "telos", "harness"]
+        assert names[-1] == "context"
+        assert [spec.name for spec in registered_memory(required=True)] == ["soul", "user", "telos", "harness", "context"]
+        assert [spec.name for spec in registered_memory(ON_DEMAND)] == ["ecosystem"]
+
+    def test_registered_file_loaded_when_present(self, tmp_path: Path, monkeypatch):
+        """A newly registered optional file joins the snapshot once it exists."""
+        monkeypatch.setitem(MEMORY_REGISTRY, "travel", MemoryFile("travel", "Travel", policy=ON_DEMAND))
+        memory_dir = tmp_path / "memory"
+        _write_memory(memory_dir)
+        assert "travel" not in memory_snapshot(memory_dir).files
+
+        (memory_dir / "travel.md").write_text("# Travel\nLisbon in May")
+
+        assert memory_snapshot(memory_dir).files["travel"] == "# Travel\nLisbon in May"
+
+    def test_unknown_policy_rejected(self):
+        """MemoryFile raises ValueError for a policy it does not know."""
+        with pytest.raises(ValueError):
+            MemoryFile("notes", "Notes", policy="sometimes")
+
+
+class TestTruncateTokens:
+    """Tests for truncate_tokens."""
+
+    def test_cuts_at_line_boundary(self, monkeypatch):
+        """Text is cut to whole lines from the start or, with from_end, the end."""
+        monkeypatch.setattr(memory, "TOKEN_COUNTER", "estimate")
+        text = "".join(f"line {i:02d}\n" for i in range(10))  # 8 characters, 2 tokens per line
+
+        assert truncate_tokens(text, 100) == text
+        assert truncate_tokens(text, 5) == "line 00\nline 01"
+        assert truncate_tokens(text, 5, from_end=True) == "line 08\nline 09\n"
+        assert truncate_tokens(text, 0) == ""
+
+
+class TestMemorySnapshot:
+    """Tests for the memory_snapshot cache."""
+
+    def test_unchanged_files_reuse_snapshot(self, tmp_path: Path):
+        """memory_snapshot returns the same object while no file changes."""
+        memory_dir = tmp_path / "memory"
+        _write_memory(memory_dir)
+
+        first = memory_snapshot(memory_dir)
+        second = memory_snapshot(memory_dir)
+
+        assert second is first
+        assert first.files == load_all_memory(memory_dir)
+        assert second.derived("prompt", lambda: object()) is first.derived("prompt", lambda: object())
+
+    def test_changed_file_reloads(self, tmp_path: Path):
+        """A new mtime or size produces a new snapshot with a new digest."""
+        memory_dir = tmp_path / "memory"
+        _write_memory(memory_dir)
+        first = memory_snapshot(memory_dir)
+
+        (memory_dir / "user.md").write_text("# User\nLives in Lisbon")
+        second = memory_snapshot(memory_dir)
+
+        assert second is not first
+        assert "Lisbon" in second.files["user"]
+        assert second.digest != first.digest
+
+    def test_digest_depends_only_on_content(self, tmp_path: Path):
+        """Identical memory in two directories has the same digest."""
+        _write_memory(tmp_path / "a")
+        _write_memory(tmp_path / "b")
+
+        assert memory_snapshot(tmp_path / "a").digest == memory_snapshot(tmp_path / "b").digest
+
+    def test_update_context_invalidates(self, tmp_path: Path):
+        """update_context drops the cached snapshot even if the stamp looks unchanged."""
+        memory_dir = tmp_path / "memory"
+        _write_memory(memory_dir)
+        context = memory_dir / "context.md"
+        first = memory_snapshot(memory_dir)
+        mtime = context.stat().st_mtime_ns
+
+        # Same size and mtime: invisible to the stat check
+        context.write_text("# Changed")
+        os.utime(context, ns=(mtime, mtime))
+        assert memory_snapshot(memory_dir) is first
+        invalidate_memory(memory_dir)
+        assert memory_snapshot(memory_dir).files["context"] == "# Changed"
+
+        update_context(memory_dir, "Decision", "Moved", "Moved to Lisbon.")
+        assert "Moved to Lisbon." in memory_snapshot(memory_dir).files["context"]
+
+    def test_missing_file_raises(self, tmp_path: Path):
+        """memory_snapshot raises like load_all_memory when a file is missing."""
+        memory_dir = tmp_path / "memory"
+        _write_memory(memory_dir)
+        memory_snapshot(memory_dir)
+        (memory_dir / "telos.md").unlink()
+
+        with pytest.raises(FileNotFoundError):
+            memory_snapshot(memory_dir)
+
+
 class TestPerformance:
     """Performance tests for memory module."""
 
@@ -0,0 +1,147 @@
+"""Tests for metrics module."""
+import json
+import os
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from src import metrics
+from src.agent import run_agent
+from src.gateway import app
+from src.tools import execute_tool
+from src.workflows.base import sync_memory
+
+
+@pytest.fixture(autouse=True)
+def fresh_registry():
+    """Keep recorded metrics from leaking between tests."""
+    metrics.REGISTRY.reset()
+    yield
+    metrics.REGISTRY.reset()
+
+
+def _write_memory(memory_dir: Path) -> None:
+    memory_dir.mkdir()
+    for name in ("soul", "user", "telos", "context", "harness"):
+        (memory_dir / f"{name}.md").write_text(f"# {name.title()}")
+
+
+class TestRender:
+    """Tests for the Prometheus text format."""
+
+    def test_counter_and_cumulative_histogram(self):
+        """render writes HELP/TYPE lines, cumulative buckets, sum and count."""
+        metrics.inc("eva_llm_tokens_total", 1500000, provider="grok", type="input")
+        metrics.observe("eva_tool_seconds", 0.02, tool="fetch_webpage")
+        metrics.observe("eva_tool_seconds", 3.0, tool="fetch_webpage")
+
+        text = metrics.render(metrics.collect())
+
+        assert "# TYPE eva_llm_tokens_total counter" in text
+        assert 'eva_llm_tokens_total{provider="grok",type="input"} 1500000' in text
+        assert "# TYPE eva_tool_seconds histogram" in text
+        assert 'eva_tool_seconds_bucket{tool="fetch_webpage",le="0.025"} 1' in text
+        assert 'eva_tool_seconds_bucket{tool="fetch_webpage",le="5"} 2' in text
+        assert 'eva_tool_seconds_bucket{tool="fetch_webpage",le="+Inf"} 2' in text
+        assert 'eva_tool_seconds_count{tool="fetch_webpage"} 2' in text
+
+    def test_collect_sums_worker_snapshots(self, tmp_path: Path, monkeypatch):
+        """collect adds up every worker's snapshot in EVA_METRICS_DIR."""
+        monkeypatch.setattr(metrics, "METRICS_DIR", str(tmp_path))
+        metrics.inc("eva_agent_conversations_total", outcome="answered")
+        metrics.observe("eva_git_seconds", 0.2, command="pull")
+        other = metrics.Registry()
+        other.inc("eva_agent_conversations_total", 2, outcome="answered")
+        other.observe("eva_git_seconds", 0.3, command="pull")
+        (tmp_path / f"metrics-{os.getpid() + 1}.json").write_text(json.dumps(other.snapshot()))
+
+        merged = metrics.collect()
+
+        counter = next(iter(merged["counters"].values()))
+        hist = next(iter(merged["histograms"].values()))
+        assert counter == 3
+        assert hist["count"] == 2
+        assert hist["sum"] == pytest.approx(0.5)
+        assert (tmp_path / f"metrics-{os.getpid()}.json").exists()
+
+
+class TestInstrumentation:
+    """Tests for the timings recorded around LLM, tool, git and Composio calls."""
+
+    def test_agent_records_llm_tokens_and_turns(self, tmp_path: Path):
+        """run_agent records call latency, token counts and turns per provider."""
+        memory_dir = tmp_path / "memory"
+        _write_memory(memory_dir)
+        response = MagicMock(content=[MagicMock(type="text", text="Hi. — Eva")])
+        response.usage = MagicMock(
+            input_tokens=120, output_tokens=8, cache_creation_input_tokens=None, cache_read_input_tokens=None
+        )
+
+        with patch("src.agent.PROVIDER", "anthropic"), \
+             patch("src.clients.anthropic.AsyncAnthropic") as mock_anthropic:
+            mock_anthropic.return_value.messages.create = AsyncMock(return_value=response)
+            run_agent("Hello", memory_dir)
+
+        text = metrics.render(metrics.collect())
+        assert 'eva_llm_request_seconds_count{provider="anthropic"} 1' in text
+        assert 'eva_llm_tokens_total{provider="anthropic",type="input"} 120' in text
+        assert 'eva_llm_tokens_total{provider="anthropic",type="output"} 8' in text
+        assert 'eva_agent_turns_bucket{le="1"} 1' in text
+        assert 'eva_agent_conversations_total{outcome="answered"} 1' in text
+
+    def test_tool_latency_and_errors(self, tmp_path: Path):
+        """execute_tool times every call and counts failed ones."""
+        memory_dir = tmp_path / "memory"
+        memory_dir.mkdir()
+
+        execute_tool("read_memory", {"name": "soul"}, memory_dir)
+
+        text = metrics.render(metrics.collect())
+        assert 'eva_tool_seconds_count{tool="read_memory"} 1' in text
+        assert 'eva_tool_errors_total{tool="read_memory"} 1' in text
+
+    def test_git_and_composio_timed(self, tmp_path: Path):
+        """sync_memory and Composio actions are timed by command and action."""
+        from src.composio_tools import send_email
+
+        with patch("src.workflows.base.subprocess.run"):
+            sync_memory(tmp_path)
+        with patch("src.composio_tools.ComposioToolSet") as toolset:
+            toolset.return_value.execute_action.side_effect = RuntimeError("down")
+            with pytest.raises(RuntimeError):
+                send_email("a@b.c", "s", "b")
+
+        text = metrics.render(metrics.collect())
+        assert 'eva_git_seconds_count{command="pull"} 1' in text
+        assert 'eva_composio_seconds_count{action="GMAIL_SEND_EMAIL"} 1' in text
+        assert 'eva_composio_errors_total{action="GMAIL_SEND_EMAIL"} 1' in text
+
+
+class TestMetricsEndpoint:
+    """Tests for the gateway /metrics route and CLI summary."""
+
+    def test_metrics_route(self):
+        """GET /metrics serves the Prometheus text format."""
+        metrics.inc("eva_agent_conversations_total", outcome="answered")
+
+        response = app.test_client().get("/metrics")
+
+        assert response.status_code == 200
+        assert response.mimetype == "text/plain"
+        assert 'eva_agent_conversations_total{outcome="answered"} 1' in response.get_data(as_text=True)
+
+    def test_cli_summary_on_stderr(self, tmp_path: Path, capsys):
+        """eva --metrics prints the summary to stderr, keeping stdout clean."""
+        def fake_run_agent(prompt, memory_dir):
+            metrics.observe("eva_llm_request_seconds", 0.5, provider="grok")
+            return "Hi. — Eva"
+
+        with patch("sys.argv", ["eva", "Hello", "--metrics"]), \
+             patch("src.eva.run_agent", side_effect=fake_run_agent):
+            from src.eva import main
+            main()
+
+        captured = capsys.readouterr()
+        assert captured.out.strip() == "Hi. — Eva"
+        assert 'eva_llm_request_seconds{provider="grok"}: n=1' in captured.err
@@ -0,0 +1,148 @@
+"""Tests for prefetch module."""
+import threading
+import time
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from src.agent import run_agent
+from src.prefetch import Prefetcher, find_targets, target_key
+
+
+class RecordingPrefetcher(Prefetcher):
+    """Prefetcher that remembers its instances for inspection."""
+
+    instances: list = []
+
+    def __init__(self, memory_dir):
+        super().__init__(memory_dir)
+        RecordingPrefetcher.instances.append(self)
+
+
+def _write_memory(memory_dir: Path) -> None:
+    memory_dir.mkdir()
+    for name in ("soul", "user", "telos", "context", "harness"):
+        (memory_dir / f"{name}.md").write_text(f"# {name.title()}")
+
+
+def _tool_use(name: str, input: dict) -> MagicMock:
+    block = MagicMock(type="tool_use", id="t1", input=input)
+    block.name = name
+    return block
+
+
+class TestFindTargets:
+    """Tests for find_targets."""
+
+    def test_urls_and_github_repos(self):
+        """find_targets maps GitHub repos to github_get_repo and other URLs to fetch_webpage."""
+        prompt = (
+            "Compare https://example.com/pricing, github.com/safarivis/agents_eva and "
+            "https://github.com/psf/requests/blob/main/README.md."
+        )
+
+        assert find_targets(prompt) == [
+            ("github_get_repo", {"owner": "safarivis", "repo": "agents_eva"}),
+            ("github_get_repo", {"owner": "psf", "repo": "requests"}),
+            ("fetch_webpage", {"url": "https://example.com/pricing"}),
+        ]
+
+    def test_no_targets(self):
+        """find_targets finds nothing in a plain prompt."""
+        assert find_targets("What should I focus on today?") == []
+
+    def test_keys_ignore_case_and_trailing_slash(self):
+        """target_key matches the model's spelling of the same target."""
+        assert target_key("github_get_repo", {"owner": "PSF", "repo": "Requests"}) == \
+            target_key("github_get_repo", {"owner": "psf", "repo": "requests"})
+        assert target_key("fetch_webpage", {"url": "https://a.com/"}) == \
+            target_key("fetch_webpage", {"url": "https://a.com"})
+        assert target_key("fetch_webpage", {"url": "https://a.com", "max_chars": 3000}) is None
+
+
+class TestPrefetchInAgent:
+    """Tests for prefetching in the agent loop."""
+
+    def test_matching_tool_call_uses_prefetch(self, tmp_path: Path):
+        """A tool call for a prefetched URL does not run the tool a second time."""
+        memory_dir = tmp_path / "memory"
+        _write_memory(memory_dir)
+        calls = []
+        lock = threading.Lock()
+
+        def fake_tool(name, args, memory_dir):
+            with lock:
+                calls.append((name, args))
+            return "RAW CONTENT"
+
+        responses = [
+            MagicMock(content=[_tool_use("fetch_webpage", {"url": "https://example.com/"})]),
+            MagicMock(content=[MagicMock(type="text", text="Pricing page. — Eva")]),
+        ]
+        with patch("src.agent.PROVIDER", "anthropic"), \
+             patch("src.agent.PREFETCH", True), \
+             patch("src.prefetch.execute_tool", side_effect=fake_tool), \
+             patch("src.agent.execute_tool", side_effect=fake_tool), \
+             patch("src.agent.Prefetcher", RecordingPrefetcher), \
+             patch("src.clients.anthropic.AsyncAnthropic") as mock_anthropic:
+            create = AsyncMock(side_effect=responses)
+            mock_anthropic.return_value.messages.create = create
+
+            result = run_agent("What is on https://example.com?", memory_dir)
+
+        assert result == "Pricing page. — Eva"
+        assert calls == [("fetch_webpage", {"url": "https://example.com"})]
+        tool_result = create.call_args_list[1].kwargs["messages"][-1]["content"][0]["content"]
+        assert tool_result == "RAW CONTENT"
+        assert RecordingPrefetcher.instances[-1].counts == {"used": 1, "wasted": 0, "cancelled": 0}
+
+    def test_claimed_prefetch_bounded_by_tool_timeout(self, tmp_path: Path):
+        """A hung prefetch the model asked for times out like the tool itself would."""
+        memory_dir = tmp_path / "memory"
+        _write_memory(memory_dir)
+        release = threading.Event()
+
+        def hung_tool(name, args, memory_dir):
+            release.wait(30)
+            return "RAW CONTENT"
+
+        responses = [
+            MagicMock(content=[_tool_use("fetch_webpage", {"url": "https://example.com/"})]),
+            MagicMock(content=[MagicMock(type="text", text="It timed out. — Eva")]),
+        ]
+        with patch("src.agent.PROVIDER", "anthropic"), \
+             patch("src.agent.PREFETCH", True), \
+             patch("src.prefetch.execute_tool", side_effect=hung_tool), \
+             patch("src.agent.tool_timeout", return_value=0.2), \
+             patch("src.clients.anthropic.AsyncAnthropic") as mock_anthropic:
+            create = AsyncMock(side_effect=responses)
+            mock_anthropic.return_value.messages.create = create
+
+            start = time.monotonic()
+            result = run_agent("What is on https://example.com?", memory_dir)
+            elapsed = time.monotonic() - start
+        release.set()
+
+        assert result == "It timed out. — Eva"
+        assert elapsed < 5
+        tool_result = create.call_args_list[1].kwargs["messages"][-1]["content"][0]["content"]
+        assert tool_result == "Error: fetch_webpage timed out"
+
+    def test_unused_prefetch_is_counted(self, tmp_path: Path):
+        """A prefetch the model never asks for is cancelled or counted as wasted."""
+        memory_dir = tmp_path / "memory"
+        _write_memory(memory_dir)
+        response = MagicMock(content=[MagicMock(type="text", text="Hi. — Eva")])
+
+        with patch("src.agent.PROVIDER", "anthropic"), \
+             patch("src.agent.PREFETCH", True), \
+             patch("src.prefetch.execute_tool", return_value="RAW CONTENT"), \
+             patch("src.agent.Prefetcher", RecordingPrefetcher), \
+             patch("src.clients.anthropic.AsyncAnthropic") as mock_anthropic:
+            mock_anthropic.return_value.messages.create = AsyncMock(return_value=response)
+
+            run_agent("Say hi, ignore https://example.com", memory_dir)
+
+        counts = RecordingPrefetcher.instances[-1].counts
+        assert counts["used"] == 0
+        assert counts["wasted"] + counts["cancelled"] == 1
+
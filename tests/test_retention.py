@@ -0,0 +1,148 @@
+"""Tests for retention module."""
+import threading
+from datetime import datetime
+from pathlib import Path
+from unittest.mock import patch
+
+from src.memory import memory_snapshot, update_context
+from src.retention import archive_context, split_entries
+
+HEADER = """# Context - Rolling Memory
+
+```
+### YYYY-MM-DD HH:MM - [Category]
+```
+
+## Recent Context
+
+<!-- Eva appends entries below this line -->
+
+"""
+NOW = datetime(2026, 3, 20, 12, 0)
+
+
+def _entry(stamp: str, summary: str) -> str:
+    return f"### {stamp} - [Decision]\n**Summary:** {summary}\n**Details:** {'word ' * 50}\n\n"
+
+
+def _write_context(memory_dir: Path, entries: list[str]) -> Path:
+    memory_dir.mkdir(exist_ok=True)
+    path = memory_dir / "context.md"
+    path.write_text(HEADER + "".join(entries))
+    return path
+
+
+class TestSplitEntries:
+    """Tests for split_entries."""
+
+    def test_header_example_is_not_an_entry(self):
+        """Headings above the marker (like the format example) stay in the header."""
+        text = HEADER + _entry("2026-03-01 09:00", "One") + _entry("2026-03-02 09:00", "Two")
+
+        header, entries = split_entries(text)
+
+        assert header == HEADER
+        assert len(entries) == 2
+        assert header + "".join(entries) == text
+
+
+class TestArchiveContext:
+    """Tests for archive_context."""
+
+    def test_moves_old_entries_to_monthly_files(self, tmp_path: Path):
+        """Entries older than the window go to context-archive/YYYY-MM.md; recent ones stay."""
+        memory_dir = tmp_path / "memory"
+        context = _write_context(memory_dir, [
+            _entry("2026-01-05 10:00", "January"),
+            _entry("2026-02-10 10:00", "February"),
+            _entry("2026-03-15 10:00", "March"),
+        ])
+
+        report = archive_context(memory_dir, days=30, now=NOW)
+
+        assert (report["archived"], report["kept"]) == (2, 1)
+        assert report["tokens_after"] < report["tokens_before"]
+        assert context.read_text() == HEADER + _entry("2026-03-15 10:00", "March")
+        january = (memory_dir / "context-archive" / "2026-01.md").read_text()
+        assert january.startswith("# Context Archive - 2026-01")
+        assert "January" in january and "February" not in january
+        assert "February" in (memory_dir / "context-archive" / "2026-02.md").read_text()
+
+    def test_nothing_to_archive(self, tmp_path: Path):
+        """A context.md with only recent entries is left untouched."""
+        memory_dir = tmp_path / "memory"
+        context = _write_context(memory_dir, [_entry("2026-03-15 10:00", "March")])
+        before = context.read_text()
+
+        report = archive_context(memory_dir, days=30, now=NOW)
+
+        assert report["archived"] == 0
+        assert report["tokens_after"] == report["tokens_before"]
+        assert context.read_text() == before
+        assert not (memory_dir / "context-archive").exists()
+
+    def test_rerun_does_not_duplicate(self, tmp_path: Path):
+        """Re-running after an interrupted run does not archive an entry twice."""
+        memory_dir = tmp_path / "memory"
+        old = _entry("2026-01-05 10:00", "January")
+        _write_context(memory_dir, [old])
+        archive_context(memory_dir, days=30, now=NOW)
+
+        # As if context.md had not been replaced before the crash
+        _write_context(memory_dir, [old])
+        archive_context(memory_dir, days=30, now=NOW)
+
+        assert (memory_dir / "context-archive" / "2026-01.md").read_text().count("January") == 1
+
+    def test_concurrent_appends_are_kept(self, tmp_path: Path):
+        """Entries appended by update_context while archiving are never lost."""
+        memory_dir = tmp_path / "memory"
+        _write_context(memory_dir, [_entry(f"2026-01-{d:02d} 10:00", f"Old {d}") for d in range(1, 29)])
+        errors = []
+
+        def append(i):
+            try:
+                update_context(memory_dir, "Learning", f"Concurrent {i}", "details")
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=append, args=(i,)) for i in range(20)]
+        for thread in threads:
+            thread.start()
+        archive_context(memory_dir, days=30, now=NOW)
+        for thread in threads:
+            thread.join()
+
+        text = (memory_dir / "context.md").read_text()
+        assert not errors
+        assert all(f"Concurrent {i}\n" in text for i in range(20))
+        assert "Old 1\n" not in text
+
+    def test_invalidates_memory_snapshot(self, tmp_path: Path):
+        """The cached memory snapshot reflects the archived context.md."""
+        memory_dir = tmp_path / "memory"
+        _write_context(memory_dir, [_entry("2026-01-05 10:00", "January")])
+        for name in ("soul", "user", "telos", "harness"):
+            (memory_dir / f"{name}.md").write_text(f"# {name.title()}")
+        assert "January" in memory_snapshot(memory_dir).files["context"]
+
+        archive_context(memory_dir, days=30, now=NOW)
+
+        assert "January" not in memory_snapshot(memory_dir).files["context"]
+
+
+class TestArchiveCli:
+    """Tests for eva --archive-context."""
+
+    def test_prints_token_reduction(self, tmp_path: Path, capsys):
+        """The CLI archives and reports the context.md token reduction."""
+        memory_dir = tmp_path / "memory"
+        _write_context(memory_dir, [_entry("2020-01-05 10:00", "Old")])
+
+        with patch("sys.argv", ["eva", "--archive-context", "--memory-dir", str(memory_dir)]):
+            from src.eva import main
+            main()
+
+        out = capsys.readouterr().out
+        assert "Archived 1 entries to 2020-01.md" in out
+        assert "tokens (-" in out
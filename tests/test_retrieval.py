@@ -0,0 +1,131 @@
+"""Tests for retrieval module."""
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from src.agent import build_retrieval_prompt, build_system_prompt, run_agent
+from src.memory import count_memory_tokens, memory_snapshot
+from src.retrieval import relevant_memory, split_sections
+from src.tools import execute_tool
+
+# The repository's own memory files, as a realistic corpus
+REPO_MEMORY = Path(__file__).parent.parent / "memory"
+
+
+def _write_memory(memory_dir: Path) -> None:
+    memory_dir.mkdir()
+    for name in ("soul", "telos", "context", "harness"):
+        (memory_dir / f"{name}.md").write_text(f"# {name.title()}\nAbout {name}.")
+    (memory_dir / "user.md").write_text(
+        "# User\n\n## Family\n\n### Kelly\n- Partner\n\n### Boys\n- Joshua, Mich, Ruben\n\n"
+        "## Fitness\n- Runs three mornings a week\n"
+    )
+    (memory_dir / "work.md").write_text("# Work\n\n## Clients\n\n### meshed360\nShopify inventory system.\n")
+
+
+class TestSplitSections:
+    """Tests for split_sections."""
+
+    def test_titles_follow_heading_path(self):
+        """Chunks are titled by file and heading path; fenced headings do not split."""
+        text = "# User\nIntro\n\n## Family\n\n### Kelly\n- Partner\n```\n## not a heading\n```\n## Fitness\nRuns\n"
+
+        chunks = split_sections("user", text)
+
+        assert [c.title for c in chunks] == ["user.md", "user.md > Family > Kelly", "user.md > Fitness"]
+        assert "## not a heading" in chunks[1].text
+
+
+class TestRelevantMemory:
+    """Tests for relevant_memory and read_memory search."""
+
+    def test_picks_matching_sections(self, tmp_path: Path):
+        """The sections that mention the prompt's terms are chosen, optional files included."""
+        memory_dir = tmp_path / "memory"
+        _write_memory(memory_dir)
+        snapshot = memory_snapshot(memory_dir)
+
+        titles = [c.title for c in relevant_memory(snapshot, "How are the boys doing?")]
+        work = [c.title for c in relevant_memory(snapshot, "status of the meshed360 inventory project")]
+
+        assert titles == ["user.md > Family > Boys"]
+        assert work == ["work.md > Clients > meshed360"]
+
+    def test_respects_budget_and_k(self):
+        """No more than k sections or budget tokens are returned."""
+        snapshot = memory_snapshot(REPO_MEMORY)
+
+        chunks = relevant_memory(snapshot, "agent client project status rugby kids", budget=300, k=3)
+
+        assert 0 < len(chunks) <= 3
+        assert sum(c.tokens for c in chunks) <= 300
+
+    def test_read_memory_query(self, tmp_path: Path):
+        """read_memory with a query returns the matching sections; with nothing it errors."""
+        memory_dir = tmp_path / "memory"
+        _write_memory(memory_dir)
+
+        result = execute_tool("read_memory", {"query": "Kelly"}, memory_dir)
+        scoped = execute_tool("read_memory", {"query": "Kelly", "name": "work"}, memory_dir)
+
+        assert result.startswith("### user.md > Family > Kelly\n- Partner")
+        assert scoped == "No memory sections match 'Kelly'."
+        assert execute_tool("read_memory", {}, memory_dir).startswith("Error:")
+
+
+class TestRetrievalPrompt:
+    """Tests for the retrieval-based system prompt."""
+
+    def test_smaller_than_whole_file_prompt(self):
+        """On the repo's memory, retrieval prompts are much smaller but keep the relevant section."""
+        snapshot = memory_snapshot(REPO_MEMORY)
+        whole = count_memory_tokens(build_system_prompt(snapshot.files))
+        prompts = ["When is the rugby week?", "What's next for meshed360?", "Plan my day", "How do you review your work?"]
+
+        built = [build_retrieval_prompt(snapshot, p) for p in prompts]
+        sizes = [count_memory_tokens(stable + dynamic) for stable, dynamic in built]
+
+        assert sum(sizes) / len(sizes) < 0.75 * whole
+        assert "Rugby 2026" in built[0][1]
+        assert "meshed360" in built[1][1]
+        assert all(stable == built[0][0] for stable, _ in built)
+
+    def test_agent_uses_retrieval_when_enabled(self, tmp_path: Path):
+        """With EVA_MEMORY_RETRIEVAL the agent sends the core plus relevant sections."""
+        memory_dir = tmp_path / "memory"
+        _write_memory(memory_dir)
+        response = MagicMock(content=[MagicMock(type="text", text="Fine. — Eva")])
+
+        with patch("src.agent.PROVIDER", "anthropic"), \
+             patch("src.agent.PROMPT_CACHE", True), \
+             patch("src.agent.RETRIEVAL", True), \
+             patch("src.clients.anthropic.AsyncAnthropic") as mock_anthropic:
+            create = AsyncMock(return_value=response)
+            mock_anthropic.return_value.messages.create = create
+            run_agent("How is Kelly?", memory_dir)
+
+        system = create.call_args.kwargs["system"]
+        assert system[0]["cache_control"] == {"type": "ephemeral"}
+        assert "About soul." in system[0]["text"]
+        assert "### user.md > Family > Kelly" in system[1]["text"]
+        assert "Fitness" not in system[0]["text"] + system[1]["text"]
+
+    def test_retrieved_files_added_without_retrieval_mode(self, tmp_path: Path):
+        """By default the whole-file prompt gets matching sections of RETRIEVED files only."""
+        memory_dir = tmp_path / "memory"
+        _write_memory(memory_dir)
+        (memory_dir / "ecosystem.md").write_text("# Ecosystem\n\n## meshed360 agents\nOn demand only.\n")
+        response = MagicMock(content=[MagicMock(type="text", text="Fine. — Eva")])
+
+        with patch("src.agent.PROVIDER", "anthropic"), \
+             patch("src.agent.PROMPT_CACHE", True), \
+             patch("src.clients.anthropic.AsyncAnthropic") as mock_anthropic:
+            create = AsyncMock(return_value=response)
+            mock_anthropic.return_value.messages.create = create
+            run_agent("How is the meshed360 inventory work going?", memory_dir)
+            run_agent("How is Kelly?", memory_dir)
+
+        matched, unmatched = (call.kwargs["system"] for call in create.call_args_list)
+        assert "Fitness" in matched[0]["text"]
+        assert matched[2]["text"] == "\n## Relevant Memory\n### work.md > Clients > meshed360\nShopify inventory system.\n"
+        assert len(unmatched) == 2
+        assert "On demand only" not in "".join(block["text"] for block in matched)
@@ -0,0 +1,146 @@
+"""Tests for routing module."""
+import asyncio
+
+import pytest
+
+from src.providers import ProviderAdapter, Turn, new_usage
+from src.routing import HedgedAdapter, LatencyTracker
+
+
+class FakeAdapter(ProviderAdapter):
+    """Adapter that answers after a fixed delay, or fails."""
+
+    def __init__(self, name: str, delay: float, fail: bool = False):
+        self.name = name
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+
+    async def complete(self, system, messages):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError(f"{self.name} is down")
+        return Turn(self.name, [], None, new_usage())
+
+    async def stream(self, system, messages):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError(f"{self.name} is down")
+        yield {"type": "text", "text": self.name}
+        yield Turn(self.name, [], None, new_usage())
+
+
+def _tracker_with(samples: dict[str, float]) -> LatencyTracker:
+    tracker = LatencyTracker()
+    for name, latency in samples.items():
+        for _ in range(10):
+            tracker.record(name, latency)
+    return tracker
+
+
+class TestLatencyTracker:
+    """Tests for LatencyTracker."""
+
+    def test_p95_needs_samples(self):
+        """p95 is None until enough samples are recorded."""
+        tracker = LatencyTracker()
+        tracker.record("nvidia", 1.0)
+
+        assert tracker.p95("nvidia") is None
+
+    def test_rank_demotes_slow_provider(self):
+        """rank moves a slow primary behind a faster secondary."""
+        tracker = _tracker_with({"nvidia": 9.0, "grok": 1.0})
+
+        assert tracker.rank(["nvidia", "grok"]) == ["grok", "nvidia"]
+
+    def test_rank_demotes_failing_provider(self):
+        """rank penalises providers with a high error rate."""
+        tracker = _tracker_with({"nvidia": 1.0, "grok": 1.5})
+        for _ in range(10):
+            tracker.record("nvidia", 1.0, ok=False)
+
+        assert tracker.rank(["nvidia", "grok"]) == ["grok", "nvidia"]
+
+    def test_rank_demotes_provider_that_fails_fast(self):
+        """rank does not mistake quick failures for low latency."""
+        tracker = _tracker_with({"grok": 2.0})
+        for _ in range(10):
+            tracker.record("nvidia", 0.05, ok=False)
+
+        assert tracker.rank(["nvidia", "grok"]) == ["grok", "nvidia"]
+        assert tracker.p95("nvidia") is None
+
+
+class TestHedgedAdapter:
+    """Tests for HedgedAdapter."""
+
+    def test_fast_primary_is_not_hedged(self):
+        """complete uses only the primary when it answers within the hedge delay."""
+        primary, secondary = FakeAdapter("nvidia", 0.01), FakeAdapter("grok", 0.01)
+        router = HedgedAdapter([primary, secondary], _tracker_with({"nvidia": 0.5}))
+
+        turn = asyncio.run(router.complete("system", []))
+
+        assert turn.text == "nvidia"
+        assert secondary.calls == 0
+
+    def test_slow_primary_is_hedged(self):
+        """complete sends a backup request and takes the faster answer."""
+        primary, secondary = FakeAdapter("nvidia", 2.0), FakeAdapter("grok", 0.05)
+        tracker = LatencyTracker()
+        router = HedgedAdapter([primary, secondary], tracker)
+
+        with pytest.MonkeyPatch.context() as mp:
+            mp.setattr("src.routing.HEDGE_DELAY", 0.1)
+            turn = asyncio.run(asyncio.wait_for(router.complete("system", []), 1.0))
+
+        assert turn.text == "grok"
+        assert router.winners == ["grok"]
+        assert tracker.samples("nvidia") == 1  # Loser recorded with its elapsed time
+
+    def test_failing_primary_fails_over(self):
+        """complete falls back to the secondary when the primary errors."""
+        primary, secondary = FakeAdapter("nvidia", 0.0, fail=True), FakeAdapter("grok", 0.0)
+        tracker = LatencyTracker()
+        router = HedgedAdapter([primary, secondary], tracker)
+
+        turn = asyncio.run(router.complete("system", []))
+
+        assert turn.text == "grok"
+        assert tracker.error_rate("nvidia") == 1.0
+
+    def test_all_providers_failing_raises(self):
+        """complete raises the last error when every provider fails."""
+        router = HedgedAdapter(
+            [FakeAdapter("nvidia", 0.0, fail=True), FakeAdapter("grok", 0.0, fail=True)],
+            LatencyTracker(),
+        )
+
+        with pytest.raises(RuntimeError):
+            asyncio.run(router.complete("system", []))
+
+    def test_stream_hedges_on_first_token(self):
+        """stream forwards whichever provider produces the first event."""
+        primary, secondary = FakeAdapter("nvidia", 2.0), FakeAdapter("grok", 0.05)
+        router = HedgedAdapter([primary, secondary], LatencyTracker())
+
+        async def collect():
+            return [item async for item in router.stream("system", [])]
+
+        with pytest.MonkeyPatch.context() as mp:
+            mp.setattr("src.routing.HEDGE_DELAY", 0.1)
+            items = asyncio.run(asyncio.wait_for(collect(), 1.0))
+
+        assert items[0] == {"type": "text", "text": "grok"}
+        assert items[-1].text == "grok"
+
+    def test_mixed_wire_formats_rejected(self):
+        """HedgedAdapter refuses providers with different message formats."""
+        class OtherAdapter(FakeAdapter):
+            pass
+
+        with pytest.raises(ValueError):
+            HedgedAdapter([FakeAdapter("nvidia", 0), OtherAdapter("anthropic", 0)])
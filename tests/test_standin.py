@@ -0,0 +1,150 @@
+"""Tests for the stand-in LLM server (no network needed)."""
+import os
+from pathlib import Path
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from src import agent, cache
+from src.agent import run_agent, run_agent_stream
+from src.standin import StandIn, measure_overhead, serve
+
+CASSETTE = {
+    "scripts": [
+        {"match": "soul", "turns": [
+            {"tool_calls": [{"name": "read_memory", "input": {"name": "soul"}}]},
+            {"text": "You are kind. — Eva", "usage": {"input_tokens": 50, "output_tokens": 6}},
+        ]},
+        {"turns": [{"text": "Hello there. — Eva"}]},
+    ]
+}
+
+
+def _write_memory(memory_dir: Path) -> None:
+    memory_dir.mkdir()
+    for name in ("soul", "user", "telos", "context", "harness"):
+        (memory_dir / f"{name}.md").write_text(f"# {name.title()}")
+
+
+@pytest.fixture
+def standin_url(monkeypatch):
+    """Serve CASSETTE and point every provider at it."""
+    server = serve(StandIn(CASSETTE))
+    url = f"http://127.0.0.1:{server.port}"
+    monkeypatch.setenv("ANTHROPIC_BASE_URL", url)
+    for key in ("ANTHROPIC_API_KEY", "NVIDIA_API_KEY", "GROK_API_KEY"):
+        monkeypatch.setenv(key, "test")
+    monkeypatch.setattr("src.agent.NVIDIA_BASE_URL", f"{url}/v1")
+    monkeypatch.setattr("src.agent.GROK_BASE_URL", f"{url}/v1")
+    yield url
+    server.shutdown()
+
+
+class TestStandIn:
+    """Tests for StandIn replay."""
+
+    def test_turn_selected_by_prompt_and_position(self):
+        """turn_for picks the matching script and the next unanswered turn."""
+        standin = StandIn(CASSETTE)
+        first = [{"role": "user", "content": "read my soul"}]
+        second = first + [{"role": "assistant", "content": []}, {"role": "user", "content": []}]
+
+        assert standin.turn_for(first)["tool_calls"][0]["name"] == "read_memory"
+        assert standin.turn_for(second)["text"] == "You are kind. — Eva"
+        assert standin.turn_for(second + second[1:])["text"] == "You are kind. — Eva"
+        assert standin.turn_for([{"role": "user", "content": "hi"}])["text"] == "Hello there. — Eva"
+
+    def test_unmatched_prompt_is_404(self):
+        """The server rejects conversations no script covers."""
+        server = serve(StandIn({"scripts": [{"match": "x", "turns": [{"text": "x"}]}]}))
+        try:
+            response = httpx.post(
+                f"http://127.0.0.1:{server.port}/v1/messages",
+                json={"model": "m", "messages": [{"role": "user", "content": "y"}]},
+            )
+        finally:
+            server.shutdown()
+
+        assert response.status_code == 404
+
+    def test_stream_usage_only_when_requested(self):
+        """OpenAI streams end with a usage chunk only if stream_options.include_usage is set."""
+        server = serve(StandIn(CASSETTE))
+        body = {"model": "m", "stream": True, "messages": [{"role": "user", "content": "hi"}]}
+        try:
+            url = f"http://127.0.0.1:{server.port}/v1/chat/completions"
+            plain = httpx.post(url, json=body).text
+            with_usage = httpx.post(url, json={**body, "stream_options": {"include_usage": True}}).text
+        finally:
+            server.shutdown()
+
+        assert '"usage"' not in plain
+        assert '"prompt_tokens"' in with_usage
+
+
+class TestAgentAgainstStandIn:
+    """The agent loop end to end over HTTP, without provider endpoints."""
+
+    @pytest.mark.parametrize("provider", ["anthropic", "nvidia", "grok"])
+    def test_tool_loop(self, standin_url, tmp_path: Path, provider):
+        """run_agent runs a scripted tool call and returns the final answer."""
+        memory_dir = tmp_path / "memory"
+        _write_memory(memory_dir)
+
+        with patch("src.agent.PROVIDER", provider), patch("src.agent.execute_tool", return_value="# Soul") as tool:
+            result = run_agent("What is in my soul file?", memory_dir)
+
+        assert result == "You are kind. — Eva"
+        tool.assert_called_once_with("read_memory", {"name": "soul"}, memory_dir)
+
+    @pytest.mark.parametrize("provider", ["anthropic", "nvidia"])
+    def test_stream(self, standin_url, tmp_path: Path, provider):
+        """run_agent_stream receives the answer as several text deltas."""
+        memory_dir = tmp_path / "memory"
+        _write_memory(memory_dir)
+
+        with patch("src.agent.PROVIDER", provider):
+            events = list(run_agent_stream("Hi", memory_dir))
+
+        texts = [e["text"] for e in events if e["type"] == "text"]
+        assert len(texts) > 1
+        assert "".join(texts) == "Hello there. — Eva"
+        assert events[-1]["type"] == "done"
+        assert events[-1]["usage"]["input_tokens"] > 0
+        assert events[-1]["usage"]["output_tokens"] > 0
+
+
+class TestMeasureOverhead:
+    """Tests for measure_overhead."""
+
+    def test_separates_provider_time(self, tmp_path: Path):
+        """measure_overhead subtracts simulated provider latency from wall time."""
+        memory_dir = tmp_path / "memory"
+        _write_memory(memory_dir)
+        standin = StandIn(CASSETTE, {"ttft": 0.05, "tokens_per_second": 0.0})
+
+        result = measure_overhead(standin, "Hi", memory_dir, runs=3)
+
+        assert result["turns"] == 3
+        assert result["provider_seconds"] == pytest.approx(0.15)
+        assert result["wall_seconds"] >= result["provider_seconds"]
+        assert result["overhead_per_turn"] >= 0
+
+    def test_cache_off_and_globals_restored(self, tmp_path: Path, monkeypatch):
+        """Every run reaches the stand-in, and patched settings are restored even on failure."""
+        memory_dir = tmp_path / "memory"
+        _write_memory(memory_dir)
+        monkeypatch.setattr("src.cache.RESPONSE_CACHE", "memory")
+        monkeypatch.delenv("ANTHROPIC_BASE_URL", raising=False)
+        before = (agent.PROVIDER, agent.ROUTE, agent.NVIDIA_BASE_URL, agent.PREFETCH)
+
+        result = measure_overhead(StandIn(CASSETTE, {"ttft": 0.0, "tokens_per_second": 0.0}), "Hi", memory_dir, runs=3)
+        assert result["turns"] == 3
+
+        with patch("src.agent.run_agent", side_effect=RuntimeError("boom")), pytest.raises(RuntimeError):
+            measure_overhead(StandIn(CASSETTE, {"ttft": 0.0, "tokens_per_second": 0.0}), "Hi", memory_dir, runs=1)
+
+        assert (agent.PROVIDER, agent.ROUTE, agent.NVIDIA_BASE_URL, agent.PREFETCH) == before
+        assert cache.RESPONSE_CACHE == "memory"
+        assert "ANTHROPIC_BASE_URL" not in os.environ
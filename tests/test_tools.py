@@ -1,8 +1,21 @@
 """Tests for tools module."""
+import time
 import pytest
 from pathlib import Path
+from unittest.mock import patch
 
-from src.tools import TOOLS, execute_tool, ToolExecutionError
+from src import tools
+from src.tools import TOOLS, execute_tool, invalidate_tool_cache, tool_cache_stats, ToolExecutionError
+
+SHA = "0123456789abcdef0123456789abcdef01234567"
+REPO = {
+    "full_name": "o/r",
+    "stars": 1,
+    "forks": 0,
+    "open_issues": 2,
+    "description": "",
+    "html_url": "https://github.com/o/r",
+}
 
 
 class TestToolsSchema:
@@ -16,6 +29,38 @@ class TestToolsSchema:
         """TOOLS contains exactly 2 tools."""
         assert len(TOOLS) == 2
 
+    def test_read_memory_schema_from_registry(self, monkeypatch):
+        """read_memory's names and descriptions come from the memory registry."""
+        from src.memory import MEMORY_REGISTRY, ON_DEMAND, MemoryFile
+
+        monkeypatch.setitem(
+            MEMORY_REGISTRY, "travel", MemoryFile("travel", "Travel", policy=ON_DEMAND, description="trips")
+        )
+
+        tool = tools.read_memory_tool()
+
+        assert tool["input_schema"]["properties"]["name"]["enum"][-1] == "context"
+        assert "travel" in tool["input_schema"]["properties"]["name"]["enum"]
+        assert "travel (trips, only through this tool)" in tool["description"]
+        assert TOOLS[0]["input_schema"]["properties"]["name"]["enum"] == [
+            "soul", "user", "telos", "harness", "work", "ecosystem", "context",
+        ]
+
+    def test_schemas_generated_once_from_registry(self):
+        """TOOLS and OPENAI_TOOLS are built from the registry in the same order."""
+        assert [t["name"] for t in TOOLS] == list(tools.TOOL_REGISTRY)
+        assert [t["function"]["name"] for t in tools.OPENAI_TOOLS] == list(tools.TOOL_REGISTRY)
+        fetch = tools.TOOL_REGISTRY["fetch_webpage"]
+        assert fetch.openai_definition["function"]["parameters"] is fetch.definition["input_schema"]
+
+    def test_tool_metadata(self):
+        """Write tools are serial with no timeout; reads are parallel and timed out."""
+        assert tools.WRITE_TOOLS == {"update_context", "github_create_issue", "github_create_pull_request"}
+        assert tools.SERIAL_TOOLS == tools.WRITE_TOOLS
+        assert tools.tool_timeout("update_context") is None
+        assert tools.tool_timeout("fetch_webpage") == tools.TOOL_TIMEOUT
+        assert tools.TOOL_REGISTRY["read_memory"].cache_ttl is None
+
     def test_read_memory_tool_exists(self):
         """read_memory tool exists with correct schema."""
         tool = next((t for t in TOOLS if t["name"] == "read_memory"), None)
@@ -79,3 +124,134 @@ class TestExecuteTool:
         result = execute_tool("read_memory", {"name": "soul"}, memory_dir)
 
         assert "error" in result.lower()
+
+
+class TestToolOutputs:
+    """Tests for tool outputs left for the agent's token budget to cut."""
+
+    def test_file_contents_whole_and_code_keeps_tail(self, tmp_path: Path):
+        """File contents are not cut by characters; code files keep their tail when cut later."""
+        content = "x = 1\n" * 2000
+        with patch("src.tools.github_get_file_contents", return_value=content):
+            result = execute_tool("github_get_file_contents", {"owner": "o", "repo": "r", "path": "big.py"}, tmp_path)
+
+        assert content in result
+        assert tools.tool_keeps_tail("github_get_file_contents", {"path": "src/app.PY"})
+        assert not tools.tool_keeps_tail("github_get_file_contents", {"path": "README.md"})
+        assert not tools.tool_keeps_tail("fetch_webpage", {"url": "https://a"})
+
+    def test_search_descriptions_cut_at_words(self, tmp_path: Path, monkeypatch):
+        """Long search descriptions are cut to whole words within their token allowance."""
+        from src import memory
+
+        monkeypatch.setattr(memory, "TOKEN_COUNTER", "estimate")
+        results = [
+            {"title": "Long", "url": "https://a", "description": "alpha beta gamma delta " * 20},
+            {"title": "Short", "url": "https://b", "description": "Just this."},
+        ]
+        with patch("src.tools.google_search_query", return_value=results):
+            result = execute_tool("google_search", {"query": "q"}, tmp_path)
+
+        long_line = result.splitlines()[4].strip()
+        assert long_line.endswith("...") and len(long_line) <= 4 * tools.SEARCH_DESCRIPTION_TOKENS + 3
+        assert long_line[:-3].split()[-1] in ("alpha", "beta", "gamma", "delta")
+        assert "   Just this." in result.splitlines()
+
+    def test_fetch_defaults_to_fetch_max_chars(self, tmp_path: Path):
+        """fetch_webpage downloads up to FETCH_MAX_CHARS unless the model sets max_chars."""
+        with patch("src.tools.fetch_webpage", return_value="page") as mock_fetch:
+            execute_tool("fetch_webpage", {"url": "https://x"}, tmp_path)
+            execute_tool("fetch_webpage", {"url": "https://y", "max_chars": 500}, tmp_path)
+
+        assert [c.kwargs["max_chars"] for c in mock_fetch.call_args_list] == [tools.FETCH_MAX_CHARS, 500]
+
+
+class TestToolCache:
+    """Tests for memoized read-only tool results."""
+
+    def test_repeat_read_is_served_from_cache(self, tmp_path: Path):
+        """A repeated read-only call hits the cache instead of the network."""
+        before = tool_cache_stats()
+        with patch("src.tools.github_get_repo", return_value=REPO) as mock_get:
+            first = execute_tool("github_get_repo", {"owner": "o", "repo": "r"}, tmp_path)
+            second = execute_tool("github_get_repo", {"repo": "r", "owner": "o"}, tmp_path)
+
+        assert first == second
+        mock_get.assert_called_once()
+        after = tool_cache_stats()
+        assert after["hits"] - before["hits"] == 1
+        assert after["misses"] - before["misses"] == 1
+        assert after["entries"] == 1
+
+    def test_entries_expire_after_ttl(self, tmp_path: Path):
+        """A memoized result is fetched again once its tool's TTL passes."""
+        with patch.object(tools.TOOL_REGISTRY["fetch_webpage"], "cache_ttl", 0.01):
+            with patch("src.tools.fetch_webpage", return_value="page") as mock_fetch:
+                execute_tool("fetch_webpage", {"url": "https://a.b"}, tmp_path)
+                time.sleep(0.02)
+                execute_tool("fetch_webpage", {"url": "https://a.b"}, tmp_path)
+
+        assert mock_fetch.call_count == 2
+
+    def test_commit_sha_ref_never_expires(self, tmp_path: Path):
+        """Files read at a full commit SHA are cached without a TTL."""
+        args = {"owner": "o", "repo": "r", "path": "a.py", "ref": SHA}
+        with patch.object(tools.TOOL_REGISTRY["github_get_file_contents"], "cache_ttl", 0.01):
+            with patch("src.tools.github_get_file_contents", return_value="x = 1") as mock_get:
+                execute_tool("github_get_file_contents", args, tmp_path)
+                execute_tool("github_get_file_contents", {**args, "ref": "main"}, tmp_path)
+                time.sleep(0.02)
+                execute_tool("github_get_file_contents", args, tmp_path)
+                execute_tool("github_get_file_contents", {**args, "ref": "main"}, tmp_path)
+
+        assert [c.kwargs["ref"] for c in mock_get.call_args_list] == [SHA, "main", "main"]
+
+    def test_evicts_beyond_size(self, tmp_path: Path):
+        """The cache keeps at most its configured number of results."""
+        with patch.object(tools.TOOL_CACHE, "max_entries", 2):
+            with patch("src.tools.fetch_webpage", return_value="page") as mock_fetch:
+                for url in ("https://a", "https://b", "https://c", "https://a"):
+                    execute_tool("fetch_webpage", {"url": url}, tmp_path)
+
+        assert mock_fetch.call_count == 4
+        assert tool_cache_stats()["entries"] == 2
+
+    def test_errors_are_not_cached(self, tmp_path: Path):
+        """Failed reads are retried rather than memoized."""
+        with patch("src.tools.fetch_webpage", return_value="Error fetching https://a: boom") as mock_fetch:
+            execute_tool("fetch_webpage", {"url": "https://a"}, tmp_path)
+            execute_tool("fetch_webpage", {"url": "https://a"}, tmp_path)
+        with patch("src.tools.github_get_repo", side_effect=RuntimeError("no token")) as mock_get:
+            execute_tool("github_get_repo", {"owner": "o", "repo": "r"}, tmp_path)
+            execute_tool("github_get_repo", {"owner": "o", "repo": "r"}, tmp_path)
+
+        assert mock_fetch.call_count == 2
+        assert mock_get.call_count == 2
+        assert tool_cache_stats()["entries"] == 0
+
+    def test_write_tools_never_cached_and_invalidate_reads(self, tmp_path: Path):
+        """Write tools always run and drop the reads they make stale."""
+        issue = {"number": 7, "url": "https://github.com/o/r/issues/7"}
+        with patch("src.tools.github_create_issue", return_value=issue) as mock_create, \
+                patch("src.tools.github_list_issues", return_value=[]) as mock_list, \
+                patch("src.tools.fetch_webpage", return_value="page"):
+            execute_tool("fetch_webpage", {"url": "https://a"}, tmp_path)
+            execute_tool("github_list_issues", {"owner": "o", "repo": "r"}, tmp_path)
+            for _ in range(2):
+                execute_tool("github_create_issue", {"owner": "o", "repo": "r", "title": "t"}, tmp_path)
+            execute_tool("github_list_issues", {"owner": "o", "repo": "r"}, tmp_path)
+
+        assert mock_create.call_count == 2
+        assert mock_list.call_count == 2
+        assert tool_cache_stats()["entries"] == 2
+
+    def test_invalidate_by_name(self, tmp_path: Path):
+        """invalidate_tool_cache drops only the named tool's results."""
+        with patch("src.tools.fetch_webpage", return_value="page"), \
+                patch("src.tools.github_get_repo", return_value=REPO):
+            execute_tool("fetch_webpage", {"url": "https://a"}, tmp_path)
+            execute_tool("github_get_repo", {"owner": "o", "repo": "r"}, tmp_path)
+
+        assert invalidate_tool_cache("fetch_webpage") == 1
+        assert tool_cache_stats()["entries"] == 1
+        assert invalidate_tool_cache() == 1
@@ -1,10 +1,12 @@
 """Tests for workflow modules."""
 import pytest
+from datetime import datetime, timedelta
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
 from src.workflows.heartbeat import run_heartbeat, check_urgent_emails, check_upcoming_meetings
 from src.workflows.morning_brief import run_morning_brief, generate_brief
+from src.workflows.base import push_memory
 from src.workflows.weekly_review import run_weekly_review
 
 
@@ -78,13 +80,15 @@ class TestGenerateBrief:
         """generate_brief returns formatted markdown."""
         emails = [{"subject": "Test email", "from": "test@example.com"}]
         events = [{"summary": "Meeting", "start": {"dateTime": "2026-02-19T10:00:00Z"}}]
-        context = "Previous context entries"
+        followups = [{"timestamp": "2026-02-18 15:30", "followup": "Send the proposal to Acme"}]
 
-        result = generate_brief(emails, events, context)
+        result = generate_brief(emails, events, followups)
 
         assert "Good morning" in result
         assert "Test email" in result
         assert "Meeting" in result
+        assert "Open Items** (1)" in result
+        assert "2026-02-18: Send the proposal to Acme" in result
 
 
 class TestRunMorningBrief:
@@ -100,12 +104,10 @@ class TestRunMorningBrief:
              patch("src.workflows.morning_brief.fetch_calendar_events") as mock_events, \
              patch("src.workflows.morning_brief.send_email") as mock_email, \
              patch("src.workflows.morning_brief.sync_memory"), \
-             patch("src.workflows.morning_brief.push_memory"), \
-             patch("src.workflows.morning_brief.load_memory_file") as mock_load:
+             patch("src.workflows.morning_brief.push_memory"):
 
             mock_emails.return_value = [{"subject": "Test", "from": "test@example.com"}]
             mock_events.return_value = [{"summary": "Standup", "start": {"dateTime": "2026-02-19T09:00:00Z"}}]
-            mock_load.return_value = "# Context\nPrevious entries"
 
             run_morning_brief(tmp_path, "test@example.com")
 
@@ -113,6 +115,28 @@ class TestRunMorningBrief:
             body = mock_email.call_args[0][2]  # third arg is body
             assert "Good morning" in body
 
+    def test_open_items_from_recent_entries(self, tmp_path: Path):
+        """run_morning_brief lists open follow-ups from the newest context entries."""
+        memory_dir = tmp_path / "memory"
+        memory_dir.mkdir()
+        now = datetime.now().strftime("%Y-%m-%d %H:%M")
+        (memory_dir / "context.md").write_text(
+            "# Context\n"
+            f"\n### {now} - [Commitment]\n**Summary:** Proposal\n**Follow-up:** Send the proposal to Acme\n"
+            f"\n### {now} - [Decision]\n**Summary:** Closed\n**Follow-up:** Done\n"
+        )
+
+        with patch("src.workflows.morning_brief.fetch_emails", return_value=[]), \
+             patch("src.workflows.morning_brief.fetch_calendar_events", return_value=[]), \
+             patch("src.workflows.morning_brief.send_email") as mock_email, \
+             patch("src.workflows.morning_brief.sync_memory"), \
+             patch("src.workflows.morning_brief.push_memory"):
+            run_morning_brief(tmp_path, "test@example.com")
+
+        body = mock_email.call_args[0][2]
+        assert "**Open Items** (1):" in body
+        assert "Send the proposal to Acme" in body
+
 
 class TestRunWeeklyReview:
     """Tests for run_weekly_review function."""
@@ -121,19 +145,42 @@ class TestRunWeeklyReview:
         """run_weekly_review sends weekly digest via email."""
         memory_dir = tmp_path / "memory"
         memory_dir.mkdir()
-        (memory_dir / "context.md").write_text("# Context\n## 2026-02-15\nEntry 1\n## 2026-02-16\nEntry 2")
+        recent = (datetime.now() - timedelta(days=1)).strftime("%Y-%m-%d %H:%M")
+        (memory_dir / "context.md").write_text(
+            "# Context\n"
+            "### 2020-01-01 09:00 - [Commitment]\n**Summary:** Too old\n**Follow-up:** Old item\n"
+            f"### {recent} - [Commitment]\n**Summary:** Ship v2\n**Follow-up:** Tell Acme\n"
+            f"### {recent} - [Learning]\n**Summary:** Mention of Commitment and Follow-up in text\n"
+        )
 
         with patch("src.workflows.weekly_review.fetch_calendar_events") as mock_events, \
              patch("src.workflows.weekly_review.send_email") as mock_email, \
              patch("src.workflows.weekly_review.sync_memory"), \
-             patch("src.workflows.weekly_review.push_memory"), \
-             patch("src.workflows.weekly_review.load_memory_file") as mock_load:
+             patch("src.workflows.weekly_review.push_memory"):
 
             mock_events.return_value = []
-            mock_load.return_value = "# Context\nEntry from this week"
 
             run_weekly_review(tmp_path, "test@example.com")
 
             mock_email.assert_called_once()
             subject = mock_email.call_args[0][1]  # second arg is subject
             assert "Week" in subject
+            body = mock_email.call_args[0][2]
+            assert "2 context entries logged" in body
+            assert "1 commitments, 1 follow-ups tracked" in body
+
+
+class TestPushMemory:
+    """Tests for push_memory function."""
+
+    def test_stages_context_archive(self, tmp_path: Path):
+        """push_memory stages context-archive/ alongside context.md once it exists."""
+        (tmp_path / "memory" / "context-archive").mkdir(parents=True)
+
+        with patch("src.workflows.base.subprocess.run") as mock_run:
+            mock_run.return_value = MagicMock(returncode=0)
+            push_memory(tmp_path, "eva: test")
+
+        assert mock_run.call_args_list[0].args[0] == [
+            "git", "add", "memory/context.md", "memory/context-archive",
+        ]